@@ -0,0 +1,263 @@
+"""
+Build a vocabulary pack from a frequency list.
+
+    uv run python -m backend.build_pack frequency.txt \
+        -o data/packs/english-russian.jsonl --limit 5000 --rate 60
+
+Every line of the frequency list holds a word, optionally with a rank or a
+count ("the 23135851", "1\tthe"); numbers are ignored. The words are looked
+up through the same pipeline and result cache as /process-words, at most
+`--rate` model lookups per minute, and appended to the pack as they finish.
+Running the same command again continues an interrupted build; words that
+failed are retried. See backend/packs.py for the pack format.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+
+from backend import main
+from backend.packs import pack_header, read_pack, same_pack
+
+logger = logging.getLogger(__name__)
+
+FIELD_SEPARATOR_RE = re.compile(r"[\t,;]")
+NUMBER_RE = re.compile(r"\d[\d.,]*")
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Build a vocabulary pack from a frequency list."
+    )
+    parser.add_argument("input", help="Frequency list, one word per line")
+    parser.add_argument("-o", "--output", required=True, help="Pack file (.jsonl)")
+    parser.add_argument("--source-lang", default="English")
+    parser.add_argument("--target-lang", default="Russian")
+    parser.add_argument(
+        "--limit", type=int, default=0, help="Take only the first N words"
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=60,
+        help="Model lookups per minute; cached words are not throttled "
+        "(0 disables the limit)",
+    )
+    parser.add_argument(
+        "--parallel",
+        type=int,
+        default=main.MAX_CONCURRENT_REQUESTS,
+        help="Chunks processed at once",
+    )
+    parser.add_argument("--log-level", default="WARNING")
+    return parser.parse_args(argv)
+
+
+def read_frequency_list(input_path: str, limit: int = 0) -> list[str]:
+    """Words of a frequency list in order, without ranks, counts or repeats."""
+    words = []
+    seen = set()
+    with open(input_path, "r", encoding="utf-8-sig") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            tokens = FIELD_SEPARATOR_RE.sub(" ", line).split()
+            word = " ".join(t for t in tokens if not NUMBER_RE.fullmatch(t)).lower()
+            if word and word not in seen:
+                seen.add(word)
+                words.append(word)
+                if limit and len(words) >= limit:
+                    break
+    return words
+
+
+class Throttle:
+    """Spaces out work to at most `rate` items per minute."""
+
+    def __init__(self, rate: float):
+        self.interval = 60 / rate if rate > 0 else 0.0
+        self._next_at = 0.0
+
+    async def wait(self, items: int = 1) -> None:
+        if not self.interval:
+            return
+        now = time.monotonic()
+        start_at = max(now, self._next_at)
+        self._next_at = start_at + items * self.interval
+        if start_at > now:
+            await asyncio.sleep(start_at - now)
+
+
+def open_pack(output_path: str, header: dict) -> set[str]:
+    """
+    Words already in the pack at `output_path`, creating it if needed.
+
+    A line cut off by an interruption is removed, so the file can be appended to.
+    """
+    if not os.path.exists(output_path) or os.path.getsize(output_path) == 0:
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(header, ensure_ascii=False) + "\n")
+        return set()
+
+    with open(output_path, "rb+") as f:
+        content = f.read()
+        if not content.endswith(b"\n"):
+            logger.warning("Removing an incomplete last line from the pack")
+            f.truncate(content.rfind(b"\n") + 1)
+
+    existing, entries = read_pack(output_path)
+    if not same_pack(existing, header):
+        raise ValueError(
+            f"{output_path} was built for {existing['source_lang']} to "
+            f"{existing['target_lang']} with model {existing['model']} and prompt "
+            f"{existing['prompt_hash']}; choose another output file"
+        )
+    return {entry["word"] for entry in entries}
+
+
+# Appends of concurrent workers are serialised
+append_lock = threading.Lock()
+
+
+def append_entry(
+    output_path: str, parsed_word: str, context: str | None, data: dict
+) -> None:
+    """Append one word to the pack; closing the file keeps the pack resumable."""
+    entry = {"word": parsed_word, "context": context, "data": data}
+    with append_lock, open(output_path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+async def build_pack(
+    input_path: str,
+    output_path: str,
+    source_lang: str,
+    target_lang: str,
+    limit: int = 0,
+    rate: float = 0,
+    parallel: int = 1,
+) -> dict:
+    """Look up every word of the frequency list not yet in the pack."""
+    header = pack_header(
+        source_lang,
+        target_lang,
+        main.GEMINI_MODEL,
+        main.get_compiled_prompt(source_lang, target_lang).hash,
+    )
+    # File work runs in threads to keep the event loop free for lookups
+    words = await asyncio.to_thread(read_frequency_list, input_path, limit)
+    done = await asyncio.to_thread(open_pack, output_path, header)
+    entries = [
+        entry for entry in main.build_word_entries(words) if entry[1] not in done
+    ]
+    stats = {
+        "total": len(words),
+        "skipped": len(words) - len(entries),
+        "added": 0,
+        "failed": 0,
+    }
+    if not entries:
+        return stats
+
+    chunks: asyncio.Queue[list[main.WordEntry]] = asyncio.Queue()
+    for i in range(0, len(entries), main.BATCH_SIZE):
+        chunks.put_nowait(entries[i : i + main.BATCH_SIZE])
+    throttle = Throttle(rate)
+
+    async def add(parsed_word: str, context: str | None, data: dict) -> None:
+        await asyncio.to_thread(append_entry, output_path, parsed_word, context, data)
+        stats["added"] += 1
+
+    async def worker() -> None:
+        while not chunks.empty():
+            chunk = chunks.get_nowait()
+            missing = []
+            for raw_word, parsed_word, context in chunk:
+                cached = main.get_cached_word_data(
+                    raw_word, parsed_word, source_lang, target_lang, context
+                )
+                if cached is not None:
+                    await add(parsed_word, context, cached)
+                else:
+                    missing.append((raw_word, parsed_word, context))
+            if not missing:
+                continue
+
+            await throttle.wait(len(missing))
+            async for index, result in main.lookup_entries(
+                missing, source_lang, target_lang, check_cache=False
+            ):
+                _, parsed_word, context = missing[index]
+                if result["error"] is None:
+                    data = {
+                        field: result[field]
+                        for field in (
+                            "infinitive",
+                            "transcription",
+                            "translations",
+                            "examples",
+                        )
+                    }
+                    await add(parsed_word, context, data)
+                else:
+                    logger.warning(f"'{parsed_word}' failed: {result['error']}")
+                    stats["failed"] += 1
+            print(
+                f"\r{stats['added']}/{len(entries)} words, {stats['failed']} failed",
+                end="",
+                file=sys.stderr,
+                flush=True,
+            )
+
+    try:
+        await asyncio.gather(*(worker() for _ in range(max(1, parallel))))
+    finally:
+        print(file=sys.stderr)
+
+    return stats
+
+
+async def run(args: argparse.Namespace) -> dict:
+    try:
+        return await build_pack(
+            args.input,
+            args.output,
+            args.source_lang,
+            args.target_lang,
+            args.limit,
+            args.rate,
+            args.parallel,
+        )
+    finally:
+        await main.llm_backend.aclose()
+
+
+def cli(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    logging.getLogger().setLevel(args.log_level.upper())
+    try:
+        stats = asyncio.run(run(args))
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    except KeyboardInterrupt:
+        print("Interrupted; run the same command again to resume.", file=sys.stderr)
+        return 130
+
+    print(
+        f"{stats['added']} words added, {stats['failed']} failed, "
+        f"{stats['skipped']} already in the pack ({stats['total']} in the list)."
+    )
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(cli())
@@ -0,0 +1,209 @@
+"""
+Process a word file offline, without the HTTP server.
+
+    uv run python -m backend.bulk words.txt -o result.csv
+
+The input holds one entry per line or comma-separated entries, with the same
+bracket rules as the web form. Results are appended to the output CSV as
+they finish, in the format scripts/csv_to_anki.py reads. The output doubles
+as the checkpoint: running the same command again skips every word already
+in it, so an interrupted run continues where it stopped. Words that failed
+are written to `<output>.errors.csv` and retried on the next run.
+"""
+
+import argparse
+import asyncio
+import csv
+import logging
+import os
+import sys
+import threading
+import time
+
+from backend import main
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Process a word file into a CSV for scripts/csv_to_anki.py."
+    )
+    parser.add_argument(
+        "input", help="Word file, one entry per line or comma-separated"
+    )
+    parser.add_argument("-o", "--output", required=True, help="Output CSV file")
+    parser.add_argument("--source-lang", default="English")
+    parser.add_argument("--target-lang", default="Russian")
+    parser.add_argument(
+        "--parallel",
+        type=int,
+        default=main.MAX_CONCURRENT_REQUESTS,
+        help="Chunks processed at once; model calls are still capped by "
+        "MAX_CONCURRENT_REQUESTS",
+    )
+    parser.add_argument("--log-level", default="WARNING")
+    return parser.parse_args(argv)
+
+
+def word_id(raw_word: str) -> str:
+    """The ID a result line ends with (see format_data_line)."""
+    return raw_word.strip().lower()
+
+
+def errors_path(output_path: str) -> str:
+    root, _ = os.path.splitext(output_path)
+    return root + ".errors.csv"
+
+
+def read_entries(input_path: str) -> list[main.WordEntry]:
+    """Entries of the input file, without repeated IDs."""
+    with open(input_path, "r", encoding="utf-8-sig") as f:
+        raw_words = main.split_word_list(f.read())
+
+    entries = []
+    seen = set()
+    for entry in main.build_word_entries(raw_words):
+        key = word_id(entry[0])
+        if key not in seen:
+            seen.add(key)
+            entries.append(entry)
+    return entries
+
+
+def read_checkpoint(output_path: str) -> set[str]:
+    """
+    IDs of the words already in the output.
+
+    A line cut off by an interruption is removed, so the file can be appended to.
+    """
+    if not os.path.exists(output_path):
+        return set()
+
+    with open(output_path, "rb+") as f:
+        content = f.read()
+        if content and not content.endswith(b"\n"):
+            keep = content.rfind(b"\n") + 1
+            logger.warning("Removing an incomplete last line from the output")
+            f.truncate(keep)
+            content = content[:keep]
+
+    done = set()
+    lines = content.decode("utf-8").splitlines()
+    for row in csv.reader(lines, delimiter=";"):
+        if row:
+            done.add(row[-1])
+    return done
+
+
+# Appends of concurrent workers are serialised
+append_lock = threading.Lock()
+
+
+def append_line(path: str, line: str) -> None:
+    """Append one line; closing the file keeps the checkpoint current."""
+    with append_lock, open(path, "a", encoding="utf-8") as f:
+        f.write(line + "\n")
+
+
+def clear_file(path: str) -> None:
+    with open(path, "w", encoding="utf-8"):
+        pass
+
+
+async def process_file(
+    input_path: str,
+    output_path: str,
+    source_lang: str,
+    target_lang: str,
+    parallel: int,
+) -> dict:
+    """Process every word of `input_path` not yet in `output_path`."""
+    # File work runs in threads to keep the event loop free for lookups
+    entries = await asyncio.to_thread(read_entries, input_path)
+    done_ids = await asyncio.to_thread(read_checkpoint, output_path)
+    pending = [entry for entry in entries if word_id(entry[0]) not in done_ids]
+    stats = {
+        "total": len(entries),
+        "skipped": len(entries) - len(pending),
+        "processed": 0,
+        "failed": 0,
+    }
+    if not pending:
+        return stats
+
+    chunks: asyncio.Queue[list[main.WordEntry]] = asyncio.Queue()
+    for i in range(0, len(pending), main.BATCH_SIZE):
+        chunks.put_nowait(pending[i : i + main.BATCH_SIZE])
+    started = time.monotonic()
+    errors_file = errors_path(output_path)
+    await asyncio.to_thread(clear_file, errors_file)
+
+    def report() -> None:
+        finished = stats["processed"] + stats["failed"]
+        rate = finished / max(time.monotonic() - started, 1e-9)
+        print(
+            f"\r{finished}/{len(pending)} words, {stats['failed']} failed, "
+            f"{rate:.1f} words/s",
+            end="",
+            file=sys.stderr,
+            flush=True,
+        )
+
+    async def worker() -> None:
+        while not chunks.empty():
+            chunk = chunks.get_nowait()
+            async for _, result in main.lookup_entries(chunk, source_lang, target_lang):
+                failed = result["error"] is not None
+                await asyncio.to_thread(
+                    append_line,
+                    errors_file if failed else output_path,
+                    main.format_result_line(result),
+                )
+                stats["failed" if failed else "processed"] += 1
+            report()
+
+    try:
+        await asyncio.gather(*(worker() for _ in range(max(1, parallel))))
+    finally:
+        print(file=sys.stderr)
+
+    if not stats["failed"]:
+        await asyncio.to_thread(os.remove, errors_file)
+    return stats
+
+
+async def run(args: argparse.Namespace) -> dict:
+    try:
+        return await process_file(
+            args.input,
+            args.output,
+            args.source_lang,
+            args.target_lang,
+            args.parallel,
+        )
+    finally:
+        await main.llm_backend.aclose()
+
+
+def cli(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    logging.getLogger().setLevel(args.log_level.upper())
+    try:
+        stats = asyncio.run(run(args))
+    except KeyboardInterrupt:
+        print("Interrupted; run the same command again to resume.", file=sys.stderr)
+        return 130
+
+    print(
+        f"{stats['processed']} words processed, {stats['failed']} failed, "
+        f"{stats['skipped']} already done ({stats['total']} in the input)."
+    )
+    if stats["failed"]:
+        print(f"Failed words: {errors_path(args.output)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(cli())
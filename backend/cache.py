@@ -0,0 +1,337 @@
+"""Persistent SQLite cache for processed word results."""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+
+from backend.interprocess import connect_sqlite
+
+logger = logging.getLogger(__name__)
+
+# Cache calls run on the event loop, so a worker rather misses the cache or
+# skips a write than stalls while another worker holds the write lock
+BUSY_TIMEOUT = 1.0
+# Bulk writes (loading packs, invalidation) are not on the request path
+BULK_BUSY_TIMEOUT = 30.0
+# Cache hits only note their access time; the notes are written with the next
+# write or prune, or once this many have piled up
+TOUCH_BATCH_SIZE = 100
+
+
+def make_cache_key(
+    parsed_word: str,
+    context: str | None,
+    source_lang: str,
+    target_lang: str,
+    model: str,
+    prompt_hash: str,
+) -> str:
+    """Build a stable cache key for a single word lookup."""
+    normalized = [
+        " ".join(parsed_word.lower().split()),
+        " ".join((context or "").lower().split()),
+        source_lang,
+        target_lang,
+        model,
+        prompt_hash,
+    ]
+    return hashlib.sha256(
+        json.dumps(normalized, ensure_ascii=False).encode("utf-8")
+    ).hexdigest()
+
+
+def hash_prompt(template: str) -> str:
+    """Short hash identifying a prompt template version."""
+    return hashlib.sha256(template.encode("utf-8")).hexdigest()[:16]
+
+
+class ResultCache:
+    """
+    SQLite-backed cache of parsed word data.
+
+    Entries expire after `ttl_seconds` (0 disables expiry) and the table is
+    trimmed to `max_entries` rows, dropping the least recently used first.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: int = 0,
+        max_entries: int = 0,
+        busy_timeout: float = BUSY_TIMEOUT,
+    ):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.busy_timeout = busy_timeout
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._writes_since_prune = 0
+        # key -> time of the last hit not yet written to accessed_at
+        self._touched: dict[str, float] = {}
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            # Shared by all worker processes
+            conn = connect_sqlite(self.path, timeout=self.busy_timeout)
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS results (
+                    key TEXT PRIMARY KEY,
+                    word TEXT NOT NULL,
+                    context TEXT,
+                    source_lang TEXT NOT NULL,
+                    target_lang TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    prompt_hash TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_results_accessed ON results (accessed_at)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    @contextmanager
+    def _writing(
+        self, conn: sqlite3.Connection, timeout: float | None = None
+    ) -> Iterator[None]:
+        """
+        Run the block as one transaction, after writing the buffered access
+        times. A failed transaction is rolled back, so later reads do not stay
+        on its snapshot. `timeout` lets the block wait longer for the lock.
+        """
+        if timeout is not None:
+            conn.execute(f"PRAGMA busy_timeout = {int(timeout * 1000)}")
+        try:
+            with conn:
+                if self._touched:
+                    conn.executemany(
+                        "UPDATE results SET accessed_at = ? WHERE key = ?",
+                        [(at, key) for key, at in self._touched.items()],
+                    )
+                yield
+            self._touched.clear()
+        finally:
+            if timeout is not None:
+                conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout * 1000)}")
+
+    def get(self, key: str) -> dict | None:
+        """Return cached data for `key`, or None on a miss or expired entry."""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT data, created_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            data, created_at = row
+            if self.ttl_seconds and now - created_at > self.ttl_seconds:
+                self._touched.pop(key, None)
+                with self._writing(conn):
+                    conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                return None
+
+            # A hit is a plain read; its access time is written later
+            self._touched[key] = now
+            if len(self._touched) >= TOUCH_BATCH_SIZE:
+                try:
+                    with self._writing(conn):
+                        pass
+                except sqlite3.OperationalError as e:
+                    # They stay buffered for the next write
+                    logger.debug(f"Deferring cache access times: {e}")
+
+        try:
+            return json.loads(data)
+        except json.JSONDecodeError:
+            logger.warning(f"Discarding corrupted cache entry {key}")
+            self.delete(key)
+            return None
+
+    def put(
+        self,
+        key: str,
+        data: dict,
+        word: str,
+        context: str | None,
+        source_lang: str,
+        target_lang: str,
+        model: str,
+        prompt_hash: str,
+    ) -> None:
+        """Store data for `key`, replacing any previous entry."""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            self._touched.pop(key, None)
+            with self._writing(conn):
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO results (
+                        key, word, context, source_lang, target_lang, model,
+                        prompt_hash, data, created_at, accessed_at
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (
+                        key,
+                        word,
+                        context,
+                        source_lang,
+                        target_lang,
+                        model,
+                        prompt_hash,
+                        json.dumps(data, ensure_ascii=False),
+                        now,
+                        now,
+                    ),
+                )
+            self._writes_since_prune += 1
+            # Pruning scans the table, so only do it every so often
+            if self._writes_since_prune >= 100:
+                self._prune_locked(now)
+
+    def put_many(self, rows: Iterable[tuple]) -> int:
+        """
+        Store many entries in one transaction, keeping entries already cached.
+        Each row holds the arguments of `put` in order. Returns the number of
+        entries added.
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            with self._writing(conn, BULK_BUSY_TIMEOUT):
+                # Expired entries make room for fresh ones instead of blocking them
+                if self.ttl_seconds:
+                    conn.execute(
+                        "DELETE FROM results WHERE created_at < ?",
+                        (now - self.ttl_seconds,),
+                    )
+                added = conn.executemany(
+                    """
+                    INSERT OR IGNORE INTO results (
+                        key, word, context, source_lang, target_lang, model,
+                        prompt_hash, data, created_at, accessed_at
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (
+                        (
+                            key,
+                            word,
+                            context,
+                            source_lang,
+                            target_lang,
+                            model,
+                            prompt_hash,
+                            json.dumps(data, ensure_ascii=False),
+                            now,
+                            now,
+                        )
+                        for (
+                            key,
+                            data,
+                            word,
+                            context,
+                            source_lang,
+                            target_lang,
+                            model,
+                            prompt_hash,
+                        ) in rows
+                    ),
+                ).rowcount
+        return added
+
+    def delete(self, key: str) -> None:
+        """Remove a single entry."""
+        with self._lock:
+            self._touched.pop(key, None)
+            conn = self._connect()
+            with self._writing(conn):
+                conn.execute("DELETE FROM results WHERE key = ?", (key,))
+
+    def invalidate(
+        self,
+        word: str | None = None,
+        source_lang: str | None = None,
+        target_lang: str | None = None,
+    ) -> int:
+        """Remove entries matching all given filters. No filters clears the cache."""
+        clauses = []
+        params = []
+        if word:
+            clauses.append("word = ?")
+            params.append(" ".join(word.lower().split()))
+        if source_lang:
+            clauses.append("source_lang = ?")
+            params.append(source_lang)
+        if target_lang:
+            clauses.append("target_lang = ?")
+            params.append(target_lang)
+
+        query = "DELETE FROM results"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+
+        with self._lock:
+            conn = self._connect()
+            with self._writing(conn, BULK_BUSY_TIMEOUT):
+                removed = conn.execute(query, params).rowcount
+        return removed
+
+    def prune(self) -> int:
+        """Drop expired entries and trim the cache to `max_entries`."""
+        with self._lock:
+            return self._prune_locked(time.time())
+
+    def _prune_locked(self, now: float) -> int:
+        conn = self._connect()
+        removed = 0
+        # Eviction goes by accessed_at, which _writing brings up to date first
+        with self._writing(conn):
+            if self.ttl_seconds:
+                removed += conn.execute(
+                    "DELETE FROM results WHERE created_at < ?",
+                    (now - self.ttl_seconds,),
+                ).rowcount
+            if self.max_entries:
+                removed += conn.execute(
+                    """
+                    DELETE FROM results WHERE key IN (
+                        SELECT key FROM results ORDER BY accessed_at DESC
+                        LIMIT -1 OFFSET ?
+                    )
+                    """,
+                    (self.max_entries,),
+                ).rowcount
+        self._writes_since_prune = 0
+        if removed:
+            logger.info(f"Pruned {removed} entries from result cache")
+        return removed
+
+    def __len__(self) -> int:
+        with self._lock:
+            conn = self._connect()
+            return conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    with self._writing(self._conn):
+                        pass
+                except sqlite3.OperationalError as e:
+                    logger.warning(f"Dropping unsaved cache access times: {e}")
+                self._conn.close()
+                self._conn = None
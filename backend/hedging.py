@@ -0,0 +1,121 @@
+"""Hedging of slow async calls to cut tail latency."""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from backend import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class Hedger:
+    """
+    Duplicates calls that run longer than most calls do.
+
+    The durations of recent successful calls are kept in a sliding window.
+    A call still running after the `percentile` of that window (and at least
+    `min_delay` seconds) gets a second attempt; whichever attempt succeeds
+    first is returned and the other one is cancelled. Every call adds `budget` to a
+    token bucket of at most `burst` tokens and every hedge takes one, so
+    hedges stay near `budget` of all calls even when the backend slows down
+    as a whole. Nothing is hedged until `min_samples` calls have succeeded.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 95,
+        budget: float = 0.05,
+        min_delay: float = 1.0,
+        min_samples: int = 20,
+        window: int = 200,
+        burst: float = 5,
+    ):
+        self.percentile = min(max(percentile, 0.0), 100.0)
+        self.budget = max(0.0, budget)
+        self.min_delay = max(0.0, min_delay)
+        self.min_samples = max(1, min_samples)
+        self.burst = max(1.0, burst)
+        self._durations: deque[float] = deque(maxlen=max(window, self.min_samples))
+        self._tokens = 0.0
+
+        # Metrics
+        self.calls = 0
+        self.fired = 0
+        self.wins = 0
+
+    def delay(self) -> float | None:
+        """Seconds after which a call is hedged, or None while still learning."""
+        if len(self._durations) < self.min_samples:
+            return None
+        ordered = sorted(self._durations)
+        index = min(len(ordered) - 1, int(len(ordered) * self.percentile / 100))
+        return max(self.min_delay, ordered[index])
+
+    def stats(self) -> dict:
+        return {
+            "percentile": self.percentile,
+            "budget": self.budget,
+            "delay_seconds": self.delay(),
+            "calls": self.calls,
+            "hedges_fired": self.fired,
+            "hedge_wins": self.wins,
+        }
+
+    async def run(
+        self,
+        call: Callable[[], Awaitable[Any]],
+        hedge: Callable[[], Awaitable[Any]] | None = None,
+    ) -> Any:
+        """
+        Await `call()`, starting `hedge()` (by default `call()` again) if it
+        is slow. Errors are not hedged: a failed attempt only raises once the
+        other attempt, if any, has failed too.
+        """
+        self.calls += 1
+        self._tokens = min(self.burst, self._tokens + self.budget)
+        delay = self.delay()
+
+        started = time.monotonic()
+        primary = asyncio.ensure_future(call())
+        primary.add_done_callback(lambda task: self._record(task, started))
+        attempts = [primary]
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait(attempts, timeout=delay)
+                if not done and self._tokens >= 1:
+                    self._tokens -= 1
+                    self.fired += 1
+                    metrics.HEDGED_CALLS.inc()
+                    logger.info(f"Call still running after {delay:.1f}s, hedging it")
+                    attempts.append(asyncio.ensure_future((hedge or call)()))
+
+            error = None
+            pending = set(attempts)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                # Prefer the primary when both attempts finished together
+                for attempt in sorted(done, key=attempts.index):
+                    if attempt.exception() is None:
+                        if attempt is not primary:
+                            self.wins += 1
+                            metrics.HEDGE_WINS.inc()
+                        return attempt.result()
+                    error = error or attempt.exception()
+            raise error
+        finally:
+            for attempt in attempts:
+                if not attempt.done():
+                    attempt.cancel()
+
+    def _record(self, primary: asyncio.Future, started: float) -> None:
+        # Only a primary that succeeded shows how long a call takes: failed
+        # attempts and cancelled ones (a hedge is cancelled right after the
+        # primary wins) would pull the percentile down
+        if not primary.cancelled() and primary.exception() is None:
+            self._durations.append(time.monotonic() - started)
@@ -0,0 +1,143 @@
+"""Coordination between backend worker processes on the same machine."""
+
+import asyncio
+import logging
+import os
+import random
+import sqlite3
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+LOCKING_SUPPORTED = fcntl is not None
+
+
+def try_lock_file(path: str) -> int | None:
+    """
+    Take an exclusive lock on `path` without waiting.
+
+    Returns the open file descriptor holding the lock, or None if someone else
+    holds it. The lock is released by release_lock_file or when the process
+    exits. Where file locking is unsupported every call succeeds.
+    """
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    if fcntl is None:
+        return fd
+    try:
+        # flock locks belong to the open file, so they also exclude other
+        # descriptors of the same process
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        os.close(fd)
+        return None
+    return fd
+
+
+def release_lock_file(fd: int) -> None:
+    os.close(fd)
+
+
+def connect_sqlite(path: str, timeout: float = 30.0) -> sqlite3.Connection:
+    """
+    Open a SQLite database in WAL mode that several processes may use at once.
+
+    Switching to WAL needs a moment of exclusive access and fails right away
+    with "database is locked" instead of waiting, so it is retried here.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=timeout, check_same_thread=False)
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            return conn
+        except sqlite3.OperationalError as e:
+            if "locked" not in str(e) or time.monotonic() > deadline:
+                conn.close()
+                raise
+            time.sleep(random.uniform(0.01, 0.05))
+
+
+class SharedSlots:
+    """
+    A concurrency budget shared by every process using the same directory.
+
+    Each slot is a lock file; holding its lock holds the slot. Slots of a
+    crashed process are freed by the operating system.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        size: int,
+        poll_interval: float = 0.02,
+        max_poll_interval: float = 0.5,
+    ):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.size = max(1, size)
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self._paths = [
+            os.path.join(directory, f"slot-{i}.lock") for i in range(self.size)
+        ]
+        if not LOCKING_SUPPORTED:
+            logger.warning(
+                "File locking is not supported here; shared slots do not limit anything"
+            )
+
+    def try_acquire(self) -> int | None:
+        # Start at a random slot so processes don't all probe slot 0 first
+        start = random.randrange(self.size)
+        for i in range(self.size):
+            fd = try_lock_file(self._paths[(start + i) % self.size])
+            if fd is not None:
+                return fd
+        return None
+
+    async def acquire(self) -> int:
+        """Wait for a free slot, polling with jittered exponential backoff."""
+        delay = self.poll_interval
+        while True:
+            fd = self.try_acquire()
+            if fd is not None:
+                return fd
+            await asyncio.sleep(random.uniform(delay / 2, delay))
+            delay = min(delay * 2, self.max_poll_interval)
+
+    def release(self, fd: int) -> None:
+        release_lock_file(fd)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one shared slot for the duration of the block."""
+        fd = await self.acquire()
+        try:
+            yield
+        finally:
+            self.release(fd)
+
+    def in_use(self) -> int:
+        """Number of slots currently held by any process."""
+        if not LOCKING_SUPPORTED:
+            return 0
+        used = 0
+        for path in self._paths:
+            fd = try_lock_file(path)
+            if fd is None:
+                used += 1
+            else:
+                release_lock_file(fd)
+        return used
+
+    def stats(self) -> dict:
+        return {"size": self.size, "in_use": self.in_use()}
@@ -0,0 +1,220 @@
+"""Persistent SQLite store for large word-list jobs."""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+
+from backend.interprocess import connect_sqlite
+
+logger = logging.getLogger(__name__)
+
+# Job states; "queued" and "running" jobs are resumed after a restart
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+UNFINISHED = (QUEUED, RUNNING)
+
+
+class JobStore:
+    """
+    Jobs, their words and the results produced so far.
+
+    Every finished word is committed as soon as it is recorded, so a job
+    interrupted by a restart continues with the words that are still pending.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            # Shared by all worker processes
+            conn = connect_sqlite(self.path)
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    source_lang TEXT NOT NULL,
+                    target_lang TEXT NOT NULL,
+                    total INTEGER NOT NULL,
+                    done INTEGER NOT NULL DEFAULT 0,
+                    errors INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS job_words (
+                    job_id TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    raw_word TEXT NOT NULL,
+                    parsed_word TEXT NOT NULL,
+                    context TEXT,
+                    done INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (job_id, position)
+                );
+                CREATE TABLE IF NOT EXISTS job_results (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    job_id TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    result TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_job_results_job
+                    ON job_results (job_id, seq);
+                """
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def create(
+        self,
+        entries: list[tuple[str, str, str | None]],
+        source_lang: str,
+        target_lang: str,
+    ) -> str:
+        """Store a new job of (raw_word, parsed_word, context) entries."""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                """
+                INSERT INTO jobs (
+                    id, status, source_lang, target_lang, total, created_at, updated_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (job_id, QUEUED, source_lang, target_lang, len(entries), now, now),
+            )
+            conn.executemany(
+                """
+                INSERT INTO job_words (job_id, position, raw_word, parsed_word, context)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                [
+                    (job_id, position, raw_word, parsed_word, context)
+                    for position, (raw_word, parsed_word, context) in enumerate(entries)
+                ],
+            )
+            conn.commit()
+        return job_id
+
+    def get(self, job_id: str) -> dict | None:
+        """Status and progress of a job, or None if it does not exist."""
+        with self._lock:
+            row = (
+                self._connect()
+                .execute(
+                    """
+                    SELECT id, status, source_lang, target_lang, total, done, errors,
+                           created_at, updated_at
+                    FROM jobs WHERE id = ?
+                    """,
+                    (job_id,),
+                )
+                .fetchone()
+            )
+        if row is None:
+            return None
+        keys = (
+            "id",
+            "status",
+            "source_lang",
+            "target_lang",
+            "total",
+            "done",
+            "errors",
+            "created_at",
+            "updated_at",
+        )
+        return dict(zip(keys, row))
+
+    def set_status(self, job_id: str, status: str) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE id = ?",
+                (status, time.time(), job_id),
+            )
+            conn.commit()
+
+    def pending_words(self, job_id: str) -> list[tuple[int, str, str, str | None]]:
+        """(position, raw_word, parsed_word, context) of words without a result."""
+        with self._lock:
+            return (
+                self._connect()
+                .execute(
+                    """
+                    SELECT position, raw_word, parsed_word, context FROM job_words
+                    WHERE job_id = ? AND done = 0 ORDER BY position
+                    """,
+                    (job_id,),
+                )
+                .fetchall()
+            )
+
+    def record_result(self, job_id: str, position: int, result: dict) -> None:
+        """Store the result of one word and advance the job's progress."""
+        failed = 1 if result.get("error") is not None else 0
+        with self._lock:
+            conn = self._connect()
+            updated = conn.execute(
+                "UPDATE job_words SET done = 1 "
+                "WHERE job_id = ? AND position = ? AND done = 0",
+                (job_id, position),
+            ).rowcount
+            if not updated:
+                return
+            conn.execute(
+                "INSERT INTO job_results (job_id, position, result) VALUES (?, ?, ?)",
+                (job_id, position, json.dumps(result, ensure_ascii=False)),
+            )
+            conn.execute(
+                """
+                UPDATE jobs SET done = done + 1, errors = errors + ?, updated_at = ?
+                WHERE id = ?
+                """,
+                (failed, time.time(), job_id),
+            )
+            conn.commit()
+
+    def results(self, job_id: str, offset: int = 0, limit: int = -1) -> list[dict]:
+        """Results in the order they were recorded, skipping the first `offset`."""
+        with self._lock:
+            rows = (
+                self._connect()
+                .execute(
+                    """
+                    SELECT result FROM job_results WHERE job_id = ?
+                    ORDER BY seq LIMIT ? OFFSET ?
+                    """,
+                    (job_id, limit, offset),
+                )
+                .fetchall()
+            )
+        return [json.loads(result) for (result,) in rows]
+
+    def unfinished(self) -> list[str]:
+        """IDs of jobs that were queued or running, oldest first."""
+        with self._lock:
+            rows = (
+                self._connect()
+                .execute(
+                    "SELECT id FROM jobs WHERE status IN (?, ?) ORDER BY created_at",
+                    UNFINISHED,
+                )
+                .fetchall()
+            )
+        return [job_id for (job_id,) in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,172 @@
+"""Locating and locally repairing JSON in free-form model output."""
+
+import json
+import re
+
+# Openers tried per candidate text before giving up on it
+MAX_START_POSITIONS = 20
+
+# Earlier cut points tried when a truncated value does not parse after closing
+MAX_TRUNCATION_CUTS = 10
+
+FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)(?:```|$)", re.DOTALL | re.IGNORECASE)
+
+# Typographic opening quotes and the quote that closes them; "”" always closes
+SMART_DOUBLE_QUOTES = {"“": "”", "„": "“", "”": "”"}
+
+# Raw control characters that are only valid escaped inside JSON strings
+CONTROL_ESCAPES = {"\n": "\\n", "\r": "\\r", "\t": "\\t"}
+
+CLOSERS = {"{": "}", "[": "]"}
+
+_decoder = json.JSONDecoder()
+
+
+def _strip_trailing_comma(out: list[str]) -> None:
+    """Drop a comma (and the whitespace after it) at the end of `out`."""
+    i = len(out) - 1
+    while i >= 0 and out[i].isspace():
+        i -= 1
+    if i >= 0 and out[i] == ",":
+        del out[i:]
+
+
+def _close(out: list[str], stack: list[str]) -> str:
+    """Text of `out` with a dangling comma or colon fixed and containers closed."""
+    out = list(out)
+    _strip_trailing_comma(out)
+    text = "".join(out).rstrip()
+    if text.endswith(":"):
+        text += " null"
+    return text + "".join(reversed(stack))
+
+
+def _scan(text: str, start: int) -> tuple[str, list[str]]:
+    """
+    Walk one JSON value starting at the opener `text[start]`.
+
+    Returns the value text with smart-quote delimiters and trailing commas
+    fixed. If the input ends before the value is closed, the returned text is
+    closed and the list holds earlier, shorter closings to fall back to.
+    """
+    out: list[str] = []
+    stack: list[str] = []
+    # (length of out, open containers) at every comma, newest last
+    cuts: list[tuple[int, tuple[str, ...]]] = []
+    string_end = None  # closing delimiter of the string being read
+    escaped = False
+
+    for ch in text[start:]:
+        if string_end is not None:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == string_end or (string_end != '"' and ch == "”"):
+                out.append('"')
+                string_end = None
+                continue
+            elif ch == '"':
+                # A plain quote inside a smart-quoted string
+                out.append('\\"')
+                continue
+            out.append(CONTROL_ESCAPES.get(ch, ch))
+            continue
+
+        if ch == '"':
+            string_end = '"'
+            out.append(ch)
+        elif ch in SMART_DOUBLE_QUOTES:
+            string_end = SMART_DOUBLE_QUOTES[ch]
+            out.append('"')
+        elif ch in CLOSERS:
+            stack.append(CLOSERS[ch])
+            out.append(ch)
+        elif ch in "}]":
+            _strip_trailing_comma(out)
+            if not stack or stack[-1] != ch:
+                break
+            stack.pop()
+            out.append(ch)
+            if not stack:
+                return "".join(out), []
+        elif ch == ",":
+            cuts.append((len(out), tuple(stack)))
+            out.append(ch)
+        else:
+            out.append(ch)
+
+    # Truncated (or mismatched) value: close whatever is open
+    if string_end is not None:
+        if escaped:
+            out.pop()
+        out.append('"')
+    fallbacks = [
+        _close(out[:length], list(open_stack))
+        for length, open_stack in reversed(cuts[-MAX_TRUNCATION_CUTS:])
+    ]
+    return _close(out, stack), fallbacks
+
+
+def _decode_at(text: str, start: int, container: type) -> tuple[object, bool] | None:
+    """Decode the value starting at `start`, repairing it if needed."""
+    try:
+        value, _ = _decoder.raw_decode(text, start)
+        if isinstance(value, container):
+            return value, False
+    except json.JSONDecodeError:
+        pass
+
+    repaired, cuts = _scan(text, start)
+    for candidate in [repaired, *cuts]:
+        try:
+            value = json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+        # An opener followed by nothing usable ("Sure! {") is not an answer
+        if isinstance(value, container) and value:
+            return value, True
+    return None
+
+
+def intact_objects(text: str) -> list[dict]:
+    """Every JSON object in `text` that decodes as is, nested ones included."""
+    objects = []
+    start = text.find("{")
+    while start != -1:
+        try:
+            value, _ = _decoder.raw_decode(text, start)
+        except json.JSONDecodeError:
+            pass
+        else:
+            if isinstance(value, dict):
+                objects.append(value)
+        start = text.find("{", start + 1)
+    return objects
+
+
+def extract_json(text: str, container: type = dict) -> tuple[object, bool]:
+    """
+    Find the first JSON object (or array, with `container=list`) in `text`.
+
+    Markdown fences are looked into first. A value that does not decode as is
+    gets a deterministic repair pass: smart quotes used as delimiters, trailing
+    commas and truncated output are fixed. Returns the value and whether it had
+    to be repaired; raises ValueError if nothing usable is found.
+    """
+    opener = "[" if container is list else "{"
+    candidates = [m.group(1) for m in FENCE_RE.finditer(text)]
+    candidates.append(text)
+
+    for candidate in candidates:
+        start = candidate.find(opener)
+        tried = 0
+        while start != -1 and tried < MAX_START_POSITIONS:
+            result = _decode_at(candidate, start, container)
+            if result is not None:
+                return result
+            tried += 1
+            start = candidate.find(opener, start + 1)
+
+    kind = "array" if container is list else "object"
+    raise ValueError(f"No JSON {kind} found in output")
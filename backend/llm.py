@@ -0,0 +1,524 @@
+"""Interchangeable backends for sending prompts to the model."""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import signal
+import time
+
+import httpx
+
+from backend import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class LLMError(Exception):
+    """Base class for model backend errors."""
+
+
+class LLMNotFoundError(LLMError):
+    """The backend is not installed or not configured."""
+
+
+class LLMTimeoutError(LLMError):
+    """The model did not answer in time."""
+
+
+class LLMResponseError(LLMError):
+    """
+    The model call failed.
+
+    `kind` is one of "auth", "network", "capacity" or "error" and lets callers
+    react without knowing the backend; `stdout` keeps any partial output.
+    """
+
+    def __init__(self, message: str, kind: str = "error", stdout: str = ""):
+        super().__init__(message)
+        self.kind = kind
+        self.stdout = stdout
+
+
+def classify_error(text: str) -> str:
+    """Map an error message from the model to an LLMResponseError kind."""
+    text = text.lower()
+    if "auth" in text:
+        return "auth"
+    if any(kw in text for kw in ["connection", "network"]):
+        return "network"
+    if "capacity" in text:
+        return "capacity"
+    return "error"
+
+
+class LLMBackend:
+    """Interface implemented by all model backends."""
+
+    name = "base"
+
+    async def generate(self, prompt: str) -> str:
+        """Send a prompt and return the raw text answer."""
+        raise NotImplementedError
+
+    async def aclose(self) -> None:
+        """Release resources held by the backend."""
+
+
+class GeminiCLIBackend(LLMBackend):
+    """Runs `gemini -m MODEL -p PROMPT` for every prompt."""
+
+    name = "cli"
+
+    def __init__(self, model: str, timeout: float):
+        self.model = model
+        self.timeout = timeout
+
+    async def generate(self, prompt: str) -> str:
+        command = ["gemini", "-m", self.model, "-p", prompt]
+        spawn_started = time.monotonic()
+        try:
+            # A new session makes the CLI and its children one process group
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                start_new_session=True,
+            )
+        except FileNotFoundError:
+            raise LLMNotFoundError("gemini-cli not found")
+        metrics.SUBPROCESS_SPAWN_SECONDS.observe(
+            time.monotonic() - spawn_started, model=self.model
+        )
+
+        try:
+            stdout, stderr = await asyncio.wait_for(
+                process.communicate(), timeout=self.timeout
+            )
+        except asyncio.TimeoutError:
+            await _kill_process_group(process)
+            raise LLMTimeoutError(f"gemini-cli timed out after {self.timeout}s")
+        except asyncio.CancelledError:
+            # The caller went away; don't leave the CLI running
+            await _kill_process_group(process)
+            raise
+
+        stdout = stdout.decode("utf-8", errors="replace")
+        if process.returncode != 0:
+            stderr = stderr.decode("utf-8", errors="replace")
+            logger.error(f"gemini-cli failed: {stderr}")
+            raise LLMResponseError(
+                "Error executing gemini-cli command",
+                kind=classify_error(stderr),
+                stdout=stdout,
+            )
+        return stdout
+
+
+async def _kill_process_group(process: asyncio.subprocess.Process) -> None:
+    """Kill a subprocess started in its own session, with all its children."""
+    if process.returncode is not None:
+        return
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+    except AttributeError:
+        # No process groups on this platform
+        process.kill()
+    # Reap the process so it does not linger as a zombie
+    await asyncio.shield(process.wait())
+
+
+class GeminiHTTPBackend(LLMBackend):
+    """Calls the Gemini REST API over a pooled keep-alive HTTP client."""
+
+    name = "http"
+
+    def __init__(
+        self,
+        model: str,
+        timeout: float,
+        api_key: str,
+        base_url: str = "https://generativelanguage.googleapis.com",
+        max_connections: int = 10,
+    ):
+        self.model = model
+        self.timeout = timeout
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.max_connections = max_connections
+        self._client: httpx.AsyncClient | None = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                headers={"x-goog-api-key": self.api_key},
+            )
+        return self._client
+
+    async def generate(self, prompt: str) -> str:
+        if not self.api_key:
+            raise LLMNotFoundError("GEMINI_API_KEY is not set")
+
+        try:
+            response = await self._get_client().post(
+                f"/v1beta/models/{self.model}:generateContent",
+                json={"contents": [{"parts": [{"text": prompt}]}]},
+            )
+        except httpx.TimeoutException:
+            raise LLMTimeoutError(f"Gemini API timed out after {self.timeout}s")
+        except httpx.TransportError as e:
+            raise LLMResponseError(f"Connection to Gemini API failed: {e}", "network")
+
+        if response.status_code == 429:
+            raise LLMResponseError("Gemini API capacity exhausted", "capacity")
+        if response.status_code in (401, 403):
+            raise LLMResponseError("Gemini API authorization failed", "auth")
+        if response.status_code >= 400:
+            logger.error(f"Gemini API error {response.status_code}: {response.text}")
+            raise LLMResponseError(f"Gemini API returned {response.status_code}")
+
+        try:
+            candidates = response.json().get("candidates", [])
+            parts = candidates[0]["content"]["parts"]
+            return "".join(part.get("text", "") for part in parts)
+        except (ValueError, KeyError, IndexError, TypeError):
+            raise LLMResponseError(
+                "Unexpected Gemini API response", stdout=response.text
+            )
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class StubBackend(LLMBackend):
+    """
+    Deterministic offline backend for tests and benchmarks.
+
+    Answers are derived from the words found in the prompt, so the same prompt
+    always produces the same output, after `latency` seconds.
+    """
+
+    name = "stub"
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+
+    async def generate(self, prompt: str) -> str:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return stub_response(prompt)
+
+
+# Longest reply line accepted from a pool worker (batch answers can be large)
+POOL_MAX_LINE = 16 * 1024 * 1024
+
+# Seconds a worker gets to answer a health check
+POOL_PING_TIMEOUT = 10.0
+
+# Seconds a recycled worker gets to exit after its stdin is closed
+POOL_EXIT_GRACE = 5.0
+
+
+class _PoolWorker:
+    """One long-lived worker process and its JSON-lines channel."""
+
+    def __init__(self, process: asyncio.subprocess.Process):
+        self.process = process
+        self.jobs = 0
+        self._last_id = 0
+
+    async def request(self, message: dict, timeout: float) -> dict:
+        """
+        Send one request and wait for the reply with the same ID.
+        Raises ConnectionError if the worker is gone or answers garbage.
+        """
+        self._last_id += 1
+        request_id = self._last_id
+        line = json.dumps({**message, "id": request_id}, ensure_ascii=False)
+        try:
+            self.process.stdin.write(line.encode("utf-8") + b"\n")
+            await self.process.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError, AttributeError) as e:
+            raise ConnectionError(f"Pool worker is gone: {e}")
+        return await asyncio.wait_for(self._read_reply(request_id), timeout)
+
+    async def _read_reply(self, request_id: int) -> dict:
+        while True:
+            try:
+                line = await self.process.stdout.readline()
+            except ValueError as e:
+                raise ConnectionError(f"Pool worker reply is too long: {e}")
+            if not line:
+                raise ConnectionError("Pool worker exited")
+            try:
+                reply = json.loads(line)
+            except ValueError:
+                raise ConnectionError(f"Pool worker sent garbage: {line[:200]!r}")
+            if reply.get("id") == request_id:
+                return reply
+
+
+class WorkerPoolBackend(LLMBackend):
+    """
+    Sends prompts to a pool of long-lived worker processes.
+
+    Workers talk JSON lines over stdin/stdout (see backend/pool_worker.py),
+    so their startup and authentication are paid once instead of per prompt.
+    Each worker handles one prompt at a time. Workers are started up front,
+    health-checked every `health_interval` seconds, replaced after
+    `max_jobs` prompts (0 never) and restarted when they crash or time out.
+    """
+
+    name = "pool"
+
+    def __init__(
+        self,
+        command: list[str],
+        size: int,
+        timeout: float,
+        max_jobs: int = 100,
+        health_interval: float = 30.0,
+        cwd: str | None = None,
+    ):
+        self.command = command
+        self.size = max(1, size)
+        self.timeout = timeout
+        self.max_jobs = max_jobs
+        self.health_interval = health_interval
+        self.cwd = cwd
+        self._workers: set[_PoolWorker] = set()
+        self._idle: list[_PoolWorker] = []
+        self._slots: asyncio.Semaphore | None = None
+        self._health_task: asyncio.Task | None = None
+        self.restarts = 0
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "workers": len(self._workers),
+            "idle": len(self._idle),
+            "restarts": self.restarts,
+        }
+
+    def _ensure_started(self) -> None:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.size)
+        if self._health_task is None or self._health_task.done():
+            self._health_task = asyncio.create_task(self._maintain())
+
+    async def _start_worker(self) -> _PoolWorker:
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *self.command,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                cwd=self.cwd,
+                start_new_session=True,
+                limit=POOL_MAX_LINE,
+            )
+        except FileNotFoundError:
+            raise LLMNotFoundError(f"Pool worker command not found: {self.command[0]}")
+
+        worker = _PoolWorker(process)
+        self._workers.add(worker)
+        try:
+            # Answering a ping means the worker has finished booting
+            await worker.request({"ping": True}, POOL_PING_TIMEOUT)
+        except (ConnectionError, asyncio.TimeoutError) as e:
+            await self._stop(worker, "startup")
+            raise LLMResponseError(f"Pool worker failed to start: {e}")
+        logger.debug(f"Started pool worker {process.pid}")
+        return worker
+
+    async def _stop(self, worker: _PoolWorker, reason: str) -> None:
+        """Stop a worker; `reason` is recorded unless it is a normal shutdown."""
+        self._workers.discard(worker)
+        if reason != "shutdown":
+            self.restarts += 1
+            metrics.POOL_WORKER_EXITS.inc(reason=reason)
+            logger.info(f"Replacing pool worker {worker.process.pid} ({reason})")
+
+        if reason in ("recycle", "shutdown") and worker.process.stdin is not None:
+            # Let the worker finish cleanly before resorting to a kill
+            worker.process.stdin.close()
+            try:
+                await asyncio.wait_for(
+                    asyncio.shield(worker.process.wait()), POOL_EXIT_GRACE
+                )
+            except asyncio.TimeoutError:
+                pass
+        await _kill_process_group(worker.process)
+
+    async def _take(self) -> _PoolWorker:
+        """Wait for a slot and return an idle worker, starting one if needed."""
+        await self._slots.acquire()
+        try:
+            if self._idle:
+                return self._idle.pop()
+            return await self._start_worker()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _give_back(self, worker: _PoolWorker) -> None:
+        self._idle.append(worker)
+        self._slots.release()
+
+    async def generate(self, prompt: str) -> str:
+        self._ensure_started()
+        # A crashed worker is replaced and the prompt sent once more
+        for attempt in range(2):
+            worker = await self._take()
+            try:
+                reply = await worker.request({"prompt": prompt}, self.timeout)
+            except asyncio.TimeoutError:
+                await self._stop(worker, "timeout")
+                self._slots.release()
+                raise LLMTimeoutError(f"Pool worker timed out after {self.timeout}s")
+            except ConnectionError as e:
+                await self._stop(worker, "crash")
+                self._slots.release()
+                if attempt == 0:
+                    continue
+                raise LLMResponseError(str(e))
+            except asyncio.CancelledError:
+                # Its reply would arrive late and out of turn; start afresh
+                await self._stop(worker, "cancelled")
+                self._slots.release()
+                raise
+
+            worker.jobs += 1
+            if self.max_jobs and worker.jobs >= self.max_jobs:
+                await self._stop(worker, "recycle")
+                self._slots.release()
+            else:
+                self._give_back(worker)
+            return _unpack_reply(reply)
+
+    async def _maintain(self) -> None:
+        """Keep the pool full of healthy workers until cancelled."""
+        while True:
+            await self.check_workers()
+            await asyncio.sleep(self.health_interval)
+
+    async def check_workers(self) -> None:
+        """Ping idle workers, replace unhealthy ones and start missing ones."""
+        for worker in list(self._idle):
+            # Only workers that are still idle and have a free slot are checked
+            if worker not in self._idle or self._slots.locked():
+                continue
+            await self._slots.acquire()
+            self._idle.remove(worker)
+            try:
+                await worker.request({"ping": True}, POOL_PING_TIMEOUT)
+            except (ConnectionError, asyncio.TimeoutError):
+                await self._stop(worker, "health")
+                self._slots.release()
+            else:
+                self._give_back(worker)
+
+        while len(self._workers) < self.size and not self._slots.locked():
+            await self._slots.acquire()
+            try:
+                worker = await self._start_worker()
+            except LLMError as e:
+                self._slots.release()
+                logger.warning(f"Could not start a pool worker: {e}")
+                return
+            self._give_back(worker)
+
+    async def aclose(self) -> None:
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
+        await asyncio.gather(
+            *(self._stop(worker, "shutdown") for worker in list(self._workers))
+        )
+        self._idle.clear()
+
+
+def _unpack_reply(reply: dict) -> str:
+    """Output of a worker reply, or the matching LLMError."""
+    if "error" not in reply:
+        return reply.get("output", "")
+    kind = reply.get("kind", "error")
+    if kind == "not_found":
+        raise LLMNotFoundError(reply["error"])
+    if kind == "timeout":
+        raise LLMTimeoutError(reply["error"])
+    raise LLMResponseError(reply["error"], kind=kind, stdout=reply.get("stdout", ""))
+
+
+def _stub_entry(word: str) -> dict:
+    digest = hashlib.sha256(word.encode("utf-8")).hexdigest()[:6]
+    return {
+        "infinitive": word,
+        "transcription": f"[{word}]",
+        "translations": [f"{word}-{digest}"],
+        "examples": [
+            {"source": f"An example with #{word}#.", "translation": f"#{digest}#."}
+        ],
+    }
+
+
+def stub_response(prompt: str) -> str:
+    """Build the deterministic answer the stub backend gives to a prompt."""
+    # Batch prompts list numbered entries
+    entries = re.findall(r'^(\d+)\. "(.*?)"', prompt, re.MULTILINE)
+    if entries:
+        items = [dict(_stub_entry(word), id=int(i)) for i, word in entries]
+        return json.dumps(items, ensure_ascii=False)
+
+    match = re.search(r'word/phrase "(.*?)"', prompt)
+    word = match.group(1) if match else "stub"
+    return json.dumps(_stub_entry(word), ensure_ascii=False)
+
+
+def create_backend(
+    name: str,
+    model: str,
+    timeout: float,
+    api_key: str = "",
+    base_url: str = "https://generativelanguage.googleapis.com",
+    max_connections: int = 10,
+    stub_latency: float = 0.0,
+    pool_command: list[str] | None = None,
+    pool_size: int = 5,
+    pool_max_jobs: int = 100,
+    pool_health_interval: float = 30.0,
+    pool_cwd: str | None = None,
+) -> LLMBackend:
+    """Instantiate the backend selected by name ("cli", "http", "pool" or "stub")."""
+    if name == "cli":
+        return GeminiCLIBackend(model, timeout)
+    if name == "http":
+        return GeminiHTTPBackend(model, timeout, api_key, base_url, max_connections)
+    if name == "pool":
+        if not pool_command:
+            raise ValueError("The pool backend needs a worker command")
+        return WorkerPoolBackend(
+            pool_command,
+            pool_size,
+            timeout,
+            max_jobs=pool_max_jobs,
+            health_interval=pool_health_interval,
+            cwd=pool_cwd,
+        )
+    if name == "stub":
+        return StubBackend(stub_latency)
+    raise ValueError(f"Unknown LLM backend: {name}")
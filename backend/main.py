@@ -1,23 +1,59 @@
 """Word processing API using Gemini CLI."""
 
 import os
-import subprocess
 import asyncio
 import json
 import logging
 import re
-from typing import AsyncGenerator
-
-from fastapi.concurrency import run_in_threadpool
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import StreamingResponse
+import shlex
+import sys
+import time
+import uuid
+from contextlib import asynccontextmanager, contextmanager, nullcontext
+from collections import deque
+from collections.abc import AsyncIterator, Callable, Iterator
+from contextvars import ContextVar
+from typing import Annotated, AsyncGenerator, Literal
+
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 
+from backend import metrics
+from backend.cache import ResultCache, make_cache_key
+from backend.hedging import Hedger
+from backend import jobs
+from backend.interprocess import SharedSlots, release_lock_file, try_lock_file
+from backend.jobs import JobStore
+from backend.json_repair import extract_json, intact_objects
+from backend.llm import (
+    LLMError,
+    LLMNotFoundError,
+    LLMResponseError,
+    LLMTimeoutError,
+    WorkerPoolBackend,
+    create_backend,
+)
+from backend.packs import load_packs
+from backend.prompt_registry import CompiledTemplate, PromptRegistry
+from backend.scheduler import (
+    BULK,
+    INTERACTIVE,
+    LANES,
+    FairScheduler,
+    backoff_delay,
+    current_client,
+    current_lane,
+)
+from backend.singleflight import SingleFlight
+
 # Configuration
 GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
 MAX_WORDS_PER_REQUEST = 50
 COMMAND_TIMEOUT = 120
+# Seconds between client disconnect checks while no word has finished
+DISCONNECT_CHECK_INTERVAL = 1.0
 LOG_LEVEL_STR = os.getenv("LOG_LEVEL", "INFO").upper()
 
 try:
@@ -25,10 +61,180 @@ try:
 except ValueError:
     MAX_CONCURRENT_REQUESTS = 5
 
+# Lower the concurrency limit on capacity errors/timeouts and raise it back
+# while calls succeed (AIMD), never going below MIN_CONCURRENT_REQUESTS
+ADAPTIVE_CONCURRENCY = os.getenv("ADAPTIVE_CONCURRENCY", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+
+try:
+    MIN_CONCURRENT_REQUESTS = int(os.getenv("MIN_CONCURRENT_REQUESTS", "1"))
+except ValueError:
+    MIN_CONCURRENT_REQUESTS = 1
+
+# Requests of up to INTERACTIVE_MAX_WORDS words go in the interactive lane,
+# ahead of larger ones. Bulk work uses all capacity interactive requests leave
+# unused, unless INTERACTIVE_RESERVED_SLOTS slots are kept free for them
+try:
+    INTERACTIVE_MAX_WORDS = int(os.getenv("INTERACTIVE_MAX_WORDS", "3"))
+except ValueError:
+    INTERACTIVE_MAX_WORDS = 3
+
+try:
+    INTERACTIVE_RESERVED_SLOTS = int(os.getenv("INTERACTIVE_RESERVED_SLOTS", "0"))
+except ValueError:
+    INTERACTIVE_RESERVED_SLOTS = 0
+
+# Retry backoff: the n-th retry waits a random time up to
+# min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2**n) seconds
+try:
+    RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", "1"))
+except ValueError:
+    RETRY_BASE_DELAY = 1.0
+
+try:
+    RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "30"))
+except ValueError:
+    RETRY_MAX_DELAY = 30.0
+
+# How many times a word hit by a capacity error goes back into the queue
+try:
+    MAX_CAPACITY_REQUEUES = int(os.getenv("MAX_CAPACITY_REQUEUES", "5"))
+except ValueError:
+    MAX_CAPACITY_REQUEUES = 5
+
+# Model backend: "cli" (gemini-cli subprocess), "http" (Gemini REST API),
+# "pool" (long-lived worker processes) or "stub"
+LLM_BACKEND = os.getenv("LLM_BACKEND", "cli").lower()
+GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
+GEMINI_API_BASE = os.getenv(
+    "GEMINI_API_BASE", "https://generativelanguage.googleapis.com"
+)
+
+try:
+    STUB_LATENCY_MS = int(os.getenv("STUB_LATENCY_MS", "0"))
+except ValueError:
+    STUB_LATENCY_MS = 0
+
+# Worker pool for LLM_BACKEND=pool. The bundled worker has no default
+# backend (see backend/pool_worker.py), so it needs POOL_WORKER_BACKEND
+POOL_WORKER_COMMAND = shlex.split(
+    os.getenv("POOL_WORKER_COMMAND", f'"{sys.executable}" -m backend.pool_worker')
+)
+POOL_WORKER_BACKEND = os.getenv("POOL_WORKER_BACKEND", "")
+
+try:
+    POOL_SIZE = max(1, int(os.getenv("POOL_SIZE", str(MAX_CONCURRENT_REQUESTS))))
+except ValueError:
+    POOL_SIZE = MAX_CONCURRENT_REQUESTS
+
+# Prompts a worker handles before it is replaced; 0 keeps workers forever
+try:
+    POOL_MAX_JOBS = int(os.getenv("POOL_MAX_JOBS", "100"))
+except ValueError:
+    POOL_MAX_JOBS = 100
+
+try:
+    POOL_HEALTH_INTERVAL = float(os.getenv("POOL_HEALTH_INTERVAL", "30"))
+except ValueError:
+    POOL_HEALTH_INTERVAL = 30.0
+
+# Hedging: a model call still running after the HEDGE_PERCENTILE of recent
+# call durations (and at least HEDGE_MIN_DELAY seconds) is duplicated and the
+# first answer wins; at most HEDGE_BUDGET of all calls are hedged
+HEDGE_ENABLED = os.getenv("HEDGE_ENABLED", "false").lower() in ("1", "true", "yes")
+
+try:
+    HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "95"))
+except ValueError:
+    HEDGE_PERCENTILE = 95.0
+
+try:
+    HEDGE_BUDGET = float(os.getenv("HEDGE_BUDGET", "0.05"))
+except ValueError:
+    HEDGE_BUDGET = 0.05
+
+try:
+    HEDGE_MIN_DELAY = float(os.getenv("HEDGE_MIN_DELAY", "2"))
+except ValueError:
+    HEDGE_MIN_DELAY = 2.0
+
+# Streams with progress events send a heartbeat after this many idle seconds
+try:
+    PROGRESS_HEARTBEAT_INTERVAL = float(os.getenv("PROGRESS_HEARTBEAT_INTERVAL", "15"))
+except ValueError:
+    PROGRESS_HEARTBEAT_INTERVAL = 15.0
+
+# Words an input-ordered stream looks up ahead of the next line it can send,
+# which bounds the lines it has to hold back
+try:
+    ORDERED_WINDOW = max(1, int(os.getenv("ORDERED_WINDOW", "20")))
+except ValueError:
+    ORDERED_WINDOW = 20
+
+# Number of words analyzed by a single gemini call; 1 disables batching
+try:
+    BATCH_SIZE = max(1, int(os.getenv("BATCH_SIZE", "1")))
+except ValueError:
+    BATCH_SIZE = 1
+
+# Seconds between checks of backend/prompts/ for edited templates; 0 disables
+try:
+    PROMPT_RELOAD_INTERVAL = float(os.getenv("PROMPT_RELOAD_INTERVAL", "2"))
+except ValueError:
+    PROMPT_RELOAD_INTERVAL = 2.0
+
+# Use logs and data directories in the project root
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Result cache configuration
+CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+CACHE_PATH = os.getenv("CACHE_PATH", os.path.join(BASE_DIR, "data", "cache.sqlite3"))
+
+try:
+    CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+except ValueError:
+    CACHE_TTL_SECONDS = 30 * 24 * 3600
+
+try:
+    CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "100000"))
+except ValueError:
+    CACHE_MAX_ENTRIES = 100000
+
+# Vocabulary packs (see backend/packs.py) loaded into the cache at startup
+PACKS_DIR = os.getenv("PACKS_DIR", os.path.join(BASE_DIR, "data", "packs"))
+
+# Job API for word lists too large for a single streaming request
+JOBS_PATH = os.getenv("JOBS_PATH", os.path.join(BASE_DIR, "data", "jobs.sqlite3"))
+
+try:
+    MAX_WORDS_PER_JOB = int(os.getenv("MAX_WORDS_PER_JOB", "10000"))
+except ValueError:
+    MAX_WORDS_PER_JOB = 10000
+
+# Size limit of a job's word list, for JSON text and uploaded files alike
+MAX_JOB_TEXT_LENGTH = MAX_WORDS_PER_JOB * 100
+
+# Lock files marking which worker process runs a job
+JOB_LOCKS_DIR = os.getenv(
+    "JOB_LOCKS_DIR", os.path.join(os.path.dirname(JOBS_PATH), "job-locks")
+)
+
+# Directory of lock files sharing MAX_CONCURRENT_REQUESTS between worker
+# processes; set by `backend/run.py --workers N`, unset for a single process
+SHARED_SLOTS_DIR = os.getenv("SHARED_SLOTS_DIR", "")
+
+# Words of one job processed concurrently; model calls still go through the
+# fair scheduler, so a job shares slots with interactive requests
+try:
+    JOB_WORKERS = max(1, int(os.getenv("JOB_WORKERS", str(MAX_CONCURRENT_REQUESTS))))
+except ValueError:
+    JOB_WORKERS = MAX_CONCURRENT_REQUESTS
+
 # Set up logging
 LOG_LEVEL = getattr(logging, LOG_LEVEL_STR, logging.INFO)
-# Use logs directory in the project root
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 LOG_DIR = os.path.join(BASE_DIR, "logs")
 os.makedirs(LOG_DIR, exist_ok=True)
 
@@ -43,18 +249,85 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+# (raw_word, parsed_word, context) of a single requested word
+WordEntry = tuple[str, str, str | None]
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Receives the progress events of the lookups made for a /process-words stream
+progress_listener: ContextVar[Callable[[dict], None] | None] = ContextVar(
+    "progress_listener", default=None
+)
+# IDs of the words the current lookup is for
+progress_ids: ContextVar[tuple[str, ...]] = ContextVar("progress_ids", default=())
+# Lane of a model call shared by several requests, which may change while it waits
+shared_lane: ContextVar[Callable[[], str] | None] = ContextVar(
+    "shared_lane", default=None
+)
+
+# A bracketed part of a word entry: "[context]"
+BRACKET_RE = re.compile(r"\[(.*?)\]")
+BRACKET_CHAR_RE = re.compile(r"[\[\]]")
+# Text whose brackets are all closed and not nested
+FLAT_BRACKETS_RE = re.compile(r"[^\[\]]*(?:\[[^\[\]]*\][^\[\]]*)*")
+# In such text, a comma is inside brackets if the next bracket closes
+TOP_LEVEL_COMMA_RE = re.compile(r",(?![^\[\]]*\])")
+
+
 class WordsRequest(BaseModel):
     """Request model for word processing."""
 
     text: str = Field(..., min_length=1, max_length=5000)
     source_lang: str = Field("English", description="Source language name")
     target_lang: str = Field("Russian", description="Target language name")
+    priority: Literal["interactive", "bulk"] | None = Field(
+        None, description="Scheduling lane; inferred from the word count if unset"
+    )
+
+
+class JobRequest(BaseModel):
+    """Request model for creating a job from a large word list."""
+
+    text: str = Field(..., min_length=1, max_length=MAX_JOB_TEXT_LENGTH)
+    source_lang: str = Field("English", description="Source language name")
+    target_lang: str = Field("Russian", description="Target language name")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if result_cache is not None:
+        try:
+            load_packs(
+                result_cache,
+                PACKS_DIR,
+                GEMINI_MODEL,
+                lambda source_lang, target_lang: (
+                    get_compiled_prompt(source_lang, target_lang).hash
+                ),
+            )
+        except Exception:
+            logger.exception("Failed to load vocabulary packs")
+    watcher = None
+    if PROMPT_RELOAD_INTERVAL > 0:
+        watcher = asyncio.create_task(prompt_registry.watch(PROMPT_RELOAD_INTERVAL))
+    for job_id in job_store.unfinished():
+        logger.info(f"Resuming job {job_id}")
+        start_job(job_id)
+    yield
+    if watcher is not None:
+        watcher.cancel()
+    # Interrupted jobs keep their status and are resumed on the next start
+    for task in list(job_tasks.values()):
+        task.cancel()
+    await llm_backend.aclose()
+    job_store.close()
 
 
 app = FastAPI(
     title="Word Processor API",
     description="API for processing words with Gemini",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # Simple CORS middleware
@@ -66,59 +339,106 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-PROMPTS_DIR = ""
+# Use paths relative to this script
+PROMPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "prompts")
 
 try:
-    # Use paths relative to this script
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    PROMPTS_DIR = os.path.join(script_dir, "prompts")
-    with open(os.path.join(PROMPTS_DIR, "prompt.txt"), "r") as f:
-        DEFAULT_PROMPT_TEMPLATE = f.read().strip()
-    with open(os.path.join(PROMPTS_DIR, "fix_json_prompt.txt"), "r") as f:
-        FIX_JSON_PROMPT_TEMPLATE = f.read().strip()
+    prompt_registry = PromptRegistry(PROMPTS_DIR)
 except FileNotFoundError as e:
     raise SystemExit(
         f"Error: Prompt file not found - {e.filename}. Please check the backend/prompts/ directory."
     )
 
 
-def get_prompt_template(source_lang: str, target_lang: str) -> str:
+result_cache = (
+    ResultCache(CACHE_PATH, CACHE_TTL_SECONDS, CACHE_MAX_ENTRIES)
+    if CACHE_ENABLED
+    else None
+)
+
+job_store = JobStore(JOBS_PATH)
+# Running jobs, and events set whenever a job records results
+job_tasks: dict[str, asyncio.Task] = {}
+job_updates: dict[str, asyncio.Event] = {}
+
+# Shares in-flight lookups of the same word across all requests
+word_lookups = SingleFlight()
+# Progress listeners (with the IDs they expect) of every caller waiting on a
+# shared lookup, and the last event the lookup reported, for late joiners
+lookup_watchers: dict[tuple, list[tuple[Callable[[dict], None], tuple[str, ...]]]] = {}
+lookup_last_event: dict[tuple, dict] = {}
+# Lanes of the callers waiting on each shared lookup
+lookup_lanes: dict[tuple, list[str]] = {}
+
+
+def build_scheduler() -> FairScheduler:
+    """A scheduler with the configured limits and no adaptive history."""
+    return FairScheduler(
+        MAX_CONCURRENT_REQUESTS,
+        min_concurrent=MIN_CONCURRENT_REQUESTS,
+        adaptive=ADAPTIVE_CONCURRENCY,
+        reserved=INTERACTIVE_RESERVED_SLOTS,
+    )
+
+
+# Caps concurrent gemini calls across all requests
+gemini_scheduler = build_scheduler()
+metrics.QUEUE_DEPTH.set_function(lambda: gemini_scheduler.queue_depth())
+metrics.CONCURRENCY_LIMIT.set_function(lambda: gemini_scheduler.capacity)
+
+# Duplicates model calls stuck in the latency tail
+hedger = (
+    Hedger(HEDGE_PERCENTILE, HEDGE_BUDGET, min_delay=HEDGE_MIN_DELAY)
+    if HEDGE_ENABLED
+    else None
+)
+
+# Caps gemini calls across worker processes when several share the budget
+shared_slots = (
+    SharedSlots(SHARED_SLOTS_DIR, MAX_CONCURRENT_REQUESTS) if SHARED_SLOTS_DIR else None
+)
+
+if LLM_BACKEND == "pool" and not (
+    os.getenv("POOL_WORKER_COMMAND") or POOL_WORKER_BACKEND
+):
+    raise SystemExit(
+        "Error: LLM_BACKEND=pool needs POOL_WORKER_COMMAND, or POOL_WORKER_BACKEND "
+        "for the bundled worker."
+    )
+
+try:
+    llm_backend = create_backend(
+        LLM_BACKEND,
+        model=GEMINI_MODEL,
+        timeout=COMMAND_TIMEOUT,
+        api_key=GEMINI_API_KEY,
+        base_url=GEMINI_API_BASE,
+        max_connections=MAX_CONCURRENT_REQUESTS,
+        stub_latency=STUB_LATENCY_MS / 1000,
+        pool_command=POOL_WORKER_COMMAND,
+        pool_size=POOL_SIZE,
+        pool_max_jobs=POOL_MAX_JOBS,
+        pool_health_interval=POOL_HEALTH_INTERVAL,
+        pool_cwd=BASE_DIR,
+    )
+except ValueError as e:
+    raise SystemExit(f"Error: {e}. Use one of: cli, http, pool, stub.")
+logger.info(f"Using '{llm_backend.name}' model backend")
+
+
+def get_compiled_prompt(source_lang: str, target_lang: str) -> CompiledTemplate:
     """
     Get the appropriate prompt template.
-    Tries to find a specific prompt for the language pair (e.g., prompt_German_Russian.txt).
+    Tries to find a specific prompt for the language pair (e.g., prompt_German_Russian.txt),
+    then for the source language (prompt_German.txt).
     Falls back to the default prompt.txt.
     """
-    # Sanitize language names to prevent directory traversal or invalid filenames
-    safe_source = "".join([c for c in source_lang if c.isalnum()])
-    safe_target = "".join([c for c in target_lang if c.isalnum()])
-
-    specific_prompt_filename = f"prompt_{safe_source}_{safe_target}.txt"
-    specific_prompt_path = os.path.join(PROMPTS_DIR, specific_prompt_filename)
-
-    if os.path.exists(specific_prompt_path):
-        try:
-            with open(specific_prompt_path, "r") as f:
-                logger.debug(f"Using specific prompt: {specific_prompt_filename}")
-                return f.read().strip()
-        except Exception as e:
-            logger.warning(
-                f"Failed to read specific prompt {specific_prompt_filename}: {e}. Using default."
-            )
+    return prompt_registry.for_languages(source_lang, target_lang)
 
-    # Fallback to source-only prompt
-    source_only_filename = f"prompt_{safe_source}.txt"
-    source_only_path = os.path.join(PROMPTS_DIR, source_only_filename)
-    if os.path.exists(source_only_path):
-        try:
-            with open(source_only_path, "r") as f:
-                logger.debug(f"Using source-specific prompt: {source_only_filename}")
-                return f.read().strip()
-        except Exception as e:
-            logger.warning(
-                f"Failed to read source-specific prompt {source_only_filename}: {e}. Using default."
-            )
 
-    return DEFAULT_PROMPT_TEMPLATE
+def get_prompt_template(source_lang: str, target_lang: str) -> str:
+    """Text of the prompt template used for the language pair."""
+    return get_compiled_prompt(source_lang, target_lang).text
 
 
 def build_prompt(
@@ -126,20 +446,40 @@ def build_prompt(
 ) -> str:
     """Build prompt for Gemini CLI."""
 
-    template = get_prompt_template(source_lang, target_lang)
+    template = get_compiled_prompt(source_lang, target_lang)
 
     context_prompt = ""
     if context:
         context_prompt = f"Given the context `{context}`, "
 
+    return template.render(
+        single_line=True,
+        word=word,
+        source_lang=source_lang,
+        target_lang=target_lang,
+        context_prompt=context_prompt,
+    )
+
+
+def build_batch_prompt(
+    words: list[tuple[str, str | None]], source_lang: str, target_lang: str
+) -> str:
+    """Build a prompt asking Gemini to analyze several (word, context) pairs at once."""
+    entries = []
+    for i, (word, context) in enumerate(words, start=1):
+        entry = f'{i}. "{word}"'
+        if context:
+            entry += f" (context: `{context}`)"
+        entries.append(entry)
+
     return (
-        template.format(
-            word=word,
+        prompt_registry.get("batch_prompt")
+        .render(
+            count=len(words),
             source_lang=source_lang,
-            target_lang=target_lang,
-            context_prompt=context_prompt,
+            instructions=build_prompt("ENTRY", source_lang, target_lang),
+            entries="\n".join(entries),
         )
-        .replace("\n", " ")
         .strip()
     )
 
@@ -149,54 +489,131 @@ def clean_csv_field(text: str) -> str:
     if not isinstance(text, str):
         text = str(text)
     # Replace literal \n and \r if they exist as strings
-    text = text.replace("\\n", " ").replace("\\r", " ")
-    # Replace any sequence of whitespace with a single space
-    return re.sub(r"\s+", " ", text).replace('"', '""').strip()
+    if "\\" in text:
+        text = text.replace("\\n", " ").replace("\\r", " ")
+    # split() drops leading/trailing whitespace and collapses the rest
+    text = " ".join(text.split())
+    return text.replace('"', '""')
 
 
-def extract_data_line(stdout: str, raw_word: str, parsed_word: str) -> str:
-    """Extract data from Gemini output, convert to CSV."""
+def parse_word_data(stdout: str, parsed_word: str) -> dict:
+    """Extract the JSON object from Gemini output and normalize its fields."""
     try:
-        # Regex to find JSON block, including markdown ```json ... ```
-        match = re.search(r"```json\s*(\{.*?\})\s*```|(\{.*?\})", stdout, re.DOTALL)
-        if not match:
-            raise ValueError("No JSON object found in output")
+        # Handles markdown ```json ... ``` fences and repairs common defects
+        data, repaired = extract_json(stdout)
+        # A repaired answer may be cut short; never accept it without the
+        # fields a card needs, so the word is retried instead of cached
+        if repaired and not has_word_fields(data):
+            raise ValueError("Repaired JSON lacks an infinitive or translations")
+        data = normalize_word_data(data, parsed_word)
+        if repaired:
+            metrics.JSON_LOCAL_REPAIRS.inc(model=GEMINI_MODEL)
+            logger.info(f"Repaired JSON for '{parsed_word}' without the fixing model")
+            report_progress("fixed", method="local")
+        return data
+
+    except (ValueError, TypeError, KeyError, IndexError) as e:
+        # Error is logged in the calling function with more context
+        raise ValueError(f"Invalid response format: {e}")
 
-        # Get the first non-empty group
-        json_str = next((g for g in match.groups() if g), None)
-        if not json_str:
-            raise ValueError("No JSON content extracted")
 
-        data = json.loads(json_str)
+def has_word_fields(data: object) -> bool:
+    """Whether decoded word data has a non-empty infinitive and translations."""
+    return (
+        isinstance(data, dict)
+        and bool(str(data.get("infinitive") or "").strip())
+        and isinstance(data.get("translations"), list)
+        and bool(data["translations"])
+    )
 
-        # Extract fields with defaults and clean them
-        infinitive = clean_csv_field(data.get("infinitive", parsed_word))
-        transcription = clean_csv_field(data.get("transcription", ""))
-        translations = clean_csv_field(", ".join(data.get("translations", [])))
 
-        examples = data.get("examples", [])
-        example_fields = []
-        for ex in examples:
-            source = clean_csv_field(ex.get("source", ""))
-            translation = clean_csv_field(ex.get("translation", ""))
-            example_fields.append(f'"{source}"')
-            example_fields.append(f'"{translation}"')
+def normalize_word_data(data: dict, parsed_word: str) -> dict:
+    """Keep only the known fields of a decoded JSON object, filling defaults."""
+    if not isinstance(data, dict):
+        raise TypeError("Expected a JSON object")
 
-        # LAST FIELD: raw_word (ID for matching)
-        id_raw = raw_word.strip().lower().replace('"', '""')
+    try:
+        return {
+            "infinitive": data.get("infinitive", parsed_word),
+            "transcription": data.get("transcription", ""),
+            "translations": list(data.get("translations", [])),
+            "examples": [
+                {
+                    "source": ex.get("source", ""),
+                    "translation": ex.get("translation", ""),
+                }
+                for ex in data.get("examples", [])
+            ],
+        }
+    except (AttributeError, TypeError) as e:
+        raise ValueError(f"Unexpected field types: {e}")
+
+
+def parse_batch_data(stdout: str, parsed_words: list[str]) -> list[dict | None]:
+    """
+    Split a batch response into per-word data, in the order of `parsed_words`.
+    Items that are missing or malformed are returned as None.
+    """
+    items, repaired = extract_json(stdout, container=list)
+    intact = None
+    if repaired:
+        metrics.JSON_LOCAL_REPAIRS.inc(model=GEMINI_MODEL)
+        logger.info(f"Repaired batch JSON for {len(parsed_words)} words locally")
+        report_progress("fixed", method="local")
+        # Items the repair touched may be cut short; only trust the others
+        intact = intact_objects(stdout)
+
+    # Prefer the entry number the model echoed back, fall back to position
+    by_id = {}
+    for position, item in enumerate(items, start=1):
+        item_id = item.get("id", position) if isinstance(item, dict) else position
+        by_id.setdefault(item_id, item)
+
+    results = []
+    for i, parsed_word in enumerate(parsed_words, start=1):
+        item = by_id.get(i, by_id.get(str(i)))
+        if not has_word_fields(item) or (intact is not None and item not in intact):
+            logger.warning(f"Incomplete batch item for '{parsed_word}'")
+            results.append(None)
+            continue
+        try:
+            results.append(normalize_word_data(item, parsed_word))
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Malformed batch item for '{parsed_word}': {e}")
+            results.append(None)
+    return results
+
+
+def format_data_line(data: dict, raw_word: str) -> str:
+    """Convert normalized word data to a CSV line ending with the raw_word ID."""
+    # Extract fields and clean them
+    infinitive = clean_csv_field(data["infinitive"])
+    transcription = clean_csv_field(data["transcription"])
+    translations = clean_csv_field(", ".join(data["translations"]))
+
+    example_fields = []
+    for ex in data["examples"]:
+        source = clean_csv_field(ex["source"])
+        translation = clean_csv_field(ex["translation"])
+        example_fields.append(f'"{source}"')
+        example_fields.append(f'"{translation}"')
+
+    # LAST FIELD: raw_word (ID for matching)
+    id_raw = raw_word.strip().lower().replace('"', '""')
 
-        # Dynamically build the CSV parts
-        csv_parts = [f'"{infinitive}"', f'"{transcription}"', f'"{translations}"']
-        if example_fields:
-            csv_parts.extend(example_fields)
+    # Dynamically build the CSV parts
+    csv_parts = [f'"{infinitive}"', f'"{transcription}"', f'"{translations}"']
+    if example_fields:
+        csv_parts.extend(example_fields)
 
-        csv_parts.append(f'"{id_raw}"')
+    csv_parts.append(f'"{id_raw}"')
 
-        return ";".join(csv_parts)
+    return ";".join(csv_parts)
 
-    except (json.JSONDecodeError, ValueError, KeyError, IndexError) as e:
-        # Error is logged in the calling function with more context
-        raise ValueError(f"Invalid response format: {e}")
+
+def extract_data_line(stdout: str, raw_word: str, parsed_word: str) -> str:
+    """Extract data from Gemini output, convert to CSV."""
+    return format_data_line(parse_word_data(stdout, parsed_word), raw_word)
 
 
 def format_error_response(raw_word: str, error_message: str) -> str:
@@ -213,57 +630,212 @@ def format_error_response(raw_word: str, error_message: str) -> str:
     return f'"{display_word}";"[error]";"[ERROR]: {error_message}";"{id_raw}"'
 
 
+def word_result(
+    raw_word: str,
+    data: dict | None = None,
+    error: str | None = None,
+    source: str = "model",
+    elapsed: float = 0.0,
+) -> dict:
+    """Structured result of one word, streamed as is in NDJSON mode."""
+    data = data or {}
+    return {
+        "word": raw_word,
+        "infinitive": data.get("infinitive"),
+        "transcription": data.get("transcription"),
+        "translations": data.get("translations", []),
+        "examples": data.get("examples", []),
+        "error": error,
+        "source": source,
+        "elapsed_ms": round(elapsed * 1000, 1),
+    }
+
+
+def format_result_line(result: dict) -> str:
+    """Render a word result as a line of the CSV protocol."""
+    if result["error"] is not None:
+        return format_error_response(result["word"], result["error"])
+    return format_data_line(result, result["word"])
+
+
+def cache_prompt_hash(source_lang: str, target_lang: str, batch: bool = False) -> str:
+    """
+    Prompt hash results are cached under. Answers from batch calls also carry
+    the batch prompt's hash, so editing either template invalidates them.
+    """
+    prompt_hash = get_compiled_prompt(source_lang, target_lang).hash
+    if batch:
+        prompt_hash += "+" + prompt_registry.get("batch_prompt").hash
+    return prompt_hash
+
+
+def get_cached_word_data(
+    raw_word: str,
+    parsed_word: str,
+    source_lang: str,
+    target_lang: str,
+    context: str | None = None,
+) -> dict | None:
+    """Return the data of a previously processed word, or None on a miss."""
+    if result_cache is None:
+        return None
+
+    try:
+        # Prefer an answer of the single-word prompt over a batch one
+        for batch in (False, True):
+            key = make_cache_key(
+                parsed_word,
+                context,
+                source_lang,
+                target_lang,
+                GEMINI_MODEL,
+                cache_prompt_hash(source_lang, target_lang, batch),
+            )
+            data = result_cache.get(key)
+            if data is not None:
+                break
+    except Exception:
+        logger.exception(f"Result cache lookup failed for '{raw_word}'")
+        return None
+
+    labels = {
+        "source_lang": metrics.language_label(source_lang),
+        "target_lang": metrics.language_label(target_lang),
+        "model": GEMINI_MODEL,
+    }
+    if data is None:
+        metrics.CACHE_LOOKUPS.inc(**labels, result="miss")
+        return None
+
+    metrics.CACHE_LOOKUPS.inc(**labels, result="hit")
+    logger.info(f"Cache hit for '{raw_word}'")
+    return data
+
+
+def store_cached_word_data(
+    data: dict,
+    parsed_word: str,
+    source_lang: str,
+    target_lang: str,
+    context: str | None = None,
+    batch: bool = False,
+) -> None:
+    """Save successfully parsed word data in the result cache."""
+    if result_cache is None:
+        return
+
+    try:
+        prompt_hash = cache_prompt_hash(source_lang, target_lang, batch)
+        key = make_cache_key(
+            parsed_word, context, source_lang, target_lang, GEMINI_MODEL, prompt_hash
+        )
+        result_cache.put(
+            key,
+            data,
+            " ".join(parsed_word.lower().split()),
+            context,
+            source_lang,
+            target_lang,
+            GEMINI_MODEL,
+            prompt_hash,
+        )
+    except Exception:
+        logger.exception(f"Failed to store '{parsed_word}' in the result cache")
+
+
+def report_progress(event: str, **fields) -> None:
+    """Tell the stream waiting for the current lookup, if any, how it is going."""
+    listener = progress_listener.get()
+    if listener is not None:
+        listener({"event": event, "ids": list(progress_ids.get()), **fields})
+
+
+async def run_gemini(prompt: str) -> str:
+    """Send the prompt to the configured backend once a global slot is free."""
+    queued_at = time.monotonic()
+    report_progress("queued")
+    # The fair scheduler orders this process's calls; the shared slots cap
+    # the calls of all worker processes together
+    async with (
+        gemini_scheduler.slot(
+            current_client.get(), current_lane.get(), shared_lane.get()
+        ) as lane,
+        shared_slots.slot() if shared_slots is not None else nullcontext(),
+    ):
+        started = time.monotonic()
+        report_progress("started")
+        metrics.QUEUE_WAIT_SECONDS.observe(
+            started - queued_at, model=GEMINI_MODEL, lane=lane
+        )
+        metrics.MODEL_CALLS_IN_FLIGHT.inc(model=GEMINI_MODEL)
+        try:
+            if hedger is not None:
+                output = await hedger.run(
+                    lambda: llm_backend.generate(prompt),
+                    lambda: run_hedge(prompt),
+                )
+            else:
+                output = await llm_backend.generate(prompt)
+        except LLMTimeoutError:
+            gemini_scheduler.record_overload()
+            raise
+        except LLMResponseError as e:
+            if e.kind == "capacity":
+                gemini_scheduler.record_overload()
+            raise
+        else:
+            gemini_scheduler.record_success()
+            return output
+        finally:
+            metrics.MODEL_CALLS_IN_FLIGHT.dec(model=GEMINI_MODEL)
+            metrics.MODEL_CALL_SECONDS.observe(
+                time.monotonic() - started,
+                backend=llm_backend.name,
+                model=GEMINI_MODEL,
+            )
+
+
+async def run_hedge(prompt: str) -> str:
+    """Second attempt at a slow call; it needs a slot of its own."""
+    async with (
+        gemini_scheduler.slot(
+            current_client.get(), current_lane.get(), shared_lane.get()
+        ),
+        shared_slots.slot() if shared_slots is not None else nullcontext(),
+    ):
+        metrics.MODEL_CALLS_IN_FLIGHT.inc(model=GEMINI_MODEL)
+        try:
+            return await llm_backend.generate(prompt)
+        finally:
+            metrics.MODEL_CALLS_IN_FLIGHT.dec(model=GEMINI_MODEL)
+
+
 async def fix_json_with_llm(broken_output: str, original_word: str) -> str | None:
     """Attempt to fix a broken JSON string using an LLM."""
     if not broken_output or not broken_output.strip():
         return None
 
     logger.info(f"Attempting to fix JSON for word '{original_word}'")
-    prompt = FIX_JSON_PROMPT_TEMPLATE.format(broken_output=broken_output)
-    command = ["gemini", "-m", GEMINI_MODEL, "-p", prompt]
+    prompt = prompt_registry.get("fix_json_prompt").render(broken_output=broken_output)
 
     try:
-        result = await run_in_threadpool(
-            subprocess.run,
-            command,
-            capture_output=True,
-            text=True,
-            check=True,
-            timeout=COMMAND_TIMEOUT,
-            stdin=subprocess.DEVNULL,
-        )
-        fixed_output = result.stdout
+        fixed_output = await run_gemini(prompt)
 
-        # We need to re-extract the JSON from the model's response
-        match = re.search(
-            r"```json\s*(\{.*?\})\s*```|(\{.*?\})", fixed_output, re.DOTALL
-        )
-        if not match:
+        # Verify that the model's response contains a JSON object
+        try:
+            extract_json(fixed_output)
+        except ValueError:
             logger.warning(
                 f"JSON-fixing LLM did not return a JSON object for '{original_word}'."
             )
             return None
 
-        json_str = next((g for g in match.groups() if g), None)
-        if not json_str:
-            logger.warning(
-                f"JSON-fixing LLM returned empty JSON content for '{original_word}'."
-            )
-            return None
-
-        # Verify if the fixed string is valid JSON before returning
-        json.loads(json_str)
         # Return the full output, which contains the verified JSON.
         return fixed_output
 
-    except (subprocess.TimeoutExpired, subprocess.CalledProcessError) as e:
+    except LLMError as e:
         logger.error(f"Error while trying to fix JSON for '{original_word}': {e}")
         return None
-    except json.JSONDecodeError as e:
-        logger.error(
-            f"Failed to parse the 'fixed' JSON for '{original_word}': {e}. Output was:\n{fixed_output}"
-        )
-        return None
     except Exception:
         logger.exception(
             f"An unexpected error occurred while fixing JSON for '{original_word}'"
@@ -271,17 +843,54 @@ async def fix_json_with_llm(broken_output: str, original_word: str) -> str | Non
         return None
 
 
-async def get_word_details(
-    raw_word: str,
+def retry_delay(attempt: int) -> float:
+    """Jittered exponential backoff before the retry following `attempt`."""
+    return backoff_delay(attempt, RETRY_BASE_DELAY, RETRY_MAX_DELAY)
+
+
+async def run_gemini_requeued(prompt: str, labels: dict) -> str:
+    """
+    Like run_gemini, but puts the call back into the queue after a capacity
+    error instead of failing, up to MAX_CAPACITY_REQUEUES times.
+    """
+    requeues = 0
+    while True:
+        try:
+            return await run_gemini(prompt)
+        except LLMResponseError as e:
+            if e.kind != "capacity":
+                raise
+            metrics.CAPACITY_ERRORS.inc(**labels)
+            if requeues >= MAX_CAPACITY_REQUEUES:
+                raise
+            delay = retry_delay(requeues)
+            requeues += 1
+            logger.warning(
+                f"API capacity exhausted, requeueing in {delay:.1f}s "
+                f"({requeues}/{MAX_CAPACITY_REQUEUES})"
+            )
+            report_progress("retry", attempt=requeues, reason="capacity")
+            await asyncio.sleep(delay)
+
+
+class WordLookupError(Exception):
+    """Raised when a word could not be processed after all retries."""
+
+
+async def fetch_word_data(
     parsed_word: str,
     source_lang: str,
     target_lang: str,
     context: str | None = None,
-) -> str:
-    """Fetch word details from Gemini CLI with retries. Returns CSV-formatted string."""
+) -> dict:
+    """Fetch word data from Gemini CLI with retries. Raises WordLookupError on failure."""
     prompt = build_prompt(parsed_word, source_lang, target_lang, context)
-    command = ["gemini", "-m", GEMINI_MODEL, "-p", prompt]
     max_retries = 3
+    labels = {
+        "source_lang": metrics.language_label(source_lang),
+        "target_lang": metrics.language_label(target_lang),
+        "model": GEMINI_MODEL,
+    }
 
     last_error = "Unknown error"
     last_stdout = None
@@ -289,42 +898,48 @@ async def get_word_details(
     for attempt in range(max_retries):
         try:
             logger.info(
-                f"Processing word: '{raw_word}' (Attempt {attempt + 1}/{max_retries})"
+                f"Processing word: '{parsed_word}' (Attempt {attempt + 1}/{max_retries})"
             )
+            if attempt:
+                report_progress("retry", attempt=attempt, reason=last_error)
 
-            result = await run_in_threadpool(
-                subprocess.run,
-                command,
-                capture_output=True,
-                text=True,
-                check=True,
-                timeout=COMMAND_TIMEOUT,
-                stdin=subprocess.DEVNULL,
-            )
-            last_stdout = result.stdout
+            last_stdout = await run_gemini_requeued(prompt, labels)
 
             if not last_stdout.strip():
                 raise ValueError("Empty response from model")
 
             # If we are here, we got a non-empty response, try to parse it
-            return extract_data_line(last_stdout, raw_word, parsed_word)
+            data = parse_word_data(last_stdout, parsed_word)
+            store_cached_word_data(data, parsed_word, source_lang, target_lang, context)
+            metrics.WORD_ATTEMPTS.observe(attempt + 1, **labels)
+            return data
 
         except ValueError as e:
             # This catches both parsing errors from extract_data_line and the empty response error
-            logger.warning(f"Attempt {attempt + 1} failed for '{raw_word}': {e}")
+            logger.warning(f"Attempt {attempt + 1} failed for '{parsed_word}': {e}")
 
             # If it is a JSON error, try to fix it
             if ("JSON" in str(e) or "delimiter" in str(e)) and last_stdout:
-                fixed_json_str = await fix_json_with_llm(last_stdout, raw_word)
+                fixed_json_str = await fix_json_with_llm(last_stdout, parsed_word)
+                metrics.FIX_JSON_CALLS.inc(
+                    model=GEMINI_MODEL,
+                    outcome="success" if fixed_json_str else "failure",
+                )
                 if fixed_json_str:
                     try:
                         # If fixing succeeds, pass the fixed string to the data extractor.
                         # The extractor can handle a raw JSON string.
-                        logger.info(f"Successfully fixed JSON for '{raw_word}'.")
-                        return extract_data_line(fixed_json_str, raw_word, parsed_word)
+                        logger.info(f"Successfully fixed JSON for '{parsed_word}'.")
+                        data = parse_word_data(fixed_json_str, parsed_word)
+                        report_progress("fixed", method="model")
+                        store_cached_word_data(
+                            data, parsed_word, source_lang, target_lang, context
+                        )
+                        metrics.WORD_ATTEMPTS.observe(attempt + 1, **labels)
+                        return data
                     except ValueError as fix_e:
                         logger.warning(
-                            f"Failed to process the 'fixed' JSON for '{raw_word}': {fix_e}"
+                            f"Failed to process the 'fixed' JSON for '{parsed_word}': {fix_e}"
                         )
                         last_error = f"Malformed data that could not be fixed: {fix_e}"
                 else:
@@ -333,61 +948,458 @@ async def get_word_details(
                 last_error = f"Invalid response from model: {e}"
 
             if attempt < max_retries - 1:
-                await asyncio.sleep(1)  # Wait 1 second before next attempt
+                await asyncio.sleep(retry_delay(attempt))
             continue  # Go to next attempt
 
-        except FileNotFoundError:
-            logger.error("gemini-cli not found in PATH")
-            last_error = "Server configuration error: gemini-cli not found"
-            break  # No point retrying if the command doesn't exist
+        except LLMNotFoundError as e:
+            logger.error(f"Model backend unavailable: {e}")
+            last_error = f"Server configuration error: {e}"
+            break  # No point retrying if the backend is not available
 
-        except subprocess.TimeoutExpired:
-            logger.error(f"Timeout processing '{raw_word}' after {COMMAND_TIMEOUT}s")
+        except LLMTimeoutError:
+            logger.error(f"Timeout processing '{parsed_word}' after {COMMAND_TIMEOUT}s")
             last_error = (
                 f"Timeout: processing took longer than {COMMAND_TIMEOUT} seconds."
             )
             # Don't break, allow for retry if the timeout was a fluke
             if attempt >= max_retries - 1:
                 break
+            await asyncio.sleep(retry_delay(attempt))
 
-        except subprocess.CalledProcessError as e:
+        except LLMResponseError as e:
             last_stdout = e.stdout
-            logger.error(f"Command failed for '{raw_word}': {e.stderr}")
-            stderr_lower = e.stderr.lower() if e.stderr else ""
-            if "auth" in stderr_lower:
+            logger.error(f"Model call failed for '{parsed_word}': {e} ({e.kind})")
+            if e.kind == "auth":
                 last_error = "Server authorization error with Gemini API"
-            elif any(kw in stderr_lower for kw in ["connection", "network"]):
+            elif e.kind == "network":
                 last_error = "Network error when connecting to Gemini API"
-            elif "capacity" in stderr_lower:
-                logger.error(
-                    f"API capacity exhausted for '{raw_word}'. Raising HTTPException."
-                )
-                raise HTTPException(
-                    status_code=429,
-                    detail="API capacity exhausted. Please try again later.",
-                )
+            elif e.kind == "capacity":
+                # Already requeued MAX_CAPACITY_REQUEUES times
+                last_error = "API capacity exhausted. Please try again later."
+                break
             else:
-                last_error = "Error executing gemini-cli command"
+                last_error = str(e)
 
             if attempt >= max_retries - 1:
                 break
 
         except Exception as e:
             logger.exception(
-                f"An unexpected error occurred while processing '{raw_word}'"
+                f"An unexpected error occurred while processing '{parsed_word}'"
             )
             last_error = f"An unexpected server error occurred: {str(e)}"
             break  # Unexpected error, break immediately
 
     # All retries failed
-    log_message = (
-        f"All {max_retries} attempts failed for '{raw_word}'. Last error: {last_error}"
-    )
+    log_message = f"All {max_retries} attempts failed for '{parsed_word}'. Last error: {last_error}"
     if last_stdout:
         log_message += f"\nLast raw output:\n---\n{last_stdout}\n---"
 
     logger.error(log_message)
-    return format_error_response(raw_word, last_error)
+    metrics.WORD_ATTEMPTS.observe(attempt + 1, **labels)
+    raise WordLookupError(last_error)
+
+
+def lookup_key(
+    parsed_word: str, context: str | None, source_lang: str, target_lang: str
+) -> tuple:
+    """Key under which identical in-flight lookups share one model call."""
+    return (
+        " ".join(parsed_word.lower().split()),
+        context or "",
+        source_lang,
+        target_lang,
+    )
+
+
+def lookup_lane(key: tuple, default: str) -> str:
+    """Lane of the shared lookup `key`: the highest among its callers."""
+    return min(lookup_lanes.get(key, ()), key=LANES.index, default=default)
+
+
+@contextmanager
+def joining_lookup(key: tuple, ids: tuple[str, ...]) -> Iterator[None]:
+    """
+    Register the current caller with the shared lookup `key`: its lane counts
+    towards the lane of the lookup, and its listener hears of its progress.
+    """
+    lane = current_lane.get()
+    lanes = lookup_lanes.setdefault(key, [])
+    lanes.append(lane)
+    if lane == INTERACTIVE and word_lookups.running(key):
+        # A bulk lookup waiting for a slot may have to move up
+        gemini_scheduler.reprioritize()
+
+    listener = progress_listener.get()
+    watcher = (listener, ids)
+    if listener is not None:
+        lookup_watchers.setdefault(key, []).append(watcher)
+        last_event = lookup_last_event.get(key)
+        if last_event is not None:
+            # Joining a lookup already under way: catch up with its state
+            listener({**last_event, "ids": list(ids), "shared": True})
+    try:
+        yield
+    finally:
+        lanes.remove(lane)
+        if not lanes:
+            del lookup_lanes[key]
+        if listener is not None:
+            watchers = lookup_watchers[key]
+            watchers.remove(watcher)
+            if not watchers:
+                del lookup_watchers[key]
+
+
+async def fetch_shared_word_data(
+    key: tuple,
+    parsed_word: str,
+    source_lang: str,
+    target_lang: str,
+    context: str | None = None,
+) -> dict:
+    """fetch_word_data reporting its progress to every caller sharing it."""
+
+    def fan_out(event: dict) -> None:
+        lookup_last_event[key] = event
+        for listener, ids in list(lookup_watchers.get(key, ())):
+            listener({**event, "ids": list(ids)})
+
+    # Runs in a task of its own, so this does not leak into the callers
+    progress_listener.set(fan_out)
+    # Called from the contexts of other callers too, so resolve the lane now
+    lane = current_lane.get()
+    shared_lane.set(lambda: lookup_lane(key, lane))
+    try:
+        return await fetch_word_data(parsed_word, source_lang, target_lang, context)
+    finally:
+        lookup_last_event.pop(key, None)
+
+
+async def lookup_word(
+    raw_word: str,
+    parsed_word: str,
+    source_lang: str,
+    target_lang: str,
+    context: str | None = None,
+) -> dict:
+    """
+    Fetch word details from Gemini CLI with retries. Returns a word_result.
+    Cached words are answered immediately. Identical lookups already in flight
+    share one Gemini call; every caller still gets a result carrying its own
+    raw_word ID.
+    """
+    started = time.monotonic()
+    labels = {
+        "source_lang": metrics.language_label(source_lang),
+        "target_lang": metrics.language_label(target_lang),
+        "model": GEMINI_MODEL,
+        "lane": current_lane.get(),
+    }
+    cached = get_cached_word_data(
+        raw_word, parsed_word, source_lang, target_lang, context
+    )
+    if cached is not None:
+        elapsed = time.monotonic() - started
+        metrics.WORD_LOOKUP_SECONDS.observe(elapsed, **labels, source="cache")
+        return word_result(raw_word, cached, source="cache", elapsed=elapsed)
+
+    key = lookup_key(parsed_word, context, source_lang, target_lang)
+    try:
+        with joining_lookup(key, progress_ids.get()):
+            try:
+                data = await word_lookups.do(
+                    key,
+                    lambda: fetch_shared_word_data(
+                        key, parsed_word, source_lang, target_lang, context
+                    ),
+                )
+            finally:
+                # A shared lookup is served in the highest lane of its callers
+                labels["lane"] = lookup_lane(key, labels["lane"])
+    except WordLookupError as e:
+        elapsed = time.monotonic() - started
+        metrics.WORD_LOOKUP_SECONDS.observe(elapsed, **labels, source="error")
+        return word_result(raw_word, error=str(e), source="error", elapsed=elapsed)
+
+    elapsed = time.monotonic() - started
+    metrics.WORD_LOOKUP_SECONDS.observe(elapsed, **labels, source="model")
+    return word_result(raw_word, data, elapsed=elapsed)
+
+
+async def get_word_details(
+    raw_word: str,
+    parsed_word: str,
+    source_lang: str,
+    target_lang: str,
+    context: str | None = None,
+) -> str:
+    """Look up a word and return its CSV-formatted line."""
+    return format_result_line(
+        await lookup_word(raw_word, parsed_word, source_lang, target_lang, context)
+    )
+
+
+def start_batch_lookup(
+    entries: list[WordEntry],
+    source_lang: str,
+    target_lang: str,
+) -> dict[int, asyncio.Task]:
+    """
+    Start analyzing several (raw_word, parsed_word, context) entries with one
+    gemini call. Returns tasks producing the word results of the batched
+    entries, by position in `entries`; the other entries must be looked up
+    one by one.
+
+    Words already being looked up are left out of the batch, so their callers
+    join the running lookup. Batched words are registered as in-flight lookups
+    themselves: concurrent single lookups of them wait for the batch, and a
+    word missing from the batch answer is looked up once for all of them.
+    """
+    started = time.monotonic()
+    unique = {}
+    for _, parsed_word, context in entries:
+        key = lookup_key(parsed_word, context, source_lang, target_lang)
+        if not word_lookups.running(key):
+            unique.setdefault(key, (parsed_word, context))
+    if len(unique) < 2:
+        return {}
+    words = list(unique.values())
+    positions = {key: index for index, key in enumerate(unique)}
+
+    async def run_batch() -> list[dict | None]:
+        # One interactive caller of any batched word moves the batch up
+        lane = current_lane.get()
+        shared_lane.set(
+            lambda: min((lookup_lane(key, lane) for key in unique), key=LANES.index)
+        )
+        logger.info(f"Processing batch of {len(words)} words")
+        try:
+            output = await run_gemini(
+                build_batch_prompt(words, source_lang, target_lang)
+            )
+            return parse_batch_data(output, [word for word, _ in words])
+        except (LLMError, ValueError) as e:
+            logger.warning(f"Batch of {len(words)} words failed, falling back: {e}")
+        except Exception:
+            logger.exception("Error processing batch")
+        return [None] * len(words)
+
+    batch = asyncio.ensure_future(run_batch())
+    unfinished = [len(words)]
+
+    def word_done(_: asyncio.Future) -> None:
+        # Once no word waits for the batch any more, nothing needs its answer
+        unfinished[0] -= 1
+        if unfinished[0] == 0:
+            batch.cancel()
+
+    async def from_batch(key: tuple) -> dict:
+        parsed_word, context = unique[key]
+        data = (await asyncio.shield(batch))[positions[key]]
+        if data is None:
+            logger.info(f"'{parsed_word}' is missing from the batch, looking it up")
+            return await fetch_shared_word_data(
+                key, parsed_word, source_lang, target_lang, context
+            )
+        store_cached_word_data(
+            data, parsed_word, source_lang, target_lang, context, batch=True
+        )
+        return data
+
+    def start_word(key: tuple) -> asyncio.Future:
+        future = asyncio.ensure_future(from_batch(key))
+        future.add_done_callback(word_done)
+        return future
+
+    async def join(raw_word: str, key: tuple) -> dict:
+        try:
+            with joining_lookup(key, (raw_word,)):
+                data = await word_lookups.do(key, lambda: start_word(key))
+        except WordLookupError as e:
+            elapsed = time.monotonic() - started
+            return word_result(raw_word, error=str(e), source="error", elapsed=elapsed)
+        return word_result(raw_word, data, elapsed=time.monotonic() - started)
+
+    tasks = {}
+    for position, (raw_word, parsed_word, context) in enumerate(entries):
+        key = lookup_key(parsed_word, context, source_lang, target_lang)
+        if key in unique:
+            tasks[position] = asyncio.ensure_future(join(raw_word, key))
+    return tasks
+
+
+def notify_job(job_id: str) -> None:
+    """Wake up result streams waiting on the job."""
+    event = job_updates.pop(job_id, None)
+    if event is not None:
+        event.set()
+
+
+async def lookup_entries(
+    entries: list[WordEntry],
+    source_lang: str,
+    target_lang: str,
+    check_cache: bool = True,
+) -> AsyncIterator[tuple[int, dict]]:
+    """
+    Look up a chunk of entries, with one batch call when there are several.
+    Yields (index in `entries`, word result) as results become available.
+
+    Cached entries are answered first and only the others are batched;
+    callers that already took the cached entries out pass `check_cache=False`.
+    """
+
+    async def single(index: int) -> tuple[int, dict]:
+        raw_word, parsed_word, context = entries[index]
+        progress_ids.set((raw_word,))
+        try:
+            result = await lookup_word(
+                raw_word, parsed_word, source_lang, target_lang, context
+            )
+        except Exception as e:
+            logger.exception(f"Error processing '{raw_word}'")
+            result = word_result(raw_word, error=f"Error: {str(e)}", source="error")
+        return index, result
+
+    async def batched(index: int, task: asyncio.Task) -> tuple[int, dict]:
+        try:
+            result = await task
+        except Exception as e:
+            raw_word = entries[index][0]
+            logger.exception(f"Error processing '{raw_word}'")
+            result = word_result(raw_word, error=f"Error: {e}", source="error")
+        return index, result
+
+    retry = list(range(len(entries)))
+    if len(entries) > 1 and check_cache:
+        retry = []
+        for index, (raw_word, parsed_word, context) in enumerate(entries):
+            cached = get_cached_word_data(
+                raw_word, parsed_word, source_lang, target_lang, context
+            )
+            if cached is not None:
+                yield index, word_result(raw_word, cached, source="cache")
+            else:
+                retry.append(index)
+
+    batch_tasks = {}
+    if len(retry) > 1:
+        progress_ids.set(tuple(entries[index][0] for index in retry))
+        batch_tasks = start_batch_lookup(
+            [entries[index] for index in retry], source_lang, target_lang
+        )
+    # Words left out of the batch (already in flight) are looked up one by one
+    tasks = [
+        asyncio.ensure_future(batched(retry[position], task))
+        for position, task in batch_tasks.items()
+    ]
+    retry = [
+        index for position, index in enumerate(retry) if position not in batch_tasks
+    ]
+
+    tasks += [asyncio.ensure_future(single(index)) for index in retry]
+    try:
+        for future in asyncio.as_completed(tasks):
+            yield await future
+    finally:
+        for task in [*tasks, *batch_tasks.values()]:
+            task.cancel()
+
+
+async def process_job_chunk(
+    job_id: str,
+    chunk: list[tuple[int, str, str, str | None]],
+    source_lang: str,
+    target_lang: str,
+) -> None:
+    """Look up a chunk of job words and record each result as it arrives."""
+    entries = [
+        (raw_word, parsed_word, context) for _, raw_word, parsed_word, context in chunk
+    ]
+    async for index, result in lookup_entries(entries, source_lang, target_lang):
+        # The job store is shared with other worker processes and may have to
+        # wait for their writes, so it is used from a thread
+        await asyncio.to_thread(
+            job_store.record_result, job_id, chunk[index][0], result
+        )
+        notify_job(job_id)
+
+
+async def job_cancelled(job_id: str) -> bool:
+    job = await asyncio.to_thread(job_store.get, job_id)
+    return job is None or job["status"] == jobs.CANCELLED
+
+
+async def run_job(job_id: str) -> None:
+    """Process the words of a job that have no result yet."""
+    # With several worker processes only the one holding the lock runs the job
+    os.makedirs(JOB_LOCKS_DIR, exist_ok=True)
+    lock_path = os.path.join(JOB_LOCKS_DIR, f"{job_id}.lock")
+    lock_fd = try_lock_file(lock_path)
+    if lock_fd is None:
+        logger.info(f"Job {job_id} is being processed by another worker")
+        job_tasks.pop(job_id, None)
+        return
+    try:
+        await _run_locked_job(job_id)
+    finally:
+        job = await asyncio.to_thread(job_store.get, job_id)
+        if job is None or job["status"] not in jobs.UNFINISHED:
+            # Finished jobs are never picked up again
+            os.remove(lock_path)
+        release_lock_file(lock_fd)
+
+
+async def _run_locked_job(job_id: str) -> None:
+    job = await asyncio.to_thread(job_store.get, job_id)
+    if job is None or job["status"] not in jobs.UNFINISHED:
+        job_tasks.pop(job_id, None)
+        return
+
+    # Job words are queued fairly against each other, behind interactive requests
+    current_client.set(f"job-{job_id}")
+    current_lane.set(BULK)
+    await asyncio.to_thread(job_store.set_status, job_id, jobs.RUNNING)
+    pending = await asyncio.to_thread(job_store.pending_words, job_id)
+    logger.info(f"Job {job_id}: {len(pending)} of {job['total']} words pending")
+
+    chunks = iter(
+        [pending[i : i + BATCH_SIZE] for i in range(0, len(pending), BATCH_SIZE)]
+    )
+
+    async def worker() -> None:
+        for chunk in chunks:
+            # Another worker process may have cancelled the job
+            if await job_cancelled(job_id):
+                return
+            await process_job_chunk(
+                job_id, chunk, job["source_lang"], job["target_lang"]
+            )
+
+    try:
+        await asyncio.gather(*(worker() for _ in range(JOB_WORKERS)))
+    except asyncio.CancelledError:
+        logger.info(f"Job {job_id} interrupted")
+        raise
+    except Exception:
+        logger.exception(f"Job {job_id} failed")
+        await asyncio.to_thread(job_store.set_status, job_id, jobs.FAILED)
+    else:
+        if await job_cancelled(job_id):
+            logger.info(f"Job {job_id} cancelled")
+        else:
+            await asyncio.to_thread(job_store.set_status, job_id, jobs.COMPLETED)
+            logger.info(f"Job {job_id} completed")
+    finally:
+        job_tasks.pop(job_id, None)
+        notify_job(job_id)
+
+
+def start_job(job_id: str) -> None:
+    """Run a job in the background unless it is already running."""
+    if job_id not in job_tasks:
+        job_tasks[job_id] = asyncio.create_task(run_job(job_id))
 
 
 @app.get("/health")
@@ -396,6 +1408,44 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus metrics for the word pipeline."""
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
+@app.get("/stats")
+async def get_stats():
+    """Concurrency and queueing statistics for Gemini calls."""
+    return {
+        "scheduler": gemini_scheduler.stats(),
+        "hedging": hedger.stats() if hedger is not None else None,
+        "shared_slots": shared_slots.stats() if shared_slots is not None else None,
+        "worker_pool": (
+            llm_backend.stats() if isinstance(llm_backend, WorkerPoolBackend) else None
+        ),
+        "in_flight_lookups": word_lookups.in_flight(),
+        "shared_lookups": word_lookups.shared_calls,
+    }
+
+
+@app.delete("/cache")
+async def invalidate_cache(
+    word: str | None = None,
+    source_lang: str | None = None,
+    target_lang: str | None = None,
+):
+    """Invalidate cached results. Without filters the whole cache is cleared."""
+    if result_cache is None:
+        raise HTTPException(status_code=404, detail="Result cache is disabled")
+
+    if word:
+        word, _ = parse_word_with_context(word)
+    removed = result_cache.invalidate(word, source_lang, target_lang)
+    logger.info(f"Invalidated {removed} cache entries")
+    return {"removed": removed}
+
+
 def parse_word_with_context(text: str) -> tuple[str, str | None]:
     """
     Parses a string to extract a word and optional context.
@@ -409,32 +1459,42 @@ def parse_word_with_context(text: str) -> tuple[str, str | None]:
             e.g. "[upon himself]" -> word: "upon himself", context: None
             e.g. "[he brought it][upon himself]" -> word: "he brought it", context: "upon himself"
     """
-    bracket_content = re.findall(r"\[(.*?)\]", text)
-
-    # Using re.sub to get text outside brackets.
-    text_with_placeholders = re.sub(r"\[.*?\]", " ", text)
+    if "[" not in text:
+        return text.strip(), None
+
+    # One scan collects the bracketed parts and the text between them
+    bracket_content = []
+    outside = []
+    position = 0
+    for match in BRACKET_RE.finditer(text):
+        outside.append(text[position : match.start()])
+        bracket_content.append(match.group(1))
+        position = match.end()
+    outside.append(text[position:])
+    # Brackets count as a space between the words around them
+    text_with_placeholders = " ".join(outside)
 
     # If after stripping whitespace, there is something left, then Rule 1 applies.
-    if text_with_placeholders.strip():
+    word = text_with_placeholders.strip()
+    if word:
         # Rule 1
-        word = text_with_placeholders.strip()
         context = " ... ".join(bracket_content) if bracket_content else None
         return word, context
-    else:
-        # Rule 2
-        if not bracket_content:
-            # No brackets, no text outside, it's an empty or whitespace string
-            return text.strip(), None
 
-        # The word is the content of the first bracket
-        word = bracket_content[0]
+    # Rule 2
+    if not bracket_content:
+        # No brackets, no text outside, it's an empty or whitespace string
+        return text.strip(), None
 
-        # Context is made of subsequent brackets
-        if len(bracket_content) > 1:
-            context = " ... ".join(bracket_content[1:])
-        else:
-            context = None
-        return word.strip(), context
+    # The word is the content of the first bracket
+    word = bracket_content[0]
+
+    # Context is made of subsequent brackets
+    if len(bracket_content) > 1:
+        context = " ... ".join(bracket_content[1:])
+    else:
+        context = None
+    return word.strip(), context
 
 
 def split_text_respecting_brackets(text: str) -> list[str]:
@@ -445,33 +1505,105 @@ def split_text_respecting_brackets(text: str) -> list[str]:
     if not text:
         return []
 
-    parts = []
-    current_part = []
-    bracket_depth = 0
-
-    for char in text:
-        if char == "[":
-            bracket_depth += 1
-            current_part.append(char)
-        elif char == "]":
-            if bracket_depth > 0:
+    if "[" not in text:
+        parts = text.split(",")
+    elif FLAT_BRACKETS_RE.fullmatch(text):
+        parts = TOP_LEVEL_COMMA_RE.split(text)
+    else:
+        # Nested or unbalanced brackets: split only the text outside them,
+        # gluing each bracketed group to the part it appears in
+        parts = [""]
+        start = 0
+        bracket_depth = 0
+        for match in BRACKET_CHAR_RE.finditer(text):
+            if match.group() == "[":
+                if bracket_depth == 0:
+                    pieces = text[start : match.start()].split(",")
+                    parts[-1] += pieces[0]
+                    parts.extend(pieces[1:])
+                    start = match.start()
+                bracket_depth += 1
+            elif bracket_depth > 0:
                 bracket_depth -= 1
-            current_part.append(char)
-        elif char == "," and bracket_depth == 0:
-            parts.append("".join(current_part).strip())
-            current_part = []
+                if bracket_depth == 0:
+                    parts[-1] += text[start : match.end()]
+                    start = match.end()
+
+        if bracket_depth > 0:
+            # An unclosed bracket runs to the end of the text
+            parts[-1] += text[start:]
         else:
-            current_part.append(char)
+            pieces = text[start:].split(",")
+            parts[-1] += pieces[0]
+            parts.extend(pieces[1:])
+
+    return [p for p in map(str.strip, parts) if p]
+
+
+def split_word_list(text: str) -> list[str]:
+    """Split a word list separated by commas or newlines, respecting brackets."""
+    return split_text_respecting_brackets(text.replace("\r", "").replace("\n", ","))
+
+
+def build_word_entries(raw_words: list[str]) -> list[WordEntry]:
+    """Parse raw words into entries, dropping those without a word."""
+    entries = []
+    for raw_word in raw_words:
+        parsed_word, context = parse_word_with_context(raw_word)
+        if parsed_word:
+            entries.append((raw_word, parsed_word.lower(), context))
+    return entries
+
+
+def choose_renderer(
+    http_request: Request, output_format: str | None
+) -> tuple[str, Callable[[dict], str]]:
+    """
+    Pick the output format from `?format=` or the Accept header.
+    Returns the media type and the function rendering a word result.
+    """
+    if output_format is None:
+        accept = http_request.headers.get("accept", "")
+        output_format = "ndjson" if NDJSON_MEDIA_TYPE in accept else "csv"
+    if output_format not in ("csv", "ndjson"):
+        raise HTTPException(
+            status_code=400, detail="Unknown format. Use 'csv' or 'ndjson'."
+        )
+
+    if output_format == "ndjson":
+        return NDJSON_MEDIA_TYPE, lambda result: json.dumps(result, ensure_ascii=False)
+    return "text/plain; charset=utf-8", format_result_line
 
-    if current_part:
-        parts.append("".join(current_part).strip())
 
-    return [p for p in parts if p]
+def request_lane(word_count: int) -> str:
+    """Scheduling lane of a request that did not choose one."""
+    return INTERACTIVE if word_count <= INTERACTIVE_MAX_WORDS else BULK
 
 
 @app.post("/process-words")
-async def process_words(request: WordsRequest) -> StreamingResponse:
-    """Process comma-separated words and stream results as CSV lines."""
+async def process_words(
+    request: WordsRequest,
+    http_request: Request,
+    output_format: Annotated[str | None, Query(alias="format")] = None,
+    order: Literal["completion", "input"] = "completion",
+    progress: bool = False,
+) -> StreamingResponse:
+    """
+    Process comma-separated words and stream results as CSV lines.
+
+    With `?format=ndjson` or `Accept: application/x-ndjson` every line is
+    a JSON object instead (see word_result).
+
+    Lines come as words finish; `?order=input` sends them in input order.
+    `?progress=true` (NDJSON only) adds event lines such as
+    {"event": "retry", "ids": [...], "attempt": 1} between the results,
+    and a heartbeat after PROGRESS_HEARTBEAT_INTERVAL idle seconds.
+    """
+    media_type, render = choose_renderer(http_request, output_format)
+    if progress and media_type != NDJSON_MEDIA_TYPE:
+        raise HTTPException(
+            status_code=400, detail="Progress events need the ndjson format"
+        )
 
     raw_words = split_text_respecting_brackets(request.text)
 
@@ -484,51 +1616,256 @@ async def process_words(request: WordsRequest) -> StreamingResponse:
             detail=f"Too many words. Maximum: {MAX_WORDS_PER_REQUEST}",
         )
 
-    # Create a list of requests to process, without de-duplication
-    requests_to_process = []
-    for raw_word in raw_words:
-        parsed_word, context = parse_word_with_context(raw_word)
-        if parsed_word:
-            requests_to_process.append((raw_word, parsed_word.lower(), context))
+    # Create a list of requests to process, without de-duplication.
+    # Every word gets its own line; identical lookups share a model call
+    # inside get_word_details.
+    requests_to_process = build_word_entries(raw_words)
+
+    # Model calls of this request are queued fairly against other requests
+    client_id = uuid.uuid4().hex
+    lane = request.priority or request_lane(len(requests_to_process))
 
     logger.info(
-        f"Processing {len(requests_to_process)} words from {request.source_lang} to {request.target_lang}"
+        f"Processing {len(requests_to_process)} words from {request.source_lang} to {request.target_lang} ({lane})"
     )
 
-    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    results: asyncio.Queue[tuple[int | None, dict]] = asyncio.Queue()
 
-    async def constrained_get_word_details(
-        raw_word: str,
-        parsed_word: str,
-        source_lang: str,
-        target_lang: str,
-        context: str | None = None,
-    ) -> str:
-        async with semaphore:
-            try:
-                return await get_word_details(
-                    raw_word, parsed_word, source_lang, target_lang, context
+    async def lookup_chunk(indices: list[int]) -> None:
+        entries = [requests_to_process[i] for i in indices]
+        async for position, result in lookup_entries(
+            entries, request.source_lang, request.target_lang, check_cache=False
+        ):
+            results.put_nowait((indices[position], result))
+
+    async def stream_results() -> AsyncGenerator[str, None]:
+        """Generate a line for each processed word as it completes."""
+        current_client.set(client_id)
+        current_lane.set(lane)
+        if progress:
+            # Events are queued with the results and sent in between them
+            progress_listener.set(lambda event: results.put_nowait((None, event)))
+
+        total = len(requests_to_process)
+        pending_words = list(range(total))
+        if BATCH_SIZE > 1:
+            # Only words missing from the cache are worth batching
+            pending_words = []
+            for index, (raw_word, parsed_word, context) in enumerate(
+                requests_to_process
+            ):
+                cached = get_cached_word_data(
+                    raw_word,
+                    parsed_word,
+                    request.source_lang,
+                    request.target_lang,
+                    context,
+                )
+                if cached is not None:
+                    result = word_result(raw_word, cached, source="cache")
+                    results.put_nowait((index, result))
+                else:
+                    pending_words.append(index)
+
+        chunks = deque(
+            pending_words[i : i + BATCH_SIZE]
+            for i in range(0, len(pending_words), BATCH_SIZE)
+        )
+        tasks: list[asyncio.Task] = []
+        held_back: dict[int, dict] = {}
+        next_index = 0
+        sent = 0
+        last_line_at = time.monotonic()
+        try:
+            while sent < total:
+                # An ordered stream only looks ORDERED_WINDOW words ahead
+                while chunks and (
+                    order == "completion" or chunks[0][0] < next_index + ORDERED_WINDOW
+                ):
+                    tasks.append(asyncio.ensure_future(lookup_chunk(chunks.popleft())))
+
+                try:
+                    index, item = await asyncio.wait_for(
+                        results.get(), DISCONNECT_CHECK_INTERVAL
+                    )
+                except asyncio.TimeoutError:
+                    if await http_request.is_disconnected():
+                        logger.info(f"Client of request {client_id} disconnected")
+                        break
+                    if (
+                        progress
+                        and time.monotonic() - last_line_at
+                        >= PROGRESS_HEARTBEAT_INTERVAL
+                    ):
+                        last_line_at = time.monotonic()
+                        heartbeat = {"event": "heartbeat", "done": sent, "total": total}
+                        yield f"{render(heartbeat)}\n"
+                    continue
+
+                if index is None:
+                    last_line_at = time.monotonic()
+                    yield f"{render(item)}\n"
+                    continue
+
+                held_back[index] = item
+                ready = []
+                if order == "completion":
+                    ready.append(held_back.pop(index))
+                while next_index in held_back:
+                    ready.append(held_back.pop(next_index))
+                    next_index += 1
+                for result in ready:
+                    sent += 1
+                    yield f"{render(result)}\n"
+                if ready:
+                    last_line_at = time.monotonic()
+        finally:
+            # If the stream is abandoned, stop the model calls nobody will read.
+            # Cancelled tasks kill their gemini processes; finished words are
+            # already in the result cache.
+            pending = [task for task in tasks if not task.done()]
+            for task in pending:
+                task.cancel()
+            if pending:
+                logger.info(
+                    f"Request {client_id} abandoned after {sent} of "
+                    f"{total} words; cancelled {len(pending)} pending lookups"
                 )
-            except Exception as e:
-                logger.exception(f"Error processing '{raw_word}'")
-                return format_error_response(raw_word, f"Error: {str(e)}")
+
+    return StreamingResponse(
+        stream_results(),
+        media_type=media_type,
+        headers={
+            "X-Content-Type-Options": "nosniff",
+            "Cache-Control": "no-cache",
+        },
+    )
+
+
+async def create_job_from_text(text: str, source_lang: str, target_lang: str) -> dict:
+    """Validate a word list, store it as a job and start processing it."""
+    raw_words = split_word_list(text)
+    if not raw_words:
+        raise HTTPException(status_code=400, detail="No valid words provided")
+    if len(raw_words) > MAX_WORDS_PER_JOB:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many words. Maximum: {MAX_WORDS_PER_JOB}",
+        )
+
+    entries = build_word_entries(raw_words)
+    job_id = await asyncio.to_thread(
+        job_store.create, entries, source_lang, target_lang
+    )
+    logger.info(
+        f"Created job {job_id} with {len(entries)} words from {source_lang} to {target_lang}"
+    )
+    start_job(job_id)
+    return job_store.get(job_id)
+
+
+def get_job_or_404(job_id: str) -> dict:
+    job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@app.post("/jobs", status_code=202)
+async def create_job(request: JobRequest):
+    """Queue a large list of comma- or newline-separated words."""
+    return await create_job_from_text(
+        request.text, request.source_lang, request.target_lang
+    )
+
+
+@app.post("/jobs/upload", status_code=202)
+async def upload_job(
+    http_request: Request, source_lang: str = "English", target_lang: str = "Russian"
+):
+    """Queue the words of a text file sent as the request body."""
+    too_large = HTTPException(
+        status_code=413,
+        detail=f"File too large. Maximum: {MAX_JOB_TEXT_LENGTH} bytes",
+    )
+    try:
+        declared = int(http_request.headers.get("content-length", "0"))
+    except ValueError:
+        declared = 0
+    if declared > MAX_JOB_TEXT_LENGTH:
+        raise too_large
+
+    # Content-Length may be missing (chunked uploads), so count while reading
+    body = bytearray()
+    async for chunk in http_request.stream():
+        body.extend(chunk)
+        if len(body) > MAX_JOB_TEXT_LENGTH:
+            raise too_large
+    try:
+        text = bytes(body).decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="The file must be UTF-8 text")
+    return await create_job_from_text(text, source_lang, target_lang)
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Status and progress of a job."""
+    return get_job_or_404(job_id)
+
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """Stop a job. Results recorded so far stay available."""
+    job = get_job_or_404(job_id)
+    if job["status"] in jobs.UNFINISHED:
+        await asyncio.to_thread(job_store.set_status, job_id, jobs.CANCELLED)
+        task = job_tasks.get(job_id)
+        if task is not None:
+            task.cancel()
+    return job_store.get(job_id)
+
+
+@app.get("/jobs/{job_id}/results")
+async def get_job_results(
+    job_id: str,
+    http_request: Request,
+    output_format: Annotated[str | None, Query(alias="format")] = None,
+    offset: int = 0,
+    follow: bool = True,
+) -> StreamingResponse:
+    """
+    Stream the results of a job in the order they were produced.
+
+    Results already recorded are sent at once; with `follow` the stream stays
+    open until the job finishes. `offset` skips results a client already has,
+    so a dropped stream can be resumed.
+    """
+    get_job_or_404(job_id)
+    media_type, render = choose_renderer(http_request, output_format)
 
     async def stream_results() -> AsyncGenerator[str, None]:
-        """Generate CSV lines for each processed word as they complete."""
-        tasks = [
-            constrained_get_word_details(
-                raw_word, parsed_word, request.source_lang, request.target_lang, context
-            )
-            for raw_word, parsed_word, context in requests_to_process
-        ]
+        sent = max(0, offset)
+        while True:
+            # Subscribe before reading so no update is missed
+            update = job_updates.setdefault(job_id, asyncio.Event())
+            running = job_store.get(job_id)["status"] in jobs.UNFINISHED
 
-        for task in asyncio.as_completed(tasks):
-            result = await task
-            yield f"{result}\n"
+            for result in job_store.results(job_id, sent):
+                sent += 1
+                yield f"{render(result)}\n"
+
+            if not running or not follow:
+                break
+            try:
+                await asyncio.wait_for(update.wait(), DISCONNECT_CHECK_INTERVAL)
+            except asyncio.TimeoutError:
+                if await http_request.is_disconnected():
+                    break
 
     return StreamingResponse(
         stream_results(),
-        media_type="text/plain; charset=utf-8",
+        media_type=media_type,
         headers={
             "X-Content-Type-Options": "nosniff",
             "Cache-Control": "no-cache",
@@ -0,0 +1,316 @@
+"""Minimal Prometheus-compatible metrics for the word pipeline."""
+
+import math
+import threading
+from collections.abc import Callable
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple = (),
+        registry: "Registry | None" = None,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        (registry or REGISTRY).register(self)
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> list[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple = (),
+        registry: "Registry | None" = None,
+    ):
+        super().__init__(name, documentation, labelnames, registry)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}"
+            for key, v in items
+        ]
+
+
+class Gauge(Metric):
+    """Gauge set directly, or computed on scrape when `function` is given."""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple = (),
+        function: Callable[[], float] | None = None,
+        registry: "Registry | None" = None,
+    ):
+        super().__init__(name, documentation, labelnames, registry)
+        self._values: dict[tuple, float] = {}
+        self._function = function
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        self._function = function
+
+    def value(self, **labels) -> float:
+        if self._function is not None:
+            return self._function()
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> list[str]:
+        if self._function is not None:
+            return [f"{self.name} {_format_value(self._function())}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}"
+            for key, v in items
+        ]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple = (),
+        buckets: tuple = DEFAULT_BUCKETS,
+        registry: "Registry | None" = None,
+    ):
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # label values -> (bucket counts, sum, count)
+        self._values: dict[tuple, list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def count(self, **labels) -> int:
+        state = self._values.get(self._key(labels))
+        return state[2] if state else 0
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            items = sorted(
+                (key, (list(state[0]), state[1], state[2]))
+                for key, state in self._values.items()
+            )
+
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(
+                    self.labelnames, key, f'le="{_format_value(bound)}"'
+                )
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        return "\n".join(m.render() for m in self._metrics.values()) + "\n"
+
+
+REGISTRY = Registry()
+
+LANG_LABELS = ("source_lang", "target_lang", "model")
+
+# Languages offered by the frontend. Request strings are free-form, so any
+# other value is reported as "other" to keep the number of series bounded.
+KNOWN_LANGUAGES = frozenset(
+    (
+        "Chinese",
+        "English",
+        "French",
+        "German",
+        "Italian",
+        "Japanese",
+        "Korean",
+        "Portuguese",
+        "Russian",
+        "Spanish",
+        "Slovak",
+    )
+)
+
+
+def language_label(language: str) -> str:
+    """Label value for a language: its name if known, "other" otherwise."""
+    return language if language in KNOWN_LANGUAGES else "other"
+
+
+WORD_LOOKUP_SECONDS = Histogram(
+    "vocab_word_lookup_seconds",
+    "Time to produce the result line of a word.",
+    LANG_LABELS + ("source", "lane"),
+)
+WORD_ATTEMPTS = Histogram(
+    "vocab_word_attempts",
+    "Model attempts needed per word lookup.",
+    LANG_LABELS,
+    buckets=(1, 2, 3, 5, 10),
+)
+CACHE_LOOKUPS = Counter(
+    "vocab_cache_lookups_total",
+    "Result cache lookups by result (hit or miss).",
+    LANG_LABELS + ("result",),
+)
+CAPACITY_ERRORS = Counter(
+    "vocab_capacity_errors_total",
+    "Model calls rejected because API capacity was exhausted.",
+    LANG_LABELS,
+)
+FIX_JSON_CALLS = Counter(
+    "vocab_fix_json_calls_total",
+    "Calls to the JSON-fixing model by outcome (success or failure).",
+    ("model", "outcome"),
+)
+JSON_LOCAL_REPAIRS = Counter(
+    "vocab_json_local_repairs_total",
+    "Malformed model outputs repaired locally, avoiding a JSON-fixing model call.",
+    ("model",),
+)
+MODEL_CALL_SECONDS = Histogram(
+    "vocab_model_call_seconds",
+    "Duration of a single model call.",
+    ("backend", "model"),
+)
+SUBPROCESS_SPAWN_SECONDS = Histogram(
+    "vocab_subprocess_spawn_seconds",
+    "Time to start a gemini-cli process.",
+    ("model",),
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+)
+POOL_WORKER_EXITS = Counter(
+    "vocab_pool_worker_exits_total",
+    "Pool workers replaced, by reason (recycle, crash, timeout, health, ...).",
+    ("reason",),
+)
+HEDGED_CALLS = Counter(
+    "vocab_hedged_calls_total",
+    "Slow model calls duplicated by a hedge attempt.",
+)
+HEDGE_WINS = Counter(
+    "vocab_hedge_wins_total",
+    "Hedge attempts that finished before the call they duplicated.",
+)
+QUEUE_WAIT_SECONDS = Histogram(
+    "vocab_queue_wait_seconds",
+    "Time spent waiting for a free model call slot.",
+    ("model", "lane"),
+)
+MODEL_CALLS_IN_FLIGHT = Gauge(
+    "vocab_model_calls_in_flight",
+    "Model calls (gemini processes for the CLI backend) currently running.",
+    ("model",),
+)
+QUEUE_DEPTH = Gauge(
+    "vocab_queue_depth",
+    "Model calls waiting for a free slot.",
+)
+CONCURRENCY_LIMIT = Gauge(
+    "vocab_concurrency_limit",
+    "Current limit of concurrent model calls (adjusted by adaptive concurrency).",
+)
+
+
+def render() -> str:
+    """Render all registered metrics in the Prometheus text format."""
+    return REGISTRY.render()
@@ -0,0 +1,148 @@
+"""
+Vocabulary packs: precomputed word results for a language pair.
+
+A pack is a JSON Lines file. The first line is the header, every other
+line one word:
+
+    {"format": "vocabmaster-pack", "version": 1, "source_lang": "English",
+     "target_lang": "Russian", "model": "...", "prompt_hash": "...", ...}
+    {"word": "run", "context": null, "data": {"infinitive": "run", ...}}
+
+Packs are built with `python -m backend.build_pack` and loaded into the
+result cache when the server starts. Results depend on the model and the
+prompt, so a pack is only loaded while both still match its header.
+"""
+
+import json
+import logging
+import os
+import time
+from collections.abc import Callable
+
+from backend.cache import ResultCache, make_cache_key
+
+logger = logging.getLogger(__name__)
+
+PACK_FORMAT = "vocabmaster-pack"
+PACK_VERSION = 1
+PACK_SUFFIX = ".jsonl"
+
+
+def pack_header(
+    source_lang: str, target_lang: str, model: str, prompt_hash: str
+) -> dict:
+    return {
+        "format": PACK_FORMAT,
+        "version": PACK_VERSION,
+        "source_lang": source_lang,
+        "target_lang": target_lang,
+        "model": model,
+        "prompt_hash": prompt_hash,
+        "created_at": time.time(),
+    }
+
+
+def same_pack(header: dict, other: dict) -> bool:
+    """Whether two headers describe results of the same pipeline."""
+    fields = ("source_lang", "target_lang", "model", "prompt_hash")
+    return all(header.get(field) == other.get(field) for field in fields)
+
+
+def read_pack(path: str) -> tuple[dict, list[dict]]:
+    """
+    Header and entries of a pack. Raises ValueError if the file is not a
+    pack this version can read. Malformed entries, such as a last line cut
+    off while the pack was built, are skipped.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        try:
+            header = json.loads(f.readline())
+        except ValueError:
+            raise ValueError(f"{path} is not a vocabulary pack")
+        if not isinstance(header, dict) or header.get("format") != PACK_FORMAT:
+            raise ValueError(f"{path} is not a vocabulary pack")
+        if header.get("version") != PACK_VERSION:
+            raise ValueError(
+                f"{path} has pack version {header.get('version')}, "
+                f"expected {PACK_VERSION}"
+            )
+
+        entries = []
+        for line_number, line in enumerate(f, start=2):
+            try:
+                entry = json.loads(line)
+                if entry["word"] and isinstance(entry["data"], dict):
+                    entries.append(entry)
+                    continue
+            except (ValueError, KeyError, TypeError):
+                pass
+            logger.warning(f"Skipping malformed line {line_number} of {path}")
+    return header, entries
+
+
+def load_packs(
+    cache: ResultCache,
+    packs_dir: str,
+    model: str,
+    prompt_hash: Callable[[str, str], str],
+) -> int:
+    """
+    Add the words of every pack in `packs_dir` to the cache, keeping
+    entries already cached. `prompt_hash(source_lang, target_lang)` gives
+    the hash of the prompt currently used for a language pair. Returns the
+    number of words added.
+    """
+    if not os.path.isdir(packs_dir):
+        return 0
+
+    added = 0
+    for name in sorted(os.listdir(packs_dir)):
+        if not name.endswith(PACK_SUFFIX):
+            continue
+        path = os.path.join(packs_dir, name)
+        try:
+            header, entries = read_pack(path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Skipping pack {name}: {e}")
+            continue
+
+        source_lang = header["source_lang"]
+        target_lang = header["target_lang"]
+        current = pack_header(
+            source_lang, target_lang, model, prompt_hash(source_lang, target_lang)
+        )
+        if not same_pack(header, current):
+            logger.warning(
+                f"Skipping pack {name}: built for model {header.get('model')} "
+                f"and prompt {header.get('prompt_hash')}, now {model} and "
+                f"{current['prompt_hash']}; rebuild it"
+            )
+            continue
+
+        rows = (
+            (
+                make_cache_key(
+                    entry["word"],
+                    entry.get("context"),
+                    source_lang,
+                    target_lang,
+                    model,
+                    header["prompt_hash"],
+                ),
+                entry["data"],
+                " ".join(entry["word"].lower().split()),
+                entry.get("context"),
+                source_lang,
+                target_lang,
+                model,
+                header["prompt_hash"],
+            )
+            for entry in entries
+        )
+        new = cache.put_many(rows)
+        added += new
+        logger.info(
+            f"Loaded pack {name}: {len(entries)} words from {source_lang} "
+            f"to {target_lang}, {new} new in the cache"
+        )
+    return added
@@ -0,0 +1,113 @@
+"""
+Long-lived model worker for LLM_BACKEND=pool.
+
+Reads one JSON request per line on stdin and writes one JSON reply per line
+on stdout, until stdin is closed:
+
+    {"id": 1, "prompt": "..."}  ->  {"id": 1, "output": "..."}
+                                    {"id": 1, "error": "...", "kind": "capacity"}
+    {"id": 2, "ping": true}     ->  {"id": 2, "pong": true}
+
+`kind` is "auth", "network", "capacity", "error", "timeout" or "not_found".
+Prompts are answered by the backend named in POOL_WORKER_BACKEND ("http" or
+"stub"), created once so its connections stay open between prompts. There is
+no default: with "http" the worker only adds a hop in front of what
+LLM_BACKEND=http does in-process, and it cannot keep a gemini-cli session
+open. The pool pays off with a program speaking this protocol that holds a
+model session, run via POOL_WORKER_COMMAND.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sys
+
+from backend.llm import (
+    LLMBackend,
+    LLMNotFoundError,
+    LLMResponseError,
+    LLMTimeoutError,
+    create_backend,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def backend_from_env() -> LLMBackend:
+    name = os.getenv("POOL_WORKER_BACKEND", "").lower()
+    if not name:
+        raise ValueError("Set POOL_WORKER_BACKEND to the backend the worker uses")
+    if name == "pool":
+        raise ValueError("A pool worker cannot use the pool backend itself")
+    try:
+        timeout = float(os.getenv("COMMAND_TIMEOUT", "120"))
+    except ValueError:
+        timeout = 120.0
+    try:
+        stub_latency = int(os.getenv("STUB_LATENCY_MS", "0")) / 1000
+    except ValueError:
+        stub_latency = 0.0
+    return create_backend(
+        name,
+        model=os.getenv("GEMINI_MODEL", "gemini-2.5-flash"),
+        timeout=timeout,
+        api_key=os.getenv("GEMINI_API_KEY", ""),
+        base_url=os.getenv(
+            "GEMINI_API_BASE", "https://generativelanguage.googleapis.com"
+        ),
+        max_connections=1,
+        stub_latency=stub_latency,
+    )
+
+
+async def handle(backend: LLMBackend, request: dict) -> dict:
+    """Reply to one request."""
+    reply = {"id": request.get("id")}
+    if request.get("ping"):
+        reply["pong"] = True
+        return reply
+
+    try:
+        reply["output"] = await backend.generate(request["prompt"])
+    except LLMNotFoundError as e:
+        reply.update(error=str(e), kind="not_found")
+    except LLMTimeoutError as e:
+        reply.update(error=str(e), kind="timeout")
+    except LLMResponseError as e:
+        reply.update(error=str(e), kind=e.kind, stdout=e.stdout)
+    except Exception as e:
+        logger.exception("Pool worker failed to answer a prompt")
+        reply.update(error=f"Pool worker error: {e}", kind="error")
+    return reply
+
+
+def main() -> None:
+    # stdout carries the protocol; logs go to stderr
+    logging.basicConfig(
+        level=os.getenv("LOG_LEVEL", "INFO").upper(),
+        format="%(asctime)s - pool worker %(process)d - %(levelname)s - %(message)s",
+        stream=sys.stderr,
+    )
+    backend = backend_from_env()
+    # One loop for the worker's lifetime keeps the backend's connections usable
+    loop = asyncio.new_event_loop()
+    try:
+        for line in sys.stdin:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except ValueError:
+                logger.warning(f"Ignoring malformed request: {line[:200]!r}")
+                continue
+            reply = loop.run_until_complete(handle(backend, request))
+            sys.stdout.write(json.dumps(reply, ensure_ascii=False) + "\n")
+            sys.stdout.flush()
+    finally:
+        loop.run_until_complete(backend.aclose())
+        loop.close()
+
+
+if __name__ == "__main__":
+    main()
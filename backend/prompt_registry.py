@@ -0,0 +1,160 @@
+"""Prompt templates loaded once, pre-split for substitution and hot-reloaded."""
+
+import asyncio
+import logging
+import os
+import string
+
+from backend.cache import hash_prompt
+
+logger = logging.getLogger(__name__)
+
+# Templates that must exist in the prompts directory
+REQUIRED_PROMPTS = ("prompt", "fix_json_prompt", "batch_prompt")
+
+# Bound on remembered language pairs; they come straight from requests
+MAX_RESOLVED_PAIRS = 1024
+
+
+class CompiledTemplate:
+    """
+    A `str.format` template split once into literal text and field names.
+
+    `render` produces the same string as `text.format(**values)`;
+    with `single_line=True` it also replaces newlines with spaces and strips
+    the result, like `text.format(**values).replace("\\n", " ").strip()`.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.hash = hash_prompt(text)
+        self._literals: list[str] = []
+        self._fields: list[str | None] = []
+        self._simple = True
+
+        for literal, field, spec, conversion in string.Formatter().parse(text):
+            self._literals.append(literal)
+            self._fields.append(field)
+            if field is not None and (spec or conversion or not field.isidentifier()):
+                self._simple = False
+
+        self._flat_literals = [part.replace("\n", " ") for part in self._literals]
+
+    def render(self, single_line: bool = False, **values: str) -> str:
+        if not self._simple:
+            result = self.text.format(**values)
+            return result.replace("\n", " ").strip() if single_line else result
+
+        literals = self._flat_literals if single_line else self._literals
+        parts = []
+        for literal, field in zip(literals, self._fields):
+            parts.append(literal)
+            if field is not None:
+                value = str(values[field])
+                parts.append(value.replace("\n", " ") if single_line else value)
+        result = "".join(parts)
+        return result.strip() if single_line else result
+
+
+def _sanitize(language: str) -> str:
+    # Prevent directory traversal or invalid filenames
+    return "".join(c for c in language if c.isalnum())
+
+
+class PromptRegistry:
+    """
+    All `*.txt` templates of a prompts directory, kept in memory.
+
+    Language-specific prompts are looked up as `prompt_<Source>_<Target>`,
+    then `prompt_<Source>`, then the default `prompt`; the result is resolved
+    once per language pair. `reload_if_changed` (or the `watch` task) picks up
+    edited, added or removed files without a restart.
+    """
+
+    def __init__(self, prompts_dir: str):
+        self.prompts_dir = prompts_dir
+        self._templates: dict[str, CompiledTemplate] = {}
+        self._resolved: dict[tuple[str, str], CompiledTemplate] = {}
+        self._signature: tuple = ()
+        self.reloads = 0
+        self.load()
+
+    def _scan(self) -> tuple:
+        """Names, modification times and sizes of all template files."""
+        entries = []
+        with os.scandir(self.prompts_dir) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.endswith(".txt"):
+                    stat = entry.stat()
+                    entries.append((entry.name, stat.st_mtime_ns, stat.st_size))
+        return tuple(sorted(entries))
+
+    def load(self) -> None:
+        """Read every template. Raises FileNotFoundError if a required one is missing."""
+        signature = self._scan()
+        templates = {}
+        for name, _, _ in signature:
+            with open(os.path.join(self.prompts_dir, name), "r") as f:
+                templates[name[: -len(".txt")]] = CompiledTemplate(f.read().strip())
+
+        for name in REQUIRED_PROMPTS:
+            if name not in templates:
+                raise FileNotFoundError(
+                    2,
+                    "Prompt file not found",
+                    os.path.join(self.prompts_dir, name + ".txt"),
+                )
+
+        # Swap everything at once so lookups never see a half-loaded state
+        self._templates = templates
+        self._resolved = {}
+        self._signature = signature
+        logger.debug(
+            f"Loaded {len(templates)} prompt templates from {self.prompts_dir}"
+        )
+
+    def reload_if_changed(self) -> bool:
+        """Reload the templates if any file changed since the last load."""
+        try:
+            if self._scan() == self._signature:
+                return False
+            self.load()
+        except (OSError, ValueError) as e:
+            logger.warning(f"Failed to reload prompts, keeping the previous ones: {e}")
+            return False
+
+        self.reloads += 1
+        logger.info("Prompt templates reloaded")
+        return True
+
+    async def watch(self, interval: float) -> None:
+        """Poll the prompts directory every `interval` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            await asyncio.to_thread(self.reload_if_changed)
+
+    def get(self, name: str) -> CompiledTemplate:
+        return self._templates[name]
+
+    def for_languages(self, source_lang: str, target_lang: str) -> CompiledTemplate:
+        key = (source_lang, target_lang)
+        template = self._resolved.get(key)
+        if template is not None:
+            return template
+
+        safe_source = _sanitize(source_lang)
+        safe_target = _sanitize(target_lang)
+        for name in (f"prompt_{safe_source}_{safe_target}", f"prompt_{safe_source}"):
+            if name in self._templates:
+                logger.debug(
+                    f"Using prompt {name}.txt for {source_lang}->{target_lang}"
+                )
+                template = self._templates[name]
+                break
+        else:
+            template = self._templates["prompt"]
+
+        if len(self._resolved) >= MAX_RESOLVED_PAIRS:
+            self._resolved.clear()
+        self._resolved[key] = template
+        return template
@@ -1,13 +1,34 @@
 #!/usr/bin/env python
 """Script for starting the backend server."""
 
+import argparse
 import os
 import sys
 import uvicorn
 
 
-def main():
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Start the VocabMaster backend.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--production",
+        action="store_true",
+        help="Run without auto-reload (implied by --workers)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes sharing MAX_CONCURRENT_REQUESTS",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None):
     """Entry point for starting the server."""
+    args = parse_args(argv)
+
     # Ensure project root is in sys.path so 'backend.main' can be imported
     # regardless of where this script is called from.
     script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -16,8 +37,29 @@ def main():
     if root_dir not in sys.path:
         sys.path.insert(0, root_dir)
 
+    if not args.production and args.workers <= 1:
+        uvicorn.run(
+            "backend.main:app",
+            host=args.host,
+            port=args.port,
+            reload=True,
+            log_level="info",
+        )
+        return
+
+    if args.workers > 1:
+        # Workers inherit the environment; the lock files in this directory
+        # keep their combined Gemini calls within MAX_CONCURRENT_REQUESTS
+        os.environ.setdefault(
+            "SHARED_SLOTS_DIR", os.path.join(root_dir, "data", "slots")
+        )
+
     uvicorn.run(
-        "backend.main:app", host="127.0.0.1", port=8000, reload=True, log_level="info"
+        "backend.main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        log_level="info",
     )
 
 
@@ -0,0 +1,283 @@
+"""Process-wide concurrency limit and fair queuing for Gemini calls."""
+
+import asyncio
+import logging
+import math
+import random
+import time
+from collections import OrderedDict, deque
+from collections.abc import AsyncIterator, Callable, Hashable
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+
+logger = logging.getLogger(__name__)
+
+# Priority lanes, highest first: interactive lookups are served before bulk work
+INTERACTIVE = "interactive"
+BULK = "bulk"
+LANES = (INTERACTIVE, BULK)
+
+# Identifies the request on whose behalf a model call is made
+current_client: ContextVar[Hashable] = ContextVar("current_client", default=None)
+# Lane of the request on whose behalf a model call is made
+current_lane: ContextVar[str] = ContextVar("current_lane", default=INTERACTIVE)
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Exponential backoff with full jitter for the given (0-based) retry."""
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+class FairScheduler:
+    """
+    Limits the number of concurrent model calls across the whole process.
+
+    When all slots are busy, waiters are queued per client and served
+    round-robin, so a client with many queued words cannot starve a client
+    asking for a single one. Waiters in the interactive lane always go
+    before bulk ones, and bulk calls never take the last `reserved` slots,
+    so an interactive lookup rarely has to wait for a bulk call to end.
+    A call shared by several requests can pass `lane_of`, telling the lane
+    it currently belongs to; reprioritize() moves such queued calls up.
+
+    With `adaptive` enabled the limit follows AIMD: every successful call
+    adds 1/limit, an overload signal (capacity error or timeout) halves it,
+    at most once per `cooldown` seconds and never below `min_concurrent`.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        min_concurrent: int = 1,
+        adaptive: bool = False,
+        cooldown: float = 5.0,
+        reserved: int = 0,
+    ):
+        self.max_concurrent = max(1, max_concurrent)
+        self.reserved = max(0, reserved)
+        self.min_concurrent = max(1, min(min_concurrent, self.max_concurrent))
+        self.adaptive = adaptive
+        self.cooldown = cooldown
+        self.limit = float(self.max_concurrent)
+        self._last_decrease = -math.inf
+        self.active = 0
+        self.active_by_lane = dict.fromkeys(LANES, 0)
+        self._queues: dict[str, OrderedDict[Hashable, deque[asyncio.Future]]] = {
+            lane: OrderedDict() for lane in LANES
+        }
+        # Queued waiters whose lane may change
+        self._lane_of: dict[asyncio.Future, Callable[[], str]] = {}
+
+        # Metrics
+        self.total_started = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self._lane_started = dict.fromkeys(LANES, 0)
+        self._lane_wait_seconds = dict.fromkeys(LANES, 0.0)
+        self._lane_max_wait_seconds = dict.fromkeys(LANES, 0.0)
+
+    def queue_depth(self, lane: str | None = None) -> int:
+        lanes = LANES if lane is None else (lane,)
+        return sum(
+            1
+            for name in lanes
+            for queue in self._queues[name].values()
+            for fut in queue
+            if not fut.done()
+        )
+
+    @property
+    def capacity(self) -> int:
+        return max(self.min_concurrent, int(self.limit))
+
+    def _has_room(self, lane: str) -> bool:
+        if self.active >= self.capacity:
+            return False
+        if lane == BULK:
+            # Keep the reserved slots for interactive calls, but never stall bulk
+            bulk_capacity = max(1, self.capacity - self.reserved)
+            return self.active_by_lane[BULK] < bulk_capacity
+        return True
+
+    def record_success(self) -> None:
+        """Additive increase after a healthy model call."""
+        if not self.adaptive or self.limit >= self.max_concurrent:
+            return
+        self.limit = min(self.max_concurrent, self.limit + 1 / self.limit)
+        self._dispatch()
+
+    def record_overload(self) -> None:
+        """Multiplicative decrease after a capacity error or timeout."""
+        if not self.adaptive:
+            return
+        now = time.monotonic()
+        # Calls already in flight fail together; count them as one signal
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        previous = self.capacity
+        self.limit = max(float(self.min_concurrent), self.limit / 2)
+        if self.capacity != previous:
+            logger.warning(
+                f"Model overloaded, lowering concurrency {previous} -> {self.capacity}"
+            )
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "current_limit": self.capacity,
+            "reserved_for_interactive": self.reserved,
+            "active": self.active,
+            "queued": self.queue_depth(),
+            "clients_waiting": sum(len(queues) for queues in self._queues.values()),
+            "total_started": self.total_started,
+            "avg_wait_seconds": (
+                self.total_wait_seconds / self.total_started
+                if self.total_started
+                else 0.0
+            ),
+            "max_wait_seconds": self.max_wait_seconds,
+            "lanes": {
+                lane: {
+                    "active": self.active_by_lane[lane],
+                    "queued": self.queue_depth(lane),
+                    "started": self._lane_started[lane],
+                    "avg_wait_seconds": (
+                        self._lane_wait_seconds[lane] / self._lane_started[lane]
+                        if self._lane_started[lane]
+                        else 0.0
+                    ),
+                    "max_wait_seconds": self._lane_max_wait_seconds[lane],
+                }
+                for lane in LANES
+            },
+        }
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        client_id: Hashable = None,
+        lane: str = INTERACTIVE,
+        lane_of: Callable[[], str] | None = None,
+    ) -> AsyncIterator[str]:
+        """Hold one concurrency slot for the block; yields the lane it was granted in."""
+        lane = await self.acquire(client_id, lane, lane_of)
+        try:
+            yield lane
+        finally:
+            self.release(lane)
+
+    async def acquire(
+        self,
+        client_id: Hashable = None,
+        lane: str = INTERACTIVE,
+        lane_of: Callable[[], str] | None = None,
+    ) -> str:
+        """Wait for a slot; returns the lane it was granted in, for release()."""
+        started = time.monotonic()
+        if lane_of is not None:
+            lane = lane_of()
+
+        if self._has_room(lane) and not self._waiting_before(lane):
+            self._take(lane)
+            self._record_start(lane, 0.0)
+            return lane
+
+        future = asyncio.get_running_loop().create_future()
+        self._queues[lane].setdefault(client_id, deque()).append(future)
+        if lane_of is not None:
+            self._lane_of[future] = lane_of
+        try:
+            lane = await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just before cancellation; pass it on
+                self.release(future.result())
+            else:
+                self._discard(client_id, future)
+            raise
+        finally:
+            self._lane_of.pop(future, None)
+
+        self._record_start(lane, time.monotonic() - started)
+        return lane
+
+    def release(self, lane: str = INTERACTIVE) -> None:
+        self.active -= 1
+        self.active_by_lane[lane] -= 1
+        self._dispatch()
+
+    def reprioritize(self) -> None:
+        """Move queued bulk calls that now serve an interactive request up."""
+        moved = False
+        bulk = self._queues[BULK]
+        for client_id, queue in list(bulk.items()):
+            for future in list(queue):
+                lane_of = self._lane_of.get(future)
+                if lane_of is None or future.done() or lane_of() != INTERACTIVE:
+                    continue
+                queue.remove(future)
+                interactive = self._queues[INTERACTIVE]
+                interactive.setdefault(client_id, deque()).append(future)
+                moved = True
+            if not queue:
+                del bulk[client_id]
+        if moved:
+            self._dispatch()
+
+    def _take(self, lane: str) -> None:
+        self.active += 1
+        self.active_by_lane[lane] += 1
+
+    def _waiting_before(self, lane: str) -> bool:
+        """Whether anyone in this lane or a higher one is already waiting."""
+        for name in LANES:
+            if self._queues[name]:
+                return True
+            if name == lane:
+                return False
+        return False
+
+    def _dispatch(self) -> None:
+        for lane in LANES:
+            queues = self._queues[lane]
+            while queues and self._has_room(lane):
+                client_id, queue = next(iter(queues.items()))
+                future = queue.popleft()
+                if queue:
+                    # Rotate so the next slot goes to another client
+                    queues.move_to_end(client_id)
+                else:
+                    del queues[client_id]
+
+                if future.done():
+                    continue
+
+                self._take(lane)
+                future.set_result(lane)
+            if queues:
+                # Lower lanes wait until this one is served
+                return
+
+    def _discard(self, client_id: Hashable, future: asyncio.Future) -> None:
+        # Look in every lane: the waiter may have been moved up
+        for queues in self._queues.values():
+            queue = queues.get(client_id)
+            if queue is None or future not in queue:
+                continue
+            queue.remove(future)
+            if not queue:
+                del queues[client_id]
+            return
+
+    def _record_start(self, lane: str, waited: float) -> None:
+        self.total_started += 1
+        self.total_wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        self._lane_started[lane] += 1
+        self._lane_wait_seconds[lane] += waited
+        self._lane_max_wait_seconds[lane] = max(
+            self._lane_max_wait_seconds[lane], waited
+        )
+        if waited > 1:
+            logger.debug(f"Model call ({lane}) waited {waited:.2f}s for a free slot")
@@ -0,0 +1,63 @@
+"""Local stand-in for the Gemini REST API, answering with the stub backend."""
+
+import argparse
+import asyncio
+
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel
+
+from backend.llm import stub_response
+
+
+class Part(BaseModel):
+    text: str = ""
+
+
+class Content(BaseModel):
+    parts: list[Part]
+
+
+class GenerateRequest(BaseModel):
+    contents: list[Content]
+
+
+app = FastAPI(title="Gemini Stub API")
+app.state.latency = 0.0
+
+
+@app.post("/v1beta/models/{model_action}")
+async def generate_content(model_action: str, request: GenerateRequest):
+    """Mimics `models/{model}:generateContent` with deterministic answers."""
+    if not model_action.endswith(":generateContent"):
+        raise HTTPException(status_code=404, detail="Unknown method")
+
+    if app.state.latency:
+        await asyncio.sleep(app.state.latency)
+
+    prompt = "".join(
+        part.text for content in request.contents for part in content.parts
+    )
+    return {
+        "candidates": [
+            {"content": {"role": "model", "parts": [{"text": stub_response(prompt)}]}}
+        ]
+    }
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run a local Gemini API stub")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--latency-ms", type=int, default=0, help="Delay before every answer"
+    )
+    args = parser.parse_args()
+
+    app.state.latency = args.latency_ms / 1000
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
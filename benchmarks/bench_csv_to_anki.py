@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+"""
+Benchmark of scripts/csv_to_anki.py, serial against parallel rendering.
+
+Generates synthetic VocabMaster CSVs of the given sizes, converts each one
+with one worker and with `--workers` processes, checks that both packages
+are identical and writes a JSON report that can be compared across commits.
+
+Example:
+    uv run python benchmarks/bench_csv_to_anki.py --rows 50000 200000 --workers 4
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT_DIR)
+
+from scripts.csv_to_anki import csv_to_apkg
+
+# Fixed so that serial and parallel packages can be compared byte for byte
+TIMESTAMP = 1_700_000_000.0
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_csv(path: str, rows: int, examples: int) -> None:
+    """A CSV in the format the backend produces, with `examples` pairs per word."""
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(rows):
+            word = f"word{i}"
+            fields = [word, f"[wɜːd{i}]", f"слово{i}, речь{i}"]
+            for n in range(examples):
+                fields.append(f"Example {n} with #{word}# in a sentence.")
+                fields.append(f"Пример {n} со #словом{i}# в предложении.")
+            fields.append(word)
+            f.write(";".join(f'"{field}"' for field in fields) + "\n")
+
+
+def convert(source: str, output: str, args: argparse.Namespace, workers: int) -> float:
+    started = time.perf_counter()
+    # csv_to_apkg reports on stdout; keep the benchmark output readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        csv_to_apkg(
+            source,
+            output,
+            "Benchmark",
+            args.card_type,
+            chunk_size=args.chunk_size,
+            workers=workers,
+            timestamp=TIMESTAMP,
+        )
+    return time.perf_counter() - started
+
+
+def run_benchmark(args: argparse.Namespace) -> dict:
+    runs = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            source = os.path.join(tmp, f"{rows}.csv")
+            write_csv(source, rows, args.examples)
+            serial_path = os.path.join(tmp, f"{rows}-serial.apkg")
+            parallel_path = os.path.join(tmp, f"{rows}-parallel.apkg")
+
+            serial = convert(source, serial_path, args, 1)
+            parallel = convert(source, parallel_path, args, args.workers)
+            with open(serial_path, "rb") as a, open(parallel_path, "rb") as b:
+                identical = a.read() == b.read()
+
+            runs.append(
+                {
+                    "rows": rows,
+                    "serial_seconds": serial,
+                    "parallel_seconds": parallel,
+                    "serial_rows_per_second": rows / serial,
+                    "parallel_rows_per_second": rows / parallel,
+                    "speedup": serial / parallel,
+                    "identical": identical,
+                }
+            )
+
+    return {
+        "commit": git_commit(),
+        "cpu_count": os.cpu_count(),
+        "config": {
+            "workers": args.workers,
+            "chunk_size": args.chunk_size,
+            "examples": args.examples,
+            "card_type": args.card_type,
+        },
+        "runs": runs,
+    }
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[50000, 200000], help="CSV sizes"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count() or 1, help="Parallel processes"
+    )
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--examples", type=int, default=2, help="Examples per word")
+    parser.add_argument(
+        "--card-type",
+        choices=["foreign-native", "native-foreign", "bidirectional"],
+        default="foreign-native",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="Path of the JSON report (default: benchmarks/results/anki-<time>-<commit>.json)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    report = run_benchmark(args)
+
+    output = args.output
+    if not output:
+        name = (
+            f"anki-{time.strftime('%Y%m%d-%H%M%S')}-{report['commit'] or 'nogit'}.json"
+        )
+        output = os.path.join(BENCH_DIR, "results", name)
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    for run in report["runs"]:
+        print(
+            f"{run['rows']} rows: serial {run['serial_seconds']:.2f}s "
+            f"({run['serial_rows_per_second']:.0f} rows/s), "
+            f"{args.workers} workers {run['parallel_seconds']:.2f}s "
+            f"({run['parallel_rows_per_second']:.0f} rows/s), "
+            f"speedup x{run['speedup']:.2f}, identical={run['identical']}"
+        )
+    print(f"Report written to {output}")
+
+
+if __name__ == "__main__":
+    main()
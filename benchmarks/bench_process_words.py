@@ -0,0 +1,323 @@
+#!/usr/bin/env python
+"""
+Benchmark of the /process-words pipeline against a fake gemini executable.
+
+Starts the backend with `benchmarks/fake_gemini.py` installed as `gemini` on
+PATH, sends the configured number of concurrent requests and writes a JSON
+report that can be compared across commits.
+
+Example:
+    uv run python benchmarks/bench_process_words.py --clients 10 --words 50 \
+        --latency-ms 800 --jitter-ms 400 --distribution lognormal
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+FAKE_GEMINI = os.path.join(BENCH_DIR, "fake_gemini.py")
+
+
+def percentile(values: list[float], pct: float) -> float | None:
+    """Nearest-rank percentile of `values`."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def summarize(values: list[float]) -> dict:
+    return {
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": max(values) if values else None,
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def install_fake_gemini(bin_dir: str) -> None:
+    path = os.path.join(bin_dir, "gemini")
+    with open(path, "w") as f:
+        f.write(f'#!/bin/sh\nexec "{sys.executable}" "{FAKE_GEMINI}" "$@"\n')
+    os.chmod(path, 0o755)
+
+
+def server_env(args: argparse.Namespace, bin_dir: str, log_path: str) -> dict:
+    env = dict(os.environ)
+    env.update(
+        {
+            "PATH": f"{bin_dir}{os.pathsep}{env.get('PATH', '')}",
+            "LLM_BACKEND": "cli",
+            "MAX_CONCURRENT_REQUESTS": str(args.max_concurrent),
+            "BATCH_SIZE": str(args.batch_size),
+            "CACHE_ENABLED": "true" if args.cache else "false",
+            "CACHE_PATH": os.path.join(bin_dir, "cache.sqlite3"),
+            # Keep the developer's jobs and packs out of the run
+            "JOBS_PATH": os.path.join(bin_dir, "jobs.sqlite3"),
+            "JOB_LOCKS_DIR": os.path.join(bin_dir, "job-locks"),
+            "PACKS_DIR": os.path.join(bin_dir, "packs"),
+            "LOG_LEVEL": "WARNING",
+            "FAKE_GEMINI_LATENCY_MS": str(args.latency_ms),
+            "FAKE_GEMINI_JITTER_MS": str(args.jitter_ms),
+            "FAKE_GEMINI_DISTRIBUTION": args.distribution,
+            "FAKE_GEMINI_FAILURE_RATE": str(args.failure_rate),
+            "FAKE_GEMINI_MALFORMED_RATE": str(args.malformed_rate),
+            "FAKE_GEMINI_CAPACITY_RATE": str(args.capacity_rate),
+            "FAKE_GEMINI_LOG": log_path,
+        }
+    )
+    # A single server process needs no cross-process slots; a developer's
+    # setting would only add flock overhead to the measurement
+    env.pop("SHARED_SLOTS_DIR", None)
+    return env
+
+
+async def wait_until_ready(client: httpx.AsyncClient, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.1)
+    raise RuntimeError("Backend did not start in time")
+
+
+async def run_client(
+    client: httpx.AsyncClient, words: list[str], start_gate: asyncio.Event
+) -> dict:
+    await start_gate.wait()
+    started = time.monotonic()
+    first_line = None
+    line_times = []
+    errors = 0
+
+    async with client.stream(
+        "POST",
+        "/process-words",
+        json={
+            "text": ", ".join(words),
+            "source_lang": "English",
+            "target_lang": "Russian",
+        },
+    ) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if not line.strip():
+                continue
+            elapsed = time.monotonic() - started
+            if first_line is None:
+                first_line = elapsed
+            line_times.append(elapsed)
+            if '"[error]"' in line:
+                errors += 1
+
+    return {
+        "time_to_first_line": first_line,
+        "total_time": time.monotonic() - started,
+        "line_times": line_times,
+        "lines": len(line_times),
+        "errors": errors,
+    }
+
+
+def word_lists(args: argparse.Namespace) -> list[list[str]]:
+    if args.shared_words:
+        return [[f"word{i}" for i in range(args.words)] for _ in range(args.clients)]
+    return [[f"word{c}x{i}" for i in range(args.words)] for c in range(args.clients)]
+
+
+def read_invocations(log_path: str) -> list[dict]:
+    if not os.path.exists(log_path):
+        return []
+    with open(log_path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def start_server(
+    args: argparse.Namespace, bin_dir: str, log_path: str, port: int
+) -> subprocess.Popen:
+    return subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "backend.main:app",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        cwd=ROOT_DIR,
+        env=server_env(args, bin_dir, log_path),
+        stdout=None if args.verbose else subprocess.DEVNULL,
+        stderr=None if args.verbose else subprocess.DEVNULL,
+    )
+
+
+async def run_clients(
+    args: argparse.Namespace, port: int
+) -> tuple[list[dict], float, int]:
+    """Send the requests of all clients at once; return results, wall time
+    and the retries the backend counted."""
+    limits = httpx.Limits(max_connections=args.clients + 1)
+    async with httpx.AsyncClient(
+        base_url=f"http://127.0.0.1:{port}", timeout=None, limits=limits
+    ) as client:
+        await wait_until_ready(client)
+
+        gate = asyncio.Event()
+        tasks = [
+            asyncio.create_task(run_client(client, words, gate))
+            for words in word_lists(args)
+        ]
+        started = time.monotonic()
+        gate.set()
+        results = await asyncio.gather(*tasks)
+        wall_time = time.monotonic() - started
+        retries = count_retries((await client.get("/metrics")).text)
+        return results, wall_time, retries
+
+
+def count_retries(metrics_text: str) -> int:
+    """Model attempts beyond the first, from the backend's attempts histogram."""
+    attempts = lookups = 0.0
+    for line in metrics_text.splitlines():
+        name, _, value = line.rpartition(" ")
+        if name.startswith("vocab_word_attempts_sum"):
+            attempts += float(value)
+        elif name.startswith("vocab_word_attempts_count"):
+            lookups += float(value)
+    return round(attempts - lookups)
+
+
+def run_benchmark(args: argparse.Namespace) -> dict:
+    with tempfile.TemporaryDirectory() as bin_dir:
+        install_fake_gemini(bin_dir)
+        log_path = os.path.join(bin_dir, "invocations.jsonl")
+        port = args.port or free_port()
+
+        # The server is managed outside the event loop, which only drives clients
+        server = start_server(args, bin_dir, log_path, port)
+        try:
+            results, wall_time, retries = asyncio.run(run_clients(args, port))
+        finally:
+            server.terminate()
+            server.wait(timeout=10)
+
+        invocations = read_invocations(log_path)
+
+    total_lines = sum(r["lines"] for r in results)
+
+    return {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "config": vars(args),
+        "wall_time": wall_time,
+        "words_per_second": total_lines / wall_time if wall_time else None,
+        "lines": total_lines,
+        "error_lines": sum(r["errors"] for r in results),
+        "time_to_first_line": summarize(
+            [r["time_to_first_line"] for r in results if r["time_to_first_line"]]
+        ),
+        "total_time": summarize([r["total_time"] for r in results]),
+        "word_latency": summarize([t for r in results for t in r["line_times"]]),
+        "gemini_invocations": len(invocations),
+        "retries": retries,
+        "fix_json_invocations": sum(1 for i in invocations if i["kind"] == "fix"),
+        "capacity_errors": sum(1 for i in invocations if i["outcome"] == "capacity"),
+        "malformed_outputs": sum(1 for i in invocations if i["outcome"] == "malformed"),
+    }
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--clients", type=int, default=5, help="Concurrent clients")
+    parser.add_argument("--words", type=int, default=20, help="Words per request")
+    parser.add_argument(
+        "--shared-words",
+        action="store_true",
+        help="All clients request the same words instead of distinct ones",
+    )
+    parser.add_argument("--latency-ms", type=float, default=200)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument(
+        "--distribution", choices=["fixed", "uniform", "lognormal"], default="fixed"
+    )
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--capacity-rate", type=float, default=0.0)
+    parser.add_argument("--max-concurrent", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=1)
+    parser.add_argument(
+        "--cache", action="store_true", help="Keep the result cache enabled"
+    )
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument(
+        "-v", "--verbose", action="store_true", help="Show the backend output"
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="Path of the JSON report (default: benchmarks/results/<time>-<commit>.json)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    report = run_benchmark(args)
+
+    output = args.output
+    if not output:
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{report['commit'] or 'nogit'}.json"
+        output = os.path.join(BENCH_DIR, "results", name)
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print(
+        f"{report['lines']} words in {report['wall_time']:.2f}s "
+        f"({report['words_per_second']:.1f} words/s), "
+        f"TTFL p50={report['time_to_first_line']['p50']:.3f}s "
+        f"p95={report['time_to_first_line']['p95']:.3f}s, "
+        f"retries={report['retries']}, fix-json={report['fix_json_invocations']}"
+    )
+    print(f"Report written to {output}")
+
+
+if __name__ == "__main__":
+    main()
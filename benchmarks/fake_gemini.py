@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+"""
+Stand-in for the `gemini` CLI used by the benchmarks.
+
+Accepts `-m MODEL -p PROMPT` like the real CLI and answers with the
+deterministic stub output of backend.llm. Behaviour is controlled through
+environment variables:
+
+- FAKE_GEMINI_LATENCY_MS: mean answer latency (default: 0)
+- FAKE_GEMINI_JITTER_MS: spread of the latency (default: 0)
+- FAKE_GEMINI_DISTRIBUTION: "fixed", "uniform" or "lognormal" (default: fixed)
+- FAKE_GEMINI_FAILURE_RATE: share of calls failing with a generic error
+- FAKE_GEMINI_MALFORMED_RATE: share of calls returning broken JSON
+- FAKE_GEMINI_CAPACITY_RATE: share of calls failing with a capacity error
+- FAKE_GEMINI_LOG: file receiving one JSON line per invocation
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from backend.llm import stub_response
+
+
+def _env_float(name: str, default: float = 0.0) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def sample_latency(rng: random.Random) -> float:
+    """Latency in seconds drawn from the configured distribution."""
+    mean = _env_float("FAKE_GEMINI_LATENCY_MS") / 1000
+    jitter = _env_float("FAKE_GEMINI_JITTER_MS") / 1000
+    distribution = os.getenv("FAKE_GEMINI_DISTRIBUTION", "fixed")
+
+    if mean <= 0:
+        return 0.0
+    if distribution == "uniform":
+        return max(0.0, rng.uniform(mean - jitter, mean + jitter))
+    if distribution == "lognormal" and jitter > 0:
+        # Parameters chosen so the distribution has the requested mean and spread
+        sigma = math.sqrt(math.log(1 + (jitter / mean) ** 2))
+        mu = math.log(mean) - sigma**2 / 2
+        return rng.lognormvariate(mu, sigma)
+    return mean
+
+
+def classify_prompt(prompt: str) -> str:
+    if "corrupted or incomplete JSON" in prompt:
+        return "fix"
+    if "JSON array" in prompt:
+        return "batch"
+    return "word"
+
+
+def log_invocation(record: dict) -> None:
+    path = os.getenv("FAKE_GEMINI_LOG")
+    if not path:
+        return
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-m", "--model", default="fake")
+    parser.add_argument("-p", "--prompt", required=True)
+    args = parser.parse_args()
+
+    rng = random.Random()
+    kind = classify_prompt(args.prompt)
+    latency = sample_latency(rng)
+    time.sleep(latency)
+
+    roll = rng.random()
+    capacity_rate = _env_float("FAKE_GEMINI_CAPACITY_RATE")
+    failure_rate = _env_float("FAKE_GEMINI_FAILURE_RATE")
+    malformed_rate = _env_float("FAKE_GEMINI_MALFORMED_RATE")
+
+    if roll < capacity_rate:
+        outcome = "capacity"
+    elif roll < capacity_rate + failure_rate:
+        outcome = "failure"
+    elif kind != "fix" and roll < capacity_rate + failure_rate + malformed_rate:
+        outcome = "malformed"
+    else:
+        outcome = "ok"
+
+    log_invocation({"kind": kind, "outcome": outcome, "latency": latency})
+
+    if outcome == "capacity":
+        print("Error: model is over capacity, try again later", file=sys.stderr)
+        return 1
+    if outcome == "failure":
+        print("Error: internal error", file=sys.stderr)
+        return 1
+
+    output = stub_response(args.prompt)
+    if outcome == "malformed":
+        # Cut off inside the first string: local repair cannot restore the
+        # missing fields, so the fix-JSON model (or for batches, single
+        # lookups) has to step in
+        output = output[: output.index(": ") + 4]
+    print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
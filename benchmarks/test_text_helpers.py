@@ -0,0 +1,91 @@
+"""
+Microbenchmarks of the text helpers that run for every word and CSV field.
+
+Not part of the regular test run; needs pytest-benchmark:
+    uv run --with pytest-benchmark pytest benchmarks/test_text_helpers.py
+"""
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from backend.main import (
+    clean_csv_field,
+    format_data_line,
+    parse_word_with_context,
+    split_text_respecting_brackets,
+    split_word_list,
+)
+from scripts.csv_to_anki import format_text, row_to_fields
+
+FIELD = 'An example   sentence with the #word# "quoted"\n and more text here.'
+WORD_LIST = ", ".join(["run", "walk", "sit", "to be (state)", "jump"] * 100)
+BRACKETED_LIST = ", ".join(
+    ["run", "[a table] sit", "[ctx, with comma] word", "[he brought it] upon"] * 100
+)
+WORD_DATA = {
+    "infinitive": "run",
+    "transcription": "[rʌn]",
+    "translations": ["бежать", "бегать", "управлять"],
+    "examples": [
+        {"source": "I #run# every day.", "translation": "Я #бегаю# каждый день."},
+        {"source": "She #runs# a shop.", "translation": "Она #управляет# магазином."},
+    ],
+}
+ROW = [
+    "run",
+    "[rʌn]",
+    "бежать, бегать",
+    "I #run# every day.",
+    "Я #бегаю# каждый день.",
+    "She #runs# a shop.",
+    "Она #управляет# магазином.",
+    "run",
+]
+
+
+def test_clean_csv_field(benchmark):
+    assert (
+        benchmark(clean_csv_field, FIELD)
+        == 'An example sentence with the #word# ""quoted"" and more text here.'
+    )
+
+
+def test_clean_csv_field_plain(benchmark):
+    assert benchmark(clean_csv_field, "бежать") == "бежать"
+
+
+def test_parse_word_with_context(benchmark):
+    assert benchmark(parse_word_with_context, "[he brought it] upon [himself]") == (
+        "upon",
+        "he brought it ... himself",
+    )
+
+
+def test_parse_word_without_context(benchmark):
+    assert benchmark(parse_word_with_context, "  to be  ") == ("to be", None)
+
+
+def test_split_plain_list(benchmark):
+    assert len(benchmark(split_text_respecting_brackets, WORD_LIST)) == 500
+
+
+def test_split_bracketed_list(benchmark):
+    assert len(benchmark(split_text_respecting_brackets, BRACKETED_LIST)) == 400
+
+
+def test_split_word_list_lines(benchmark):
+    text = WORD_LIST.replace(", ", "\n")
+    assert len(benchmark(split_word_list, text)) == 500
+
+
+def test_format_data_line(benchmark):
+    assert benchmark(format_data_line, WORD_DATA, "Run").endswith(';"run"')
+
+
+def test_format_text(benchmark):
+    assert benchmark(format_text, "I #run# every day.") == "I <b>run</b> every day."
+
+
+def test_row_to_fields(benchmark):
+    assert len(benchmark(row_to_fields, ROW)) == 5
@@ -1,13 +1,33 @@
 import csv
 import genanki
+import hashlib
+import itertools
+import json
+import os
+import sqlite3
 import sys
 import argparse
 import re
+import shutil
+import tempfile
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from genanki.apkg_col import APKG_COL
+from genanki.apkg_schema import APKG_SCHEMA
 
 # --- Configuration ---
 MODEL_ID = 1607392319
 DECK_ID = 2059400110
 
+# Highlighted word in an example: "#word#"
+HIGHLIGHT_RE = re.compile(r"#([^#]+)#")
+
+# Rows turned into notes and written to the collection at a time
+CHUNK_SIZE = 1000
+
 # CSS for the card - Elegant and readable
 CSS = """
 .card {
@@ -151,33 +171,36 @@ def format_text(text):
     """Converts #word# to <b>word</b> for Anki's HTML display."""
     if not text:
         return ""
-    return re.sub(r"#([^#]+)#", r"<b>\1</b>", text)
-
-
-def csv_to_apkg(input_file, output_file, deck_name, card_type_arg):
-    # 1. Determine card_type
-    card_type = card_type_arg
-    if card_type_arg == "foreign-native":
-        print("\nSelect card generation type:")
-        print("1. Foreign to Native (e.g., English word -> Russian translation)")
-        print("2. Native to Foreign (e.g., Russian translation -> English word)")
-        print("3. Bidirectional (both 1 and 2)")
-
-        while True:
-            choice = input("Enter your choice (1, 2, or 3): ").strip()
-            if choice == "1":
-                card_type = "foreign-native"
-                break
-            elif choice == "2":
-                card_type = "native-foreign"
-                break
-            elif choice == "3":
-                card_type = "bidirectional"
-                break
-            else:
-                print("Invalid choice. Please enter 1, 2, or 3.")
-
-    # 2. Build templates based on card_type
+    if "#" not in text:
+        return text
+    return HIGHLIGHT_RE.sub(r"<b>\1</b>", text)
+
+
+def choose_card_type(card_type_arg):
+    """Card type from the command line, or asked for when run interactively."""
+    if card_type_arg is not None:
+        return card_type_arg
+    if not sys.stdin.isatty():
+        return "foreign-native"
+
+    print("\nSelect card generation type:")
+    print("1. Foreign to Native (e.g., English word -> Russian translation)")
+    print("2. Native to Foreign (e.g., Russian translation -> English word)")
+    print("3. Bidirectional (both 1 and 2)")
+
+    while True:
+        choice = input("Enter your choice (1, 2, or 3): ").strip()
+        if choice == "1":
+            return "foreign-native"
+        elif choice == "2":
+            return "native-foreign"
+        elif choice == "3":
+            return "bidirectional"
+        else:
+            print("Invalid choice. Please enter 1, 2, or 3.")
+
+
+def build_model(card_type):
     templates_to_use = []
     if card_type == "foreign-native" or card_type == "bidirectional":
         templates_to_use.append(
@@ -196,9 +219,8 @@ def csv_to_apkg(input_file, output_file, deck_name, card_type_arg):
             }
         )
 
-    # 3. Create Model
     base_model_props = create_model()
-    model = genanki.Model(
+    return genanki.Model(
         base_model_props.model_id,
         base_model_props.name,
         fields=base_model_props.fields,
@@ -206,68 +228,324 @@ def csv_to_apkg(input_file, output_file, deck_name, card_type_arg):
         css=base_model_props.css,
     )
 
-    # 4. Create Deck
-    deck = genanki.Deck(DECK_ID, deck_name)
 
-    # 5. Process CSV and create notes
+def row_to_fields(row):
+    """Note fields of a CSV row, or None for rows that are not words."""
+    # New Format: word(infinitive);transcription;translations;ex1_en;ex1_ru;...;id
+    if not row or len(row) < 3:
+        return None
+
+    # Build examples HTML
+    examples_html = []
+    # Examples start from index 3
+    for i in range(3, len(row) - 1, 2):
+        source = row[i]
+        translation = row[i + 1] if i + 1 < len(row) else ""
+
+        if not source and not translation:
+            continue
+
+        if examples_html:
+            examples_html.append('<div class="example-divider"></div>')
+
+        examples_html.append('<div class="example-item">')
+        examples_html.append(f'  <div class="example-en">{format_text(source)}</div>')
+        examples_html.append(
+            f'  <div class="example-ru">{format_text(translation)}</div>'
+        )
+        examples_html.append("</div>")
+
+    return [
+        row[0],  # Word (Front)
+        row[0],  # Infinitive (Back - same as word now)
+        row[1],  # Transcription
+        row[2],  # Translations
+        "".join(examples_html),  # Examples_HTML
+    ]
+
+
+class PackageWriter:
+    """
+    Writes notes straight into the SQLite collection of one .apkg file.
+
+    Same output as genanki.Package, but notes are added chunk by chunk
+    instead of being held in a genanki.Deck until the end.
+    """
+
+    def __init__(self, output_file, deck, model, timestamp, id_gen):
+        self.output_file = output_file
+        self.deck = deck
+        self.timestamp = timestamp
+        self.id_gen = id_gen
+        self.count = 0
+
+        fd, self.db_path = tempfile.mkstemp(suffix=".anki2")
+        os.close(fd)
+        self.conn = sqlite3.connect(self.db_path)
+        # A scratch file: durability is not needed until it is zipped
+        self.conn.execute("PRAGMA journal_mode=OFF")
+        self.conn.execute("PRAGMA synchronous=OFF")
+        self.cursor = self.conn.cursor()
+        self.cursor.executescript(APKG_SCHEMA)
+        self.cursor.executescript(APKG_COL)
+        deck.add_model(model)
+        deck.write_to_db(self.cursor, timestamp, id_gen)
+
+    def add_notes(self, notes):
+        for note in notes:
+            note.write_to_db(
+                self.cursor, self.timestamp, self.deck.deck_id, self.id_gen
+            )
+        self.conn.commit()
+        self.count += len(notes)
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+        # Entries are dated by the export timestamp, not the scratch file,
+        # so the same input and timestamp always give the same bytes
+        date_time = time.localtime(self.timestamp)[:6]
+        try:
+            with zipfile.ZipFile(self.output_file, "w") as outzip:
+                info = zipfile.ZipInfo("collection.anki2", date_time)
+                with open(self.db_path, "rb") as src, outzip.open(info, "w") as dst:
+                    shutil.copyfileobj(src, dst)
+                outzip.writestr(zipfile.ZipInfo("media", date_time), json.dumps({}))
+        finally:
+            os.remove(self.db_path)
+
+    def discard(self):
+        self.conn.close()
+        os.remove(self.db_path)
+
+
+def row_id(row):
+    """The word ID a row ends with (the raw input, lowercased)."""
+    # Rows with examples end with the ID; older three-column rows have none
+    if len(row) > 3:
+        return row[-1]
+    return row[0].strip().lower()
+
+
+def note_guid(word_id):
+    """GUID that stays the same across exports, so Anki updates the note."""
+    return genanki.guid_for(word_id)
+
+
+def fields_hash(card_type, fields):
+    content = "\x1f".join([card_type, *fields])
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def load_manifest(manifest_file):
+    """Content hashes of the notes exported earlier, by word ID."""
+    if manifest_file is None or not os.path.exists(manifest_file):
+        return {}
+    with open(manifest_file, encoding="utf-8") as f:
+        return json.load(f)["notes"]
+
+
+def save_manifest(manifest_file, notes):
+    # Written to a temporary file first so an interrupted save keeps the old one
+    tmp_file = manifest_file + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump({"version": 1, "notes": notes}, f, ensure_ascii=False)
+    os.replace(tmp_file, manifest_file)
+
+
+def render_rows(card_type, rows):
+    """(word ID, fields, content hash, GUID) of every word row in `rows`."""
+    rendered = []
+    for row in rows:
+        fields = row_to_fields(row)
+        if fields is None:
+            continue
+        word_id = row_id(row)
+        rendered.append(
+            (word_id, fields, fields_hash(card_type, fields), note_guid(word_id))
+        )
+    return rendered
+
+
+def read_chunks(input_file, chunk_size):
+    with open(input_file, mode="r", encoding="utf-8-sig") as f:
+        reader = csv.reader(f, delimiter=";")
+        while True:
+            rows = list(itertools.islice(reader, chunk_size))
+            if not rows:
+                return
+            yield rows
+
+
+def rendered_chunks(input_file, card_type, chunk_size, workers):
+    """
+    Rendered chunks of the CSV in file order.
+    With several workers, chunks are rendered in a process pool.
+    """
+    if workers <= 1:
+        for rows in read_chunks(input_file, chunk_size):
+            yield render_rows(card_type, rows)
+        return
+
+    pool = ProcessPoolExecutor(workers)
+    pending = deque()
+    try:
+        for rows in read_chunks(input_file, chunk_size):
+            pending.append(pool.submit(render_rows, card_type, rows))
+            # Limited read-ahead keeps memory flat on huge files
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+def part_file(output_file, part):
+    """Path of one part of a split package: deck.apkg -> deck-002.apkg."""
+    root, ext = os.path.splitext(output_file)
+    return f"{root}-{part:03d}{ext or '.apkg'}"
+
+
+def csv_to_apkg(
+    input_file,
+    output_file,
+    deck_name,
+    card_type_arg=None,
+    max_notes=None,
+    chunk_size=CHUNK_SIZE,
+    manifest_file=None,
+    workers=1,
+    timestamp=None,
+):
+    """
+    Convert a VocabMaster CSV into one .apkg file, or into several of at most
+    `max_notes` notes each (subdecks "<deck_name>::001", ...).
+
+    With `manifest_file`, only notes that are new or changed since the export
+    recorded in it are written (a delta package), and the manifest is updated.
+    With `workers` > 1, rows are rendered in that many processes; the output
+    is the same as with one. `timestamp` (seconds since the epoch, default
+    now) is stored in the notes and cards and makes the output reproducible.
+    Returns the paths of the written packages.
+    """
+    # 1. Determine card_type and build the model for it
+    card_type = choose_card_type(card_type_arg)
+    model = build_model(card_type)
+
+    if timestamp is None:
+        timestamp = time.time()
+    # Shared by all parts so note and card IDs never repeat between them
+    id_gen = itertools.count(int(timestamp * 1000))
+
+    def open_part(part):
+        if max_notes is None:
+            deck = genanki.Deck(DECK_ID, deck_name)
+            return PackageWriter(output_file, deck, model, timestamp, id_gen)
+        deck = genanki.Deck(DECK_ID + part, f"{deck_name}::{part:03d}")
+        return PackageWriter(
+            part_file(output_file, part), deck, model, timestamp, id_gen
+        )
+
+    # 2. Process the CSV in chunks, writing notes as they are built
+    previous = load_manifest(manifest_file)
+    hashes = {}
     count = 0
+    unchanged = 0
+    duplicates = 0
+    written = []
+    writer = None
+    started = time.monotonic()
     try:
-        with open(input_file, mode="r", encoding="utf-8-sig") as f:
-            reader = csv.reader(f, delimiter=";")
-            for row in reader:
-                # New Format: word(infinitive);transcription;translations;ex1_en;ex1_ru;...
-                if not row or len(row) < 3:
+        part = 1
+        writer = open_part(part)
+        notes = []
+
+        def flush():
+            writer.add_notes(notes)
+            notes.clear()
+            if sys.stdout.isatty():
+                rate = count / max(time.monotonic() - started, 1e-9)
+                print(f"\r{count} rows ({rate:.0f} rows/s)", end="", flush=True)
+
+        for chunk in rendered_chunks(input_file, card_type, chunk_size, workers):
+            for word_id, fields, digest, guid in chunk:
+                # Notes are matched by word ID, so it must be unique
+                if word_id in hashes:
+                    duplicates += 1
+                    continue
+                hashes[word_id] = digest
+                if previous.get(word_id) == digest:
+                    unchanged += 1
                     continue
 
-                # Build examples HTML
-                examples_html = []
-                # Examples start from index 3
-                for i in range(3, len(row) - 1, 2):
-                    source = row[i]
-                    translation = row[i + 1] if i + 1 < len(row) else ""
-
-                    if not source and not translation:
-                        continue
-
-                    if examples_html:
-                        examples_html.append('<div class="example-divider"></div>')
-
-                    examples_html.append('<div class="example-item">')
-                    examples_html.append(
-                        f'  <div class="example-en">{format_text(source)}</div>'
-                    )
-                    examples_html.append(
-                        f'  <div class="example-ru">{format_text(translation)}</div>'
-                    )
-                    examples_html.append("</div>")
-
-                fields = [
-                    row[0],  # Word (Front)
-                    row[0],  # Infinitive (Back - same as word now)
-                    row[1],  # Transcription
-                    row[2],  # Translations
-                    "".join(examples_html),  # Examples_HTML
-                ]
+                if max_notes is not None and writer.count + len(notes) >= max_notes:
+                    flush()
+                    finished, writer = writer, None
+                    finished.close()
+                    written.append(finished.output_file)
+                    part += 1
+                    writer = open_part(part)
 
                 # A single note will generate one or two cards based on the templates in the model
-                note = genanki.Note(model=model, fields=fields)
-                deck.add_note(note)
+                notes.append(genanki.Note(model=model, fields=fields, guid=guid))
                 count += 1
+            flush()
+
+        finished, writer = writer, None
+        if count or manifest_file is None:
+            finished.close()
+            written.append(finished.output_file)
+        else:
+            # Nothing new since the last export
+            finished.discard()
+
+        if manifest_file is not None:
+            save_manifest(manifest_file, {**previous, **hashes})
 
-        genanki.Package(deck).write_to_file(output_file)
+        elapsed = time.monotonic() - started
+        if sys.stdout.isatty():
+            print()
 
         # Adjust count for bidirectional cards for user feedback
         final_card_count = count
         if card_type == "bidirectional":
             final_card_count *= 2
 
-        print(f"Successfully created {output_file} with {final_card_count} cards.")
+        rows = count + unchanged + duplicates
+        rate = rows / max(elapsed, 1e-9)
+        if written:
+            print(
+                f"Successfully created {', '.join(written)} with {final_card_count} "
+                f"cards ({rows} rows in {elapsed:.1f}s, {rate:.0f} rows/s)."
+            )
+        else:
+            print("No new or changed notes since the last export.")
+        if unchanged:
+            print(f"Skipped {unchanged} notes unchanged since the last export.")
+        if duplicates:
+            print(f"Skipped {duplicates} rows repeating an earlier word ID.")
+        return written
 
     except FileNotFoundError:
         print(f"Error: File {input_file} not found.")
     except Exception as e:
         print(f"An error occurred: {e} - {type(e).__name__}")
         sys.exit(1)
+    finally:
+        if writer is not None:
+            writer.discard()
+
+
+def positive_int(value):
+    """argparse type for options that need a count of at least 1."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {number}")
+    return number
 
 
 if __name__ == "__main__":
@@ -285,9 +563,38 @@ if __name__ == "__main__":
         "-t",
         "--card-type",
         choices=["foreign-native", "native-foreign", "bidirectional"],
-        default="foreign-native",
-        help="Type of cards to generate: 'foreign-native' (default), 'native-foreign', or 'bidirectional'. If not provided, an interactive menu will appear.",
+        default=None,
+        help="Type of cards to generate: 'foreign-native' (default), 'native-foreign', or 'bidirectional'. If not provided, an interactive menu will appear when run from a terminal.",
+    )
+    parser.add_argument(
+        "--max-notes",
+        type=positive_int,
+        default=None,
+        help="Split into several packages of at most this many notes each (output-001.apkg, ...), one subdeck per package.",
+    )
+
+    parser.add_argument(
+        "-m",
+        "--manifest",
+        default=None,
+        help="Manifest of previously exported notes (created if missing). Only new or changed notes are written, as a delta package to import on top of the earlier ones.",
+    )
+
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=positive_int,
+        default=1,
+        help="Processes rendering rows in parallel (default: 1). Output is identical to a single-process run.",
     )
 
     args = parser.parse_args()
-    csv_to_apkg(args.input, args.output, args.name, args.card_type)
+    csv_to_apkg(
+        args.input,
+        args.output,
+        args.name,
+        args.card_type,
+        args.max_notes,
+        manifest_file=args.manifest,
+        workers=args.workers,
+    )
@@ -0,0 +1,10 @@
+import pytest
+
+from backend import main
+
+
+@pytest.fixture(autouse=True)
+def fresh_scheduler(monkeypatch):
+    # The adaptive limit lowered by one test's capacity errors must not
+    # throttle the next one
+    monkeypatch.setattr(main, "gemini_scheduler", main.build_scheduler())
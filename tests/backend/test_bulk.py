@@ -0,0 +1,108 @@
+import csv
+
+import pytest
+
+from backend import bulk, main
+from backend.cache import ResultCache
+from backend.llm import LLMNotFoundError, StubBackend, stub_response
+from scripts.csv_to_anki import csv_to_apkg
+
+
+class FlakyBackend(StubBackend):
+    """Stub backend that fails every prompt mentioning `broken`."""
+
+    def __init__(self, broken: str):
+        super().__init__()
+        self.broken = broken
+
+    async def generate(self, prompt: str) -> str:
+        self.calls += 1
+        if f'"{self.broken}"' in prompt:
+            raise LLMNotFoundError("backend unavailable")
+        return stub_response(prompt)
+
+
+@pytest.fixture
+def offline(monkeypatch):
+    monkeypatch.setattr(main, "result_cache", None)
+    monkeypatch.setattr(main, "BATCH_SIZE", 3)
+
+
+def read_ids(path):
+    with open(path, encoding="utf-8") as f:
+        return [row[-1] for row in csv.reader(f, delimiter=";")]
+
+
+@pytest.mark.asyncio
+async def test_bulk_resumes_from_output(tmp_path, monkeypatch, offline):
+    backend = StubBackend()
+    monkeypatch.setattr(main, "llm_backend", backend)
+    words = tmp_path / "words.txt"
+    words.write_text("run\nwalk, Jump\nto be (state)\nrun\nswim\nfly\nsee\n")
+    output = tmp_path / "result.csv"
+
+    stats = await bulk.process_file(str(words), str(output), "English", "Russian", 2)
+
+    assert stats == {"total": 7, "skipped": 0, "processed": 7, "failed": 0}
+    assert sorted(read_ids(output)) == sorted(
+        ["run", "walk", "jump", "to be (state)", "swim", "fly", "see"]
+    )
+    assert not (tmp_path / "result.errors.csv").exists()
+
+    # An interrupted run leaves a partial last line behind
+    lines = output.read_text(encoding="utf-8").splitlines(keepends=True)
+    output.write_text("".join(lines[:4]) + lines[4][:10], encoding="utf-8")
+    backend.calls = 0
+
+    stats = await bulk.process_file(str(words), str(output), "English", "Russian", 2)
+
+    assert stats["skipped"] == 4
+    assert stats["processed"] == 3
+    assert len(read_ids(output)) == 7
+    assert backend.calls == 1
+
+    stats = await bulk.process_file(str(words), str(output), "English", "Russian", 2)
+    assert stats["processed"] == 0
+    assert backend.calls == 1
+
+    apkg = tmp_path / "deck.apkg"
+    csv_to_apkg(str(output), str(apkg), "Deck", "native-foreign")
+    assert apkg.exists()
+
+
+@pytest.mark.asyncio
+async def test_bulk_retries_failed_words(tmp_path, monkeypatch, offline):
+    monkeypatch.setattr(main, "llm_backend", FlakyBackend("walk"))
+    words = tmp_path / "words.txt"
+    words.write_text("run, walk, swim")
+    output = tmp_path / "result.csv"
+
+    stats = await bulk.process_file(str(words), str(output), "English", "Russian", 1)
+
+    assert (stats["processed"], stats["failed"]) == (2, 1)
+    assert read_ids(tmp_path / "result.errors.csv") == ["walk"]
+
+    monkeypatch.setattr(main, "llm_backend", StubBackend())
+    stats = await bulk.process_file(str(words), str(output), "English", "Russian", 1)
+
+    assert (stats["skipped"], stats["processed"], stats["failed"]) == (2, 1, 0)
+    assert sorted(read_ids(output)) == ["run", "swim", "walk"]
+    assert not (tmp_path / "result.errors.csv").exists()
+
+
+@pytest.mark.asyncio
+async def test_bulk_rerun_answers_from_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "result_cache", ResultCache(str(tmp_path / "c.db")))
+    monkeypatch.setattr(main, "BATCH_SIZE", 3)
+    backend = StubBackend()
+    monkeypatch.setattr(main, "llm_backend", backend)
+    words = tmp_path / "words.txt"
+    words.write_text("run, walk, swim, fly, see")
+
+    await bulk.process_file(str(words), str(tmp_path / "a.csv"), "En", "Ru", 2)
+    calls = backend.calls
+    stats = await bulk.process_file(str(words), str(tmp_path / "b.csv"), "En", "Ru", 2)
+
+    assert stats["processed"] == 5
+    assert backend.calls == calls
+    assert sorted(read_ids(tmp_path / "b.csv")) == sorted(read_ids(tmp_path / "a.csv"))
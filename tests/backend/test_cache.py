@@ -0,0 +1,120 @@
+import sqlite3
+import time
+
+import pytest
+
+from backend.cache import ResultCache, hash_prompt, make_cache_key
+
+
+def _put(cache, key, word="run", data=None, source_lang="English"):
+    cache.put(
+        key,
+        data or {"infinitive": word},
+        word,
+        None,
+        source_lang,
+        "Russian",
+        "model",
+        "hash",
+    )
+
+
+def test_cache_key_normalization():
+    key = make_cache_key("Run ", None, "English", "Russian", "m", "h")
+    assert key == make_cache_key("run", "", "English", "Russian", "m", "h")
+    assert key != make_cache_key("run", "ctx", "English", "Russian", "m", "h")
+    assert key != make_cache_key("run", None, "English", "German", "m", "h")
+    assert key != make_cache_key("run", None, "English", "Russian", "m2", "h")
+    assert key != make_cache_key(
+        "run", None, "English", "Russian", "m", hash_prompt("other")
+    )
+
+
+def test_cache_roundtrip(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache.sqlite3"))
+    assert cache.get("k") is None
+
+    _put(cache, "k", data={"infinitive": "run", "translations": ["бежать"]})
+    assert cache.get("k") == {"infinitive": "run", "translations": ["бежать"]}
+
+
+def test_cache_ttl_expiry(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache.sqlite3"), ttl_seconds=60)
+    _put(cache, "k")
+    cache._connect().execute("UPDATE results SET created_at = ?", (time.time() - 120,))
+    assert cache.get("k") is None
+    assert len(cache) == 0
+
+
+def test_cache_size_eviction(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache.sqlite3"), max_entries=2)
+    for i, key in enumerate(["a", "b", "c"]):
+        _put(cache, key)
+        cache._connect().execute(
+            "UPDATE results SET accessed_at = ? WHERE key = ?", (i, key)
+        )
+
+    assert cache.prune() == 1
+    assert cache.get("a") is None
+    assert cache.get("c") is not None
+
+
+def test_cache_invalidate(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache.sqlite3"))
+    _put(cache, "a", word="run")
+    _put(cache, "b", word="walk")
+    _put(cache, "c", word="run", source_lang="German")
+
+    assert cache.invalidate(word="Run", source_lang="English") == 1
+    assert cache.get("a") is None
+    assert cache.invalidate() == 2
+    assert len(cache) == 0
+
+
+def _accessed_at(cache, key):
+    return (
+        cache._connect()
+        .execute("SELECT accessed_at FROM results WHERE key = ?", (key,))
+        .fetchone()[0]
+    )
+
+
+def test_cache_hits_update_access_times_with_the_next_write(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache.sqlite3"), max_entries=2)
+    for i, key in enumerate(["a", "b"]):
+        _put(cache, key)
+        cache._connect().execute(
+            "UPDATE results SET accessed_at = ? WHERE key = ?", (i, key)
+        )
+    cache._connect().commit()
+
+    assert cache.get("a") is not None
+    assert _accessed_at(cache, "a") == 0
+
+    # The buffered hit keeps "a" over "b" when the cache is trimmed
+    _put(cache, "c")
+    assert _accessed_at(cache, "a") > 1
+    assert cache.prune() == 1
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+
+
+def test_cache_reads_do_not_wait_for_other_writers(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = ResultCache(path, busy_timeout=0.1)
+    _put(cache, "a")
+    other = sqlite3.connect(path)
+    other.execute("BEGIN IMMEDIATE")
+    try:
+        started = time.monotonic()
+        assert cache.get("a") == {"infinitive": "run"}
+        with pytest.raises(sqlite3.OperationalError):
+            _put(cache, "b")
+        assert time.monotonic() - started < 5
+    finally:
+        other.rollback()
+        other.close()
+
+    # The failed write left no transaction open behind
+    _put(cache, "b")
+    assert cache.get("b") == {"infinitive": "run"}
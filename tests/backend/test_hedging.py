@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+from backend import metrics
+from backend.hedging import Hedger
+
+
+async def warm_up(hedger, seconds=0.0, calls=None):
+    for _ in range(calls or hedger.min_samples):
+        await hedger.run(lambda: asyncio.sleep(seconds, "warm"))
+
+
+@pytest.mark.asyncio
+async def test_hedger_learns_before_hedging():
+    hedger = Hedger(percentile=50, budget=1, min_delay=0, min_samples=4)
+    assert hedger.delay() is None
+
+    await warm_up(hedger, 0.01)
+
+    assert 0.01 <= hedger.delay() < 0.1
+    assert hedger.fired == 0
+
+
+@pytest.mark.asyncio
+async def test_hedge_wins_and_cancels_slow_attempt():
+    hedger = Hedger(percentile=50, budget=1, min_delay=0, min_samples=4)
+    await warm_up(hedger)
+    wins_before = metrics.HEDGE_WINS.value()
+    cancelled = asyncio.Event()
+
+    async def stuck():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def fast():
+        return "hedge"
+
+    result = await asyncio.wait_for(hedger.run(stuck, fast), 1)
+
+    assert result == "hedge"
+    assert (hedger.fired, hedger.wins) == (1, 1)
+    assert metrics.HEDGE_WINS.value() == wins_before + 1
+    await asyncio.wait_for(cancelled.wait(), 1)
+
+
+@pytest.mark.asyncio
+async def test_hedge_budget_and_errors():
+    hedger = Hedger(percentile=50, budget=0.5, min_delay=0, min_samples=2, burst=1)
+    await warm_up(hedger)
+    calls = []
+
+    async def slow():
+        calls.append("slow")
+        await asyncio.sleep(0.05)
+        return "slow"
+
+    # Two calls earn one token: only one of them is hedged
+    results = [await hedger.run(slow), await hedger.run(slow)]
+    assert results == ["slow", "slow"]
+    assert hedger.fired == 1
+    assert len(calls) == 3
+
+    # A failed primary waits for the hedge instead of raising
+    hedger._tokens = 1
+
+    async def slow_failure():
+        await asyncio.sleep(0.2)
+        raise ValueError("primary")
+
+    assert await hedger.run(slow_failure, slow) == "slow"
+
+    async def broken():
+        raise ValueError("broken")
+
+    with pytest.raises(ValueError, match="broken"):
+        await hedger.run(broken)
+
+
+@pytest.mark.asyncio
+async def test_hedge_delay_ignores_cancelled_and_failed_attempts():
+    hedger = Hedger(percentile=50, budget=1, min_delay=0, min_samples=4, window=8)
+    await warm_up(hedger, 0.02)
+    delay = hedger.delay()
+
+    async def stuck():
+        await asyncio.sleep(10)
+
+    async def fast():
+        return "hedge"
+
+    # Every primary is cancelled as soon as its hedge wins
+    for _ in range(20):
+        assert await hedger.run(stuck, fast) == "hedge"
+
+    async def broken():
+        raise ValueError("broken")
+
+    for _ in range(5):
+        with pytest.raises(ValueError):
+            await hedger.run(broken)
+
+    assert hedger.fired == 20
+    assert hedger.delay() == delay
@@ -0,0 +1,57 @@
+import asyncio
+import subprocess
+import sys
+
+import pytest
+
+from backend.interprocess import SharedSlots, release_lock_file, try_lock_file
+
+
+def test_lock_file_is_exclusive(tmp_path):
+    path = str(tmp_path / "job.lock")
+    fd = try_lock_file(path)
+    assert fd is not None
+    assert try_lock_file(path) is None
+
+    release_lock_file(fd)
+    fd = try_lock_file(path)
+    assert fd is not None
+    release_lock_file(fd)
+
+
+def test_lock_of_exited_process_is_released(tmp_path):
+    path = str(tmp_path / "job.lock")
+    subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            (
+                "import sys; from backend.interprocess import try_lock_file; "
+                "sys.exit(0 if try_lock_file(sys.argv[1]) is not None else 1)"
+            ),
+            path,
+        ],
+        check=True,
+    )
+    assert try_lock_file(path) is not None
+
+
+@pytest.mark.asyncio
+async def test_shared_slots_cap_all_holders(tmp_path):
+    # Two pools on one directory stand in for two worker processes
+    pools = [SharedSlots(str(tmp_path), 2, poll_interval=0.001) for _ in range(2)]
+    running = 0
+    peak = 0
+
+    async def work(pool):
+        nonlocal running, peak
+        async with pool.slot():
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+    await asyncio.gather(*(work(pools[i % 2]) for i in range(8)))
+
+    assert peak == 2
+    assert pools[0].stats() == {"size": 2, "in_use": 0}
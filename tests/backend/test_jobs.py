@@ -0,0 +1,190 @@
+import json
+import time
+
+from fastapi.testclient import TestClient
+
+from backend import jobs, main
+from backend.jobs import JobStore
+
+
+def fake_data(word):
+    return {
+        "infinitive": word,
+        "transcription": "",
+        "translations": [f"{word}-ru"],
+        "examples": [],
+    }
+
+
+def wait_for_job(client, job_id, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["status"] not in jobs.UNFINISHED:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+
+def test_job_store_tracks_progress(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    job_id = store.create(
+        [("run", "run", None), ("walk", "walk", None), ("x", "x", None)], "En", "Ru"
+    )
+
+    store.record_result(job_id, 1, {"word": "walk", "error": None})
+    store.record_result(job_id, 1, {"word": "walk", "error": None})
+    store.record_result(job_id, 2, {"word": "x", "error": "failed"})
+
+    job = store.get(job_id)
+    assert (job["status"], job["total"], job["done"], job["errors"]) == (
+        jobs.QUEUED,
+        3,
+        2,
+        1,
+    )
+    assert store.pending_words(job_id) == [(0, "run", "run", None)]
+    assert [r["word"] for r in store.results(job_id, offset=1)] == ["x"]
+    assert store.unfinished() == [job_id]
+
+    store.set_status(job_id, jobs.COMPLETED)
+    assert store.unfinished() == []
+    assert store.get("missing") is None
+
+
+def test_job_api_processes_large_list(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "job_store", JobStore(str(tmp_path / "jobs.db")))
+    monkeypatch.setattr(main, "JOB_LOCKS_DIR", str(tmp_path / "locks"))
+    monkeypatch.setattr(main, "result_cache", None)
+    monkeypatch.setattr(main, "MAX_WORDS_PER_REQUEST", 2)
+
+    async def fake_fetch(parsed_word, source_lang, target_lang, context=None):
+        return fake_data(parsed_word)
+
+    monkeypatch.setattr(main, "fetch_word_data", fake_fetch)
+    words = [f"word{i}" for i in range(120)]
+
+    with TestClient(main.app) as client:
+        response = client.post(
+            "/jobs",
+            json={"text": "\n".join(words), "source_lang": "En", "target_lang": "Ru"},
+        )
+        assert response.status_code == 202
+        job_id = response.json()["id"]
+
+        job = wait_for_job(client, job_id)
+        assert (job["status"], job["total"], job["done"]) == ("completed", 120, 120)
+
+        lines = client.get(f"/jobs/{job_id}/results").text.splitlines()
+        assert sorted(line.split(";")[-1] for line in lines) == sorted(
+            f'"{word}"' for word in words
+        )
+
+        tail = client.get(
+            f"/jobs/{job_id}/results", params={"format": "ndjson", "offset": 100}
+        )
+        assert len([json.loads(line) for line in tail.text.splitlines()]) == 20
+
+        upload = client.post(
+            "/jobs/upload",
+            params={"source_lang": "En", "target_lang": "Ru"},
+            content=b"run, walk\n[a table] sit\n",
+        )
+        assert wait_for_job(client, upload.json()["id"])["done"] == 3
+
+        assert client.get("/jobs/missing").status_code == 404
+
+
+def test_job_upload_rejects_large_files(tmp_path, monkeypatch):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    monkeypatch.setattr(main, "job_store", store)
+    monkeypatch.setattr(main, "JOB_LOCKS_DIR", str(tmp_path / "locks"))
+    monkeypatch.setattr(main, "MAX_JOB_TEXT_LENGTH", 16)
+
+    def chunks():
+        # No Content-Length: the limit has to hold while the body is read
+        for _ in range(4):
+            yield b"run, walk, sit\n"
+
+    with TestClient(main.app) as client:
+        assert client.post("/jobs/upload", content=b"x, " * 10).status_code == 413
+        assert client.post("/jobs/upload", content=chunks()).status_code == 413
+
+    assert store.unfinished() == []
+
+
+def test_unfinished_jobs_resume_on_startup(tmp_path, monkeypatch):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    job_id = store.create([("run", "run", None), ("walk", "walk", None)], "En", "Ru")
+    store.set_status(job_id, jobs.RUNNING)
+    store.record_result(job_id, 0, main.word_result("run", fake_data("run")))
+    monkeypatch.setattr(main, "job_store", store)
+    monkeypatch.setattr(main, "JOB_LOCKS_DIR", str(tmp_path / "locks"))
+    monkeypatch.setattr(main, "result_cache", None)
+    looked_up = []
+
+    async def fake_fetch(parsed_word, source_lang, target_lang, context=None):
+        looked_up.append(parsed_word)
+        return fake_data(parsed_word)
+
+    monkeypatch.setattr(main, "fetch_word_data", fake_fetch)
+
+    with TestClient(main.app) as client:
+        job = wait_for_job(client, job_id)
+
+    assert job["done"] == 2
+    assert looked_up == ["walk"]
+
+
+def test_locked_job_is_left_to_its_worker(tmp_path, monkeypatch):
+    import asyncio
+
+    from backend.interprocess import try_lock_file
+
+    store = JobStore(str(tmp_path / "jobs.db"))
+    job_id = store.create([("run", "run", None)], "En", "Ru")
+    monkeypatch.setattr(main, "job_store", store)
+    monkeypatch.setattr(main, "JOB_LOCKS_DIR", str(tmp_path))
+
+    # Another worker process holds the job
+    fd = try_lock_file(str(tmp_path / f"{job_id}.lock"))
+    asyncio.run(main.run_job(job_id))
+
+    assert fd is not None
+    assert store.get(job_id)["status"] == jobs.QUEUED
+
+
+def test_batched_job_answers_cached_words_without_model_calls(tmp_path, monkeypatch):
+    import asyncio
+
+    from backend.cache import ResultCache
+    from backend.llm import StubBackend
+
+    words = ["run", "walk", "swim", "fly", "see"]
+    cache = ResultCache(str(tmp_path / "cache.db"))
+    monkeypatch.setattr(main, "result_cache", cache)
+    for word in words:
+        main.store_cached_word_data(fake_data(word), word, "En", "Ru")
+    backend = StubBackend()
+    monkeypatch.setattr(main, "llm_backend", backend)
+    monkeypatch.setattr(main, "BATCH_SIZE", 5)
+    store = JobStore(str(tmp_path / "jobs.db"))
+    monkeypatch.setattr(main, "job_store", store)
+    monkeypatch.setattr(main, "JOB_LOCKS_DIR", str(tmp_path / "locks"))
+    job_id = store.create(main.build_word_entries(words), "En", "Ru")
+
+    asyncio.run(main.run_job(job_id))
+
+    assert store.get(job_id)["done"] == 5
+    assert backend.calls == 0
+    assert {r["source"] for r in store.results(job_id)} == {"cache"}
+    assert cache.get(
+        main.make_cache_key(
+            "run",
+            None,
+            "En",
+            "Ru",
+            main.GEMINI_MODEL,
+            main.get_compiled_prompt("En", "Ru").hash,
+        )
+    ) == fake_data("run")
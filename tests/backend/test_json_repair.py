@@ -0,0 +1,56 @@
+import pytest
+
+from backend.json_repair import extract_json, intact_objects
+
+
+def test_extract_json_nested_objects_without_repair():
+    text = 'Here you go: {"a": {"b": 1}, "c": [{"d": 2}]} Done.'
+    assert extract_json(text) == ({"a": {"b": 1}, "c": [{"d": 2}]}, False)
+
+
+def test_extract_json_prefers_fenced_block():
+    text = 'Use {word} like this:\n```json\n{"x": 1}\n```'
+    assert extract_json(text) == ({"x": 1}, False)
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ('{"a": [1, 2,], "b": "x",}', {"a": [1, 2], "b": "x"}),
+        ("{“a”: “he said „hi“”}", {"a": "he said „hi“"}),
+        ('{"a": "line\nbreak"}', {"a": "line\nbreak"}),
+        (
+            '```json\n{"a": "run", "examples": [{"source": "I #run#", "translation": "Я бе',
+            {"a": "run", "examples": [{"source": "I #run#", "translation": "Я бе"}]},
+        ),
+        (
+            '{"a": "run", "examples": [{"source": "I #run#", "transl',
+            {"a": "run", "examples": [{"source": "I #run#"}]},
+        ),
+        ('{"a": "run", "b":', {"a": "run", "b": None}),
+    ],
+)
+def test_extract_json_repairs_common_defects(text, expected):
+    assert extract_json(text) == (expected, True)
+
+
+def test_extract_json_truncated_array():
+    assert extract_json('[{"id": 1}, {"id": 2}, {"id"', list) == (
+        [{"id": 1}, {"id": 2}],
+        True,
+    )
+
+
+def test_extract_json_not_found():
+    with pytest.raises(ValueError, match="No JSON object found in output"):
+        extract_json("This is not JSON at all.")
+    with pytest.raises(ValueError, match="No JSON array found in output"):
+        extract_json('{"a": 1}', list)
+    # A bare opener is not repaired into an empty value
+    with pytest.raises(ValueError, match="No JSON object found in output"):
+        extract_json("Sure! {")
+
+
+def test_intact_objects_skips_truncated_ones():
+    text = '[{"id": 1, "e": [{"s": "x"}]}, {"id": 2, "infinitive": "wa'
+    assert intact_objects(text) == [{"id": 1, "e": [{"s": "x"}]}, {"s": "x"}]
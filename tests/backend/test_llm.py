@@ -0,0 +1,235 @@
+import asyncio
+import json
+import os
+import signal
+import sys
+
+import httpx
+import pytest
+
+from backend import stub_server
+from backend.llm import (
+    GeminiCLIBackend,
+    GeminiHTTPBackend,
+    LLMNotFoundError,
+    LLMResponseError,
+    LLMTimeoutError,
+    StubBackend,
+    WorkerPoolBackend,
+    classify_error,
+    create_backend,
+)
+from backend.main import build_batch_prompt, build_prompt
+from backend.pool_worker import backend_from_env
+
+
+def test_classify_error():
+    assert classify_error("Auth token expired") == "auth"
+    assert classify_error("Network unreachable") == "network"
+    assert classify_error("Model is over capacity") == "capacity"
+    assert classify_error("Something else") == "error"
+
+
+def test_create_backend_rejects_unknown_name():
+    with pytest.raises(ValueError):
+        create_backend("carrier-pigeon", model="m", timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_stub_backend_is_deterministic():
+    backend = StubBackend()
+    prompt = build_prompt("run", "English", "Russian")
+
+    first = json.loads(await backend.generate(prompt))
+    assert first == json.loads(await backend.generate(prompt))
+    assert first["infinitive"] == "run"
+    assert backend.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_stub_backend_answers_batches():
+    prompt = build_batch_prompt([("run", None), ("walk", "ctx")], "English", "Russian")
+    items = json.loads(await StubBackend().generate(prompt))
+    assert [(item["id"], item["infinitive"]) for item in items] == [
+        (1, "run"),
+        (2, "walk"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_http_backend_against_stub_server():
+    backend = GeminiHTTPBackend("test-model", timeout=5, api_key="key")
+    backend._client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=stub_server.app), base_url="http://stub"
+    )
+
+    output = await backend.generate(build_prompt("run", "English", "Russian"))
+    assert json.loads(output)["infinitive"] == "run"
+    await backend.aclose()
+
+
+@pytest.mark.asyncio
+async def test_http_backend_maps_capacity_errors():
+    backend = GeminiHTTPBackend("test-model", timeout=5, api_key="key")
+    backend._client = httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda request: httpx.Response(429)),
+        base_url="http://stub",
+    )
+
+    with pytest.raises(LLMResponseError) as exc_info:
+        await backend.generate("prompt")
+    assert exc_info.value.kind == "capacity"
+    await backend.aclose()
+
+
+def _is_running(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            # Killed children may stay zombies until their new parent reaps them
+            return f.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+def _fake_gemini(tmp_path, monkeypatch, script):
+    executable = tmp_path / "gemini"
+    executable.write_text("#!/bin/sh\n" + script)
+    executable.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+
+
+@pytest.mark.asyncio
+async def test_cli_backend_returns_stdout(tmp_path, monkeypatch):
+    _fake_gemini(tmp_path, monkeypatch, 'echo "{\\"infinitive\\": \\"$2\\"}"\n')
+    output = await GeminiCLIBackend("test-model", timeout=5).generate("prompt")
+    assert json.loads(output) == {"infinitive": "test-model"}
+
+
+@pytest.mark.asyncio
+async def test_cli_backend_classifies_failures(tmp_path, monkeypatch):
+    _fake_gemini(
+        tmp_path, monkeypatch, "echo partial; echo 'No capacity' >&2; exit 1\n"
+    )
+    with pytest.raises(LLMResponseError) as exc_info:
+        await GeminiCLIBackend("test-model", timeout=5).generate("prompt")
+    assert exc_info.value.kind == "capacity"
+    assert exc_info.value.stdout == "partial\n"
+
+
+@pytest.mark.asyncio
+async def test_cli_backend_kills_process_group_on_timeout(tmp_path, monkeypatch):
+    pid_file = tmp_path / "child.pid"
+    _fake_gemini(tmp_path, monkeypatch, f"sleep 30 &\necho $! > {pid_file}\nwait\n")
+
+    with pytest.raises(LLMTimeoutError):
+        await GeminiCLIBackend("test-model", timeout=0.5).generate("prompt")
+
+    child_pid = int(pid_file.read_text())
+    await asyncio.sleep(0.1)
+    assert not _is_running(child_pid)
+
+
+@pytest.mark.asyncio
+async def test_cli_backend_reports_missing_executable(monkeypatch):
+    monkeypatch.setenv("PATH", "")
+    with pytest.raises(LLMNotFoundError):
+        await GeminiCLIBackend("test-model", timeout=5).generate("prompt")
+
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+POOL_WORKER = [sys.executable, "-m", "backend.pool_worker"]
+
+
+def _pool(**kwargs):
+    options = {"size": 2, "timeout": 5, "health_interval": 3600, "cwd": ROOT_DIR}
+    options.update(kwargs)
+    return WorkerPoolBackend(POOL_WORKER, **options)
+
+
+@pytest.mark.asyncio
+async def test_pool_backend_answers_and_recycles(monkeypatch):
+    monkeypatch.setenv("POOL_WORKER_BACKEND", "stub")
+    backend = _pool(size=1, max_jobs=2)
+    try:
+        prompt = build_prompt("run", "English", "Russian")
+        outputs = [await backend.generate(prompt) for _ in range(3)]
+
+        assert {json.loads(output)["infinitive"] for output in outputs} == {"run"}
+        assert backend.restarts == 1  # recycled after two prompts
+    finally:
+        await backend.aclose()
+    assert backend.stats()["workers"] == 0
+
+
+@pytest.mark.asyncio
+async def test_pool_backend_replaces_crashed_workers(monkeypatch):
+    monkeypatch.setenv("POOL_WORKER_BACKEND", "stub")
+    backend = _pool(size=1)
+    try:
+        prompt = build_prompt("walk", "English", "Russian")
+        await backend.generate(prompt)
+        (worker,) = backend._workers
+        os.kill(worker.process.pid, signal.SIGKILL)
+        await worker.process.wait()
+
+        # The prompt is sent again to a fresh worker
+        assert json.loads(await backend.generate(prompt))["infinitive"] == "walk"
+        assert backend.restarts == 1
+
+        (worker,) = backend._workers
+        os.kill(worker.process.pid, signal.SIGKILL)
+        await worker.process.wait()
+        await backend.check_workers()
+        assert backend.restarts == 2
+        assert backend.stats()["idle"] == 1
+    finally:
+        await backend.aclose()
+
+
+@pytest.mark.asyncio
+async def test_pool_backend_kills_stuck_workers(tmp_path):
+    # Answers health checks but never a prompt
+    script = tmp_path / "stuck_worker.py"
+    script.write_text(
+        "import json, sys, time\n"
+        "for line in sys.stdin:\n"
+        "    request = json.loads(line)\n"
+        "    if not request.get('ping'):\n"
+        "        time.sleep(60)\n"
+        "    print(json.dumps({'id': request['id'], 'pong': True}), flush=True)\n"
+    )
+    backend = WorkerPoolBackend(
+        [sys.executable, str(script)], size=1, timeout=0.5, health_interval=3600
+    )
+    try:
+        with pytest.raises(LLMTimeoutError):
+            await backend.generate("prompt")
+        assert backend.stats() == {"size": 1, "workers": 0, "idle": 0, "restarts": 1}
+    finally:
+        await backend.aclose()
+
+
+@pytest.mark.asyncio
+async def test_pool_backend_passes_worker_errors(monkeypatch):
+    monkeypatch.setenv("POOL_WORKER_BACKEND", "http")
+    monkeypatch.setenv("GEMINI_API_KEY", "")
+    backend = _pool(size=1)
+    try:
+        with pytest.raises(LLMNotFoundError):
+            await backend.generate("prompt")
+        assert backend.restarts == 0
+    finally:
+        await backend.aclose()
+
+
+def test_pool_worker_backend_has_no_default(monkeypatch):
+    monkeypatch.delenv("POOL_WORKER_BACKEND", raising=False)
+    with pytest.raises(ValueError, match="POOL_WORKER_BACKEND"):
+        backend_from_env()
+
+    monkeypatch.setenv("POOL_WORKER_BACKEND", "stub")
+    assert isinstance(backend_from_env(), StubBackend)
@@ -1,7 +1,10 @@
+import asyncio
+
 import pytest
 from backend.main import (
     clean_csv_field,
     parse_word_with_context,
+    split_text_respecting_brackets,
     get_prompt_template,
     app,
     extract_data_line,
@@ -20,6 +23,8 @@ def test_clean_csv_field():
     assert (
         clean_csv_field("multiple\n\nnewlines") == "multiple newlines"
     )  # re.sub(r'\s+', ' ', ...)
+    assert clean_csv_field("line\\nbreak\\r") == "line break"
+    assert clean_csv_field(42) == "42"
 
 
 def test_parse_word_with_context():
@@ -34,18 +39,33 @@ def test_parse_word_with_context():
 
     # No brackets
     assert parse_word_with_context("plain word") == ("plain word", None)
+    assert parse_word_with_context("  ") == ("", None)
+    assert parse_word_with_context("word [unclosed") == ("word [unclosed", None)
+
+
+def test_split_text_respecting_brackets():
+    # Flat, nested and unbalanced brackets take different paths
+    assert split_text_respecting_brackets("a, [b, c] d, e") == ["a", "[b, c] d", "e"]
+    assert split_text_respecting_brackets("a [b, [c, d]], e") == ["a [b, [c, d]]", "e"]
+    assert split_text_respecting_brackets("a], b, [c, d") == ["a]", "b", "[c, d"]
+    assert split_text_respecting_brackets(" , ,") == []
 
 
 def test_get_prompt_template_fallback(tmp_path, monkeypatch):
-    # Mock PROMPTS_DIR
+    from backend.prompt_registry import PromptRegistry
+
+    # Mock the prompts directory
     prompts_dir = tmp_path / "prompts"
     prompts_dir.mkdir()
     (prompts_dir / "prompt.txt").write_text("default")
+    (prompts_dir / "fix_json_prompt.txt").write_text("fix {broken_output}")
+    (prompts_dir / "batch_prompt.txt").write_text("batch {entries}")
     (prompts_dir / "prompt_German.txt").write_text("german_source")
     (prompts_dir / "prompt_German_Russian.txt").write_text("german_russian_pair")
 
-    monkeypatch.setattr("backend.main.PROMPTS_DIR", str(prompts_dir))
-    monkeypatch.setattr("backend.main.DEFAULT_PROMPT_TEMPLATE", "default")
+    monkeypatch.setattr(
+        "backend.main.prompt_registry", PromptRegistry(str(prompts_dir))
+    )
 
     # 1. Full pair match
     assert get_prompt_template("German", "Russian") == "german_russian_pair"
@@ -163,3 +183,630 @@ def test_format_error_response():
     # Format: Display;"[error]";"[ERROR]: ...";ID
     expected_csv = '"invalid";"[error]";"[ERROR]: Some error occurred";"invalid"'
     assert format_error_response(raw_word, error_message) == expected_csv
+
+
+def test_process_words_streams_cache_hits(tmp_path, monkeypatch):
+    """Cached words are answered without calling the model."""
+    from backend import main
+    from backend.cache import ResultCache
+
+    monkeypatch.setattr(main, "result_cache", ResultCache(str(tmp_path / "c.db")))
+    main.store_cached_word_data(
+        {
+            "infinitive": "run",
+            "transcription": "[rʌn]",
+            "translations": ["бежать"],
+            "examples": [],
+        },
+        "run",
+        "English",
+        "Russian",
+    )
+
+    async def fail(*args, **kwargs):
+        raise AssertionError("model should not be called on a cache hit")
+
+    monkeypatch.setattr(main, "fetch_word_data", fail)
+
+    response = client.post(
+        "/process-words",
+        json={"text": "Run", "source_lang": "English", "target_lang": "Russian"},
+    )
+    assert response.status_code == 200
+    assert response.text == '"run";"[rʌn]";"бежать";"run"\n'
+
+    response = client.delete("/cache", params={"word": "run"})
+    assert response.json() == {"removed": 1}
+
+
+def test_duplicate_words_share_one_lookup(monkeypatch):
+    """Repeated words trigger a single model call but keep their own IDs."""
+    from backend import main
+
+    monkeypatch.setattr(main, "result_cache", None)
+    calls = []
+
+    async def fake_fetch(parsed_word, source_lang, target_lang, context=None):
+        calls.append(parsed_word)
+        await asyncio.sleep(0.01)
+        return {
+            "infinitive": "run",
+            "transcription": "",
+            "translations": ["бежать"],
+            "examples": [],
+        }
+
+    monkeypatch.setattr(main, "fetch_word_data", fake_fetch)
+
+    response = client.post(
+        "/process-words",
+        json={"text": "run, Run , [ run ]", "source_lang": "En", "target_lang": "Ru"},
+    )
+    assert response.status_code == 200
+    assert calls == ["run"]
+    ids = sorted(line.split(";")[-1] for line in response.text.splitlines())
+    assert ids == ['"[ run ]"', '"run"', '"run"']
+
+
+def test_parse_batch_data_matches_ids_and_flags_bad_items():
+    from backend.main import parse_batch_data
+
+    stdout = """[
+        {"id": 2, "infinitive": "to walk", "translations": ["идти"], "examples": []},
+        {"id": 1, "infinitive": "to run", "translations": ["бежать"], "examples": []},
+        {"id": 3, "infinitive": "x", "examples": "not a list"}
+    ]"""
+    items = parse_batch_data(stdout, ["run", "walk", "bad", "missing"])
+
+    assert items[0]["infinitive"] == "to run"
+    assert items[1]["translations"] == ["идти"]
+    assert items[2] is None
+    assert items[3] is None
+
+
+def test_parse_batch_data_rejects_truncated_items():
+    from backend.main import parse_batch_data
+
+    stdout = (
+        '[{"id": 1, "infinitive": "run", "translations": ["бежать"], "examples": []},'
+        ' {"id": 2, "infinitive": "wa'
+    )
+    items = parse_batch_data(stdout, ["run", "walk"])
+
+    assert items[0]["translations"] == ["бежать"]
+    assert items[1] is None
+
+
+def test_process_words_batch_mode_falls_back_for_missing_items(monkeypatch):
+    from backend import main
+
+    monkeypatch.setattr(main, "result_cache", None)
+    monkeypatch.setattr(main, "BATCH_SIZE", 10)
+    prompts = []
+
+    async def fake_run_gemini(prompt):
+        prompts.append(prompt)
+        return '[{"id": 1, "infinitive": "run", "transcription": "", "translations": ["бежать"], "examples": []}]'
+
+    async def fake_fetch(parsed_word, source_lang, target_lang, context=None):
+        return {
+            "infinitive": parsed_word,
+            "transcription": "",
+            "translations": ["single"],
+            "examples": [],
+        }
+
+    monkeypatch.setattr(main, "run_gemini", fake_run_gemini)
+    monkeypatch.setattr(main, "fetch_word_data", fake_fetch)
+
+    response = client.post(
+        "/process-words",
+        json={"text": "run, [a table] walk", "source_lang": "En", "target_lang": "Ru"},
+    )
+
+    assert len(prompts) == 1
+    assert '1. "run"' in prompts[0]
+    assert '2. "walk" (context: `a table`)' in prompts[0]
+    assert sorted(response.text.splitlines()) == [
+        '"run";"";"бежать";"run"',
+        '"walk";"";"single";"[a table] walk"',
+    ]
+
+
+class RecordingBackend:
+    name = "recording"
+
+    def __init__(self):
+        self.prompts = []
+
+    async def generate(self, prompt):
+        from backend.llm import stub_response
+
+        self.prompts.append(prompt)
+        await asyncio.sleep(0.05)
+        return stub_response(prompt)
+
+
+async def collect(entries):
+    from backend import main
+
+    return dict(
+        [item async for item in main.lookup_entries(entries, "En", "Ru", False)]
+    )
+
+
+@pytest.mark.asyncio
+async def test_batch_joins_words_already_in_flight(monkeypatch):
+    from backend import main
+
+    monkeypatch.setattr(main, "result_cache", None)
+    backend = RecordingBackend()
+    monkeypatch.setattr(main, "llm_backend", backend)
+
+    single = asyncio.ensure_future(main.lookup_word("Run", "run", "En", "Ru"))
+    await asyncio.sleep(0.01)
+    results = await collect(
+        [("run", "run", None), ("walk", "walk", None), ("sit", "sit", None)]
+    )
+
+    assert (await single)["error"] is None
+    assert [results[i]["word"] for i in range(3)] == ["run", "walk", "sit"]
+    assert all(result["error"] is None for result in results.values())
+    # The chunk joined the running lookup of "run" and batched the rest
+    assert len(backend.prompts) == 2
+    assert backend.prompts[1].endswith('Entries:\n1. "walk"\n2. "sit"')
+
+
+@pytest.mark.asyncio
+async def test_single_lookups_join_running_batch(tmp_path, monkeypatch):
+    from backend import main
+    from backend.cache import ResultCache, make_cache_key
+
+    monkeypatch.setattr(main, "result_cache", ResultCache(str(tmp_path / "c.db")))
+    backend = RecordingBackend()
+    monkeypatch.setattr(main, "llm_backend", backend)
+
+    batch = asyncio.ensure_future(
+        collect([("walk", "walk", None), ("sit", "sit", None)])
+    )
+    await asyncio.sleep(0.01)
+    result = await main.lookup_word("Walk", "walk", "En", "Ru")
+    await batch
+
+    assert len(backend.prompts) == 1
+    assert result["word"] == "Walk" and result["source"] == "model"
+
+    # Batch answers are cached apart from answers of the single-word prompt
+    single_key = make_cache_key(
+        "walk", None, "En", "Ru", main.GEMINI_MODEL, main.cache_prompt_hash("En", "Ru")
+    )
+    assert main.result_cache.get(single_key) is None
+    assert main.get_cached_word_data("walk", "walk", "En", "Ru") is not None
+
+
+@pytest.mark.asyncio
+async def test_interactive_caller_promotes_shared_bulk_lookup(monkeypatch):
+    from backend import main, metrics
+    from backend.llm import stub_response
+    from backend.scheduler import BULK, INTERACTIVE, FairScheduler, current_lane
+
+    monkeypatch.setattr(main, "result_cache", None)
+    monkeypatch.setattr(main, "gemini_scheduler", FairScheduler(1))
+    gate = asyncio.Event()
+    order = []
+
+    class GatedBackend:
+        name = "gated"
+
+        async def generate(self, prompt):
+            word = stub_response(prompt).split('"')[3]
+            order.append(word)
+            if word == "hold":
+                await gate.wait()
+            return stub_response(prompt)
+
+    monkeypatch.setattr(main, "llm_backend", GatedBackend())
+
+    async def lookup(word, lane):
+        current_lane.set(lane)
+        return await main.lookup_word(word, word, "En", "Ru")
+
+    labels = {
+        "source_lang": "other",
+        "target_lang": "other",
+        "model": main.GEMINI_MODEL,
+    }
+    served = metrics.WORD_LOOKUP_SECONDS.count(
+        **labels, source="model", lane=INTERACTIVE
+    )
+    waited = metrics.QUEUE_WAIT_SECONDS.count(model=main.GEMINI_MODEL, lane=INTERACTIVE)
+
+    hold = asyncio.ensure_future(lookup("hold", BULK))
+    await asyncio.sleep(0.01)
+    bulk = [asyncio.ensure_future(lookup(word, BULK)) for word in ("walk", "run")]
+    await asyncio.sleep(0.01)
+    # Joins the queued bulk lookup of "run", which moves ahead of "walk"
+    joined = asyncio.ensure_future(lookup("run", INTERACTIVE))
+    await asyncio.sleep(0.01)
+    gate.set()
+    results = await asyncio.gather(hold, joined, *bulk)
+
+    assert all(result["error"] is None for result in results)
+    assert order == ["hold", "run", "walk"]
+    # Both callers of "run" were served by an interactive model call
+    assert (
+        metrics.WORD_LOOKUP_SECONDS.count(**labels, source="model", lane=INTERACTIVE)
+        == served + 2
+    )
+    assert (
+        metrics.QUEUE_WAIT_SECONDS.count(model=main.GEMINI_MODEL, lane=INTERACTIVE)
+        == waited + 1
+    )
+    assert main.lookup_lanes == {}
+
+
+@pytest.mark.asyncio
+async def test_process_words_cancels_lookups_on_disconnect(monkeypatch):
+    from backend import main
+
+    monkeypatch.setattr(main, "result_cache", None)
+    monkeypatch.setattr(main, "DISCONNECT_CHECK_INTERVAL", 0.01)
+    started = asyncio.Event()
+    cancelled = []
+
+    async def slow_fetch(parsed_word, source_lang, target_lang, context=None):
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(parsed_word)
+            raise
+
+    class DisconnectingRequest:
+        def __init__(self):
+            self.headers = {}
+
+        async def is_disconnected(self):
+            return started.is_set()
+
+    monkeypatch.setattr(main, "fetch_word_data", slow_fetch)
+
+    response = await main.process_words(
+        main.WordsRequest(text="run, walk"), DisconnectingRequest()
+    )
+    lines = [line async for line in response.body_iterator]
+    await asyncio.sleep(0.01)
+
+    assert lines == []
+    assert sorted(cancelled) == ["run", "walk"]
+
+
+@pytest.mark.parametrize(
+    "text, priority, lane",
+    [
+        ("run", None, "interactive"),
+        ("run, walk, swim, fly", None, "bulk"),
+        ("run, walk, swim, fly", "interactive", "interactive"),
+        ("run", "bulk", "bulk"),
+    ],
+)
+def test_process_words_chooses_lane(monkeypatch, text, priority, lane):
+    from backend import main
+    from backend.scheduler import current_lane
+
+    monkeypatch.setattr(main, "result_cache", None)
+    monkeypatch.setattr(main, "INTERACTIVE_MAX_WORDS", 3)
+    lanes = set()
+
+    async def fake_fetch(parsed_word, source_lang, target_lang, context=None):
+        lanes.add(current_lane.get())
+        return {"infinitive": parsed_word, "translations": [], "examples": []}
+
+    monkeypatch.setattr(main, "fetch_word_data", fake_fetch)
+
+    response = client.post("/process-words", json={"text": text, "priority": priority})
+    assert response.status_code == 200
+    assert lanes == {lane}
+
+
+def test_metrics_endpoint_reports_lookups(tmp_path, monkeypatch):
+    from backend import main, metrics
+    from backend.cache import ResultCache
+    from backend.llm import StubBackend
+
+    monkeypatch.setattr(main, "result_cache", ResultCache(str(tmp_path / "c.db")))
+    monkeypatch.setattr(main, "llm_backend", StubBackend())
+    # Languages outside the known set share one label value
+    labels = {
+        "source_lang": "other",
+        "target_lang": "Russian",
+        "model": main.GEMINI_MODEL,
+    }
+    misses = metrics.CACHE_LOOKUPS.value(**labels, result="miss")
+
+    client.post(
+        "/process-words",
+        json={"text": "unknown", "source_lang": "Metric", "target_lang": "Russian"},
+    )
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert metrics.CACHE_LOOKUPS.value(**labels, result="miss") == misses + 1
+    assert "vocab_word_lookup_seconds_count" in response.text
+    assert "Metric" not in response.text
+
+
+@pytest.mark.asyncio
+async def test_fetch_word_data_requeues_capacity_errors(monkeypatch):
+    from backend import main
+    from backend.llm import LLMResponseError, stub_response
+
+    monkeypatch.setattr(main, "result_cache", None)
+    monkeypatch.setattr(main, "RETRY_BASE_DELAY", 0)
+    calls = []
+
+    class FlakyBackend:
+        name = "flaky"
+
+        async def generate(self, prompt):
+            calls.append(prompt)
+            if len(calls) <= 4:
+                raise LLMResponseError("capacity exhausted", "capacity")
+            return f"```json\n{stub_response(prompt)}\n```"
+
+    monkeypatch.setattr(main, "llm_backend", FlakyBackend())
+
+    data = await main.fetch_word_data("run", "English", "Russian")
+
+    assert data["infinitive"] == "run"
+    assert len(calls) == 5
+
+
+@pytest.mark.asyncio
+async def test_fetch_word_data_gives_up_after_capacity_requeues(monkeypatch):
+    from backend import main
+    from backend.llm import LLMResponseError
+
+    monkeypatch.setattr(main, "RETRY_BASE_DELAY", 0)
+    monkeypatch.setattr(main, "MAX_CAPACITY_REQUEUES", 2)
+    calls = []
+
+    class ExhaustedBackend:
+        name = "exhausted"
+
+        async def generate(self, prompt):
+            calls.append(prompt)
+            raise LLMResponseError("capacity exhausted", "capacity")
+
+    monkeypatch.setattr(main, "llm_backend", ExhaustedBackend())
+
+    with pytest.raises(main.WordLookupError, match="capacity exhausted"):
+        await main.fetch_word_data("run", "English", "Russian")
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_fetch_word_data_repairs_json_without_fixer(monkeypatch):
+    from backend import main, metrics
+
+    monkeypatch.setattr(main, "result_cache", None)
+    prompts = []
+
+    async def fake_run_gemini(prompt):
+        prompts.append(prompt)
+        return (
+            '{"infinitive": "run", "transcription": "[rʌn]", '
+            '"translations": ["бежать",], '
+            '"examples": [{"source": "I #run#.", "translation": "Я #бегу#."'
+        )
+
+    monkeypatch.setattr(main, "run_gemini", fake_run_gemini)
+    repairs = metrics.JSON_LOCAL_REPAIRS.value(model=main.GEMINI_MODEL)
+
+    data = await main.fetch_word_data("run", "English", "Russian")
+
+    assert data["translations"] == ["бежать"]
+    assert data["examples"] == [{"source": "I #run#.", "translation": "Я #бегу#."}]
+    assert len(prompts) == 1
+    assert metrics.JSON_LOCAL_REPAIRS.value(model=main.GEMINI_MODEL) == repairs + 1
+
+
+@pytest.mark.asyncio
+async def test_fetch_word_data_retries_truncated_answers(tmp_path, monkeypatch):
+    from backend import main
+    from backend.cache import ResultCache
+    from backend.llm import stub_response
+
+    cache = ResultCache(str(tmp_path / "c.db"))
+    monkeypatch.setattr(main, "result_cache", cache)
+    monkeypatch.setattr(main, "RETRY_BASE_DELAY", 0)
+    prompts = []
+
+    async def truncated_run_gemini(prompt):
+        prompts.append(prompt)
+        return '{"infinitive": "run", "transcription": "[r'
+
+    monkeypatch.setattr(main, "run_gemini", truncated_run_gemini)
+
+    with pytest.raises(main.WordLookupError):
+        await main.fetch_word_data("run", "English", "Russian")
+    # Every attempt asked the model again, and the fixer got its turn
+    assert len(prompts) > 3
+    assert len(cache) == 0
+
+    answers = iter(["Sure! {", stub_response(main.build_prompt("run", "En", "Ru"))])
+
+    async def recovering_run_gemini(prompt):
+        return next(answers)
+
+    monkeypatch.setattr(main, "run_gemini", recovering_run_gemini)
+
+    async def no_fix(broken_output, original_word):
+        return None
+
+    monkeypatch.setattr(main, "fix_json_with_llm", no_fix)
+
+    data = await main.fetch_word_data("run", "English", "Russian")
+    assert data["translations"]
+    assert len(cache) == 1
+
+
+def test_process_words_ndjson(monkeypatch):
+    import json
+
+    from backend import main
+    from backend.main import WordLookupError
+
+    monkeypatch.setattr(main, "result_cache", None)
+
+    async def fake_fetch(parsed_word, source_lang, target_lang, context=None):
+        if parsed_word == "bad":
+            raise WordLookupError('Invalid "output"')
+        return {
+            "infinitive": "run",
+            "transcription": "[rʌn]",
+            "translations": ["бежать; мчаться"],
+            "examples": [{"source": 'He said "#run#"', "translation": "Беги"}],
+        }
+
+    monkeypatch.setattr(main, "fetch_word_data", fake_fetch)
+    body = {"text": "Run, bad", "source_lang": "En", "target_lang": "Ru"}
+
+    by_header = client.post(
+        "/process-words", json=body, headers={"Accept": "application/x-ndjson"}
+    )
+    by_query = client.post("/process-words", json=body, params={"format": "ndjson"})
+
+    for response in (by_header, by_query):
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        results = {r["word"]: r for r in map(json.loads, response.text.splitlines())}
+        assert results["Run"]["translations"] == ["бежать; мчаться"]
+        assert results["Run"]["examples"][0]["source"] == 'He said "#run#"'
+        assert results["Run"]["error"] is None
+        assert results["Run"]["source"] == "model"
+        assert results["Run"]["elapsed_ms"] >= 0
+        assert results["bad"]["error"] == 'Invalid "output"'
+        assert results["bad"]["source"] == "error"
+
+    csv = client.post("/process-words", json=body, params={"format": "csv"})
+    assert '"run";"[rʌn]";"бежать; мчаться"' in csv.text
+
+    bad = client.post("/process-words", json=body, params={"format": "xml"})
+    assert bad.status_code == 400
+
+
+def test_process_words_input_order(monkeypatch):
+    from backend import main
+
+    monkeypatch.setattr(main, "result_cache", None)
+    monkeypatch.setattr(main, "ORDERED_WINDOW", 2)
+    delays = {"run": 0.05, "walk": 0.01, "swim": 0.03, "fly": 0}
+    running = 0
+    peak = 0
+
+    async def fake_fetch(parsed_word, source_lang, target_lang, context=None):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(delays[parsed_word])
+        running -= 1
+        return {"infinitive": parsed_word, "translations": [], "examples": []}
+
+    monkeypatch.setattr(main, "fetch_word_data", fake_fetch)
+    body = {"text": "run, walk, swim, fly"}
+
+    ordered = client.post("/process-words", json=body, params={"order": "input"})
+    ids = [line.split(";")[-1] for line in ordered.text.splitlines()]
+    assert ids == ['"run"', '"walk"', '"swim"', '"fly"']
+    assert peak == 2
+
+    unordered = client.post("/process-words", json=body)
+    ids = [line.split(";")[-1] for line in unordered.text.splitlines()]
+    assert ids[0] == '"fly"'
+    assert sorted(ids) == sorted(['"run"', '"walk"', '"swim"', '"fly"'])
+
+
+def test_process_words_progress_events(monkeypatch):
+    import json
+
+    from backend import main
+    from backend.llm import LLMResponseError, stub_response
+
+    monkeypatch.setattr(main, "result_cache", None)
+    monkeypatch.setattr(main, "RETRY_BASE_DELAY", 0)
+    calls = []
+
+    class FlakyBackend:
+        name = "flaky"
+
+        async def generate(self, prompt):
+            calls.append(prompt)
+            if len(calls) == 1:
+                raise LLMResponseError("capacity exhausted", "capacity")
+            # Trailing comma: repaired locally
+            return stub_response(prompt).rstrip("}") + ",}"
+
+    monkeypatch.setattr(main, "llm_backend", FlakyBackend())
+    body = {"text": "run"}
+
+    response = client.post(
+        "/process-words", json=body, params={"format": "ndjson", "progress": "true"}
+    )
+    lines = [json.loads(line) for line in response.text.splitlines()]
+
+    events = [(line["event"], line["ids"]) for line in lines[:-1]]
+    assert events == [
+        ("queued", ["run"]),
+        ("started", ["run"]),
+        ("retry", ["run"]),
+        ("queued", ["run"]),
+        ("started", ["run"]),
+        ("fixed", ["run"]),
+    ]
+    assert lines[2]["reason"] == "capacity"
+    assert lines[-1]["word"] == "run" and lines[-1]["error"] is None
+
+    csv = client.post("/process-words", json=body, params={"progress": "true"})
+    assert csv.status_code == 400
+
+    # A long wait is bridged by heartbeats
+    monkeypatch.setattr(main, "DISCONNECT_CHECK_INTERVAL", 0.01)
+    monkeypatch.setattr(main, "PROGRESS_HEARTBEAT_INTERVAL", 0)
+
+    async def slow_fetch(parsed_word, source_lang, target_lang, context=None):
+        await asyncio.sleep(0.05)
+        return {"infinitive": parsed_word, "translations": [], "examples": []}
+
+    monkeypatch.setattr(main, "fetch_word_data", slow_fetch)
+    response = client.post(
+        "/process-words", json=body, params={"format": "ndjson", "progress": "true"}
+    )
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines[0] == {"event": "heartbeat", "done": 0, "total": 1}
+
+
+def test_process_words_progress_for_shared_lookups(monkeypatch):
+    import json
+
+    from backend import main
+    from backend.llm import StubBackend
+
+    monkeypatch.setattr(main, "result_cache", None)
+    backend = StubBackend(latency=0.05)
+    monkeypatch.setattr(main, "llm_backend", backend)
+
+    response = client.post(
+        "/process-words",
+        json={"text": "run, Run"},
+        params={"format": "ndjson", "progress": "true", "order": "input"},
+    )
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    events = [(line["event"], line["ids"]) for line in lines if "event" in line]
+
+    assert backend.calls == 1
+    assert [line["word"] for line in lines if "word" in line] == ["run", "Run"]
+    # The second word joined the first one's model call and still hears of it
+    assert ("started", ["run"]) in events
+    assert ("started", ["Run"]) in events
+    assert main.lookup_watchers == {} and main.lookup_last_event == {}
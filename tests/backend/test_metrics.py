@@ -0,0 +1,51 @@
+import pytest
+
+from backend.metrics import Counter, Gauge, Histogram, Registry, language_label
+
+
+def test_counter_and_gauge_rendering():
+    registry = Registry()
+    counter = Counter("calls_total", "Calls.", ("outcome",), registry=registry)
+    gauge = Gauge("depth", "Depth.", function=lambda: 3, registry=registry)
+
+    counter.inc(outcome="ok")
+    counter.inc(2, outcome="ok")
+    counter.inc(outcome='bad "one"')
+
+    assert registry.render() == (
+        "# HELP calls_total Calls.\n"
+        "# TYPE calls_total counter\n"
+        'calls_total{outcome="bad \\"one\\""} 1\n'
+        'calls_total{outcome="ok"} 3\n'
+        "# HELP depth Depth.\n"
+        "# TYPE depth gauge\n"
+        "depth 3\n"
+    )
+    assert gauge.value() == 3
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    histogram = Histogram("latency", "Latency.", ("lang",), (1, 5), registry=registry)
+
+    for value in (0.5, 2, 10):
+        histogram.observe(value, lang="en")
+
+    lines = registry.render().splitlines()
+    assert 'latency_bucket{lang="en",le="1"} 1' in lines
+    assert 'latency_bucket{lang="en",le="5"} 2' in lines
+    assert 'latency_bucket{lang="en",le="+Inf"} 3' in lines
+    assert 'latency_sum{lang="en"} 12.5' in lines
+    assert 'latency_count{lang="en"} 3' in lines
+
+
+def test_labels_must_match():
+    counter = Counter("strict_total", "Strict.", ("a",), registry=Registry())
+    with pytest.raises(ValueError):
+        counter.inc(b="x")
+
+
+def test_language_label_buckets_unknown_languages():
+    assert language_label("German") == "German"
+    assert language_label("german") == "other"
+    assert language_label("x" * 1000) == "other"
@@ -0,0 +1,100 @@
+import json
+
+import pytest
+
+from backend import build_pack, main
+from backend.cache import ResultCache
+from backend.llm import StubBackend
+from backend.packs import load_packs, read_pack
+
+
+def current_hash(source_lang, target_lang):
+    return main.get_compiled_prompt(source_lang, target_lang).hash
+
+
+def test_read_frequency_list(tmp_path):
+    path = tmp_path / "freq.txt"
+    path.write_text(
+        "# rank word count\n1\tthe\t23135851\nbe\t1200000\n3 The\n\nice cream 500\nof\n",
+        encoding="utf-8",
+    )
+
+    assert build_pack.read_frequency_list(str(path)) == [
+        "the",
+        "be",
+        "ice cream",
+        "of",
+    ]
+    assert build_pack.read_frequency_list(str(path), limit=2) == ["the", "be"]
+
+
+@pytest.mark.asyncio
+async def test_build_pack_resumes_and_loads(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "result_cache", None)
+    monkeypatch.setattr(main, "BATCH_SIZE", 2)
+    backend = StubBackend()
+    monkeypatch.setattr(main, "llm_backend", backend)
+    freq = tmp_path / "freq.txt"
+    freq.write_text("run 100\nwalk 90\nswim 80\nfly 70\nsee 60\n", encoding="utf-8")
+    pack = tmp_path / "packs" / "en-ru.jsonl"
+
+    stats = await build_pack.build_pack(
+        str(freq), str(pack), "English", "Russian", limit=4, parallel=2
+    )
+
+    assert stats == {"total": 4, "skipped": 0, "added": 4, "failed": 0}
+    header, entries = read_pack(str(pack))
+    assert header["version"] == 1
+    assert header["prompt_hash"] == current_hash("English", "Russian")
+    assert sorted(entry["word"] for entry in entries) == ["fly", "run", "swim", "walk"]
+
+    # An interrupted build leaves a partial last line behind
+    content = pack.read_text(encoding="utf-8")
+    pack.write_text(content[:-20], encoding="utf-8")
+    backend.calls = 0
+
+    stats = await build_pack.build_pack(
+        str(freq), str(pack), "English", "Russian", parallel=2
+    )
+
+    assert (stats["skipped"], stats["added"]) == (3, 2)
+    assert len(read_pack(str(pack))[1]) == 5
+
+    with pytest.raises(ValueError, match="another output"):
+        await build_pack.build_pack(str(freq), str(pack), "English", "German")
+
+    # The server answers pack words from the cache
+    cache = ResultCache(str(tmp_path / "cache.sqlite3"))
+    packs_dir = str(pack.parent)
+    assert load_packs(cache, packs_dir, main.GEMINI_MODEL, current_hash) == 5
+    assert load_packs(cache, packs_dir, main.GEMINI_MODEL, current_hash) == 0
+
+    monkeypatch.setattr(main, "result_cache", cache)
+    backend.calls = 0
+    result = await main.lookup_word("Swim", "swim", "English", "Russian")
+    assert result["source"] == "cache"
+    assert result["infinitive"] == "swim"
+    assert backend.calls == 0
+
+
+def test_load_packs_skips_stale_and_foreign_files(tmp_path):
+    packs_dir = tmp_path / "packs"
+    packs_dir.mkdir()
+    header = {
+        "format": "vocabmaster-pack",
+        "version": 1,
+        "source_lang": "English",
+        "target_lang": "Russian",
+        "model": main.GEMINI_MODEL,
+        "prompt_hash": "old-prompt",
+    }
+    entry = {"word": "run", "context": None, "data": {"infinitive": "run"}}
+    (packs_dir / "stale.jsonl").write_text(
+        json.dumps(header) + "\n" + json.dumps(entry) + "\n", encoding="utf-8"
+    )
+    (packs_dir / "notes.jsonl").write_text('{"hello": 1}\n', encoding="utf-8")
+    cache = ResultCache(str(tmp_path / "cache.sqlite3"))
+
+    assert load_packs(cache, str(packs_dir), main.GEMINI_MODEL, current_hash) == 0
+    assert len(cache) == 0
+    assert load_packs(cache, str(tmp_path / "missing"), "m", current_hash) == 0
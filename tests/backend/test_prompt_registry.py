@@ -0,0 +1,67 @@
+import os
+
+import pytest
+
+from backend.main import PROMPTS_DIR
+from backend.prompt_registry import CompiledTemplate, PromptRegistry
+
+
+def write_prompts(prompts_dir, default="default {word}"):
+    (prompts_dir / "prompt.txt").write_text(default)
+    (prompts_dir / "fix_json_prompt.txt").write_text("fix {broken_output}")
+    (prompts_dir / "batch_prompt.txt").write_text("batch {entries}")
+
+
+def test_compiled_template_matches_str_format():
+    with open(os.path.join(PROMPTS_DIR, "prompt.txt")) as f:
+        text = f.read().strip()
+    values = {
+        "word": "run\nfast",
+        "source_lang": "English",
+        "target_lang": "Russian",
+        "context_prompt": "Given the context `x`, ",
+    }
+    template = CompiledTemplate(text)
+
+    assert template.render(**values) == text.format(**values)
+    assert (
+        template.render(single_line=True, **values)
+        == text.format(**values).replace("\n", " ").strip()
+    )
+
+
+def test_compiled_template_with_format_spec_falls_back():
+    assert CompiledTemplate("{n:>3}|{{x}}").render(n=7) == "  7|{x}"
+
+
+def test_registry_resolves_pair_once(tmp_path):
+    write_prompts(tmp_path)
+    (tmp_path / "prompt_German.txt").write_text("german")
+    registry = PromptRegistry(str(tmp_path))
+
+    assert registry.for_languages("German", "Russian").text == "german"
+    assert registry.for_languages("Ger/../man", "Russian").text == "german"
+    assert registry.for_languages("French", "Russian").text == "default {word}"
+    assert ("German", "Russian") in registry._resolved
+
+
+def test_registry_requires_default_prompts(tmp_path):
+    (tmp_path / "prompt.txt").write_text("default")
+    with pytest.raises(FileNotFoundError):
+        PromptRegistry(str(tmp_path))
+
+
+def test_registry_reloads_changed_files(tmp_path):
+    write_prompts(tmp_path)
+    registry = PromptRegistry(str(tmp_path))
+    assert registry.for_languages("German", "Russian").text == "default {word}"
+    assert not registry.reload_if_changed()
+
+    (tmp_path / "prompt_German_Russian.txt").write_text("pair {word}")
+    assert registry.reload_if_changed()
+    assert registry.for_languages("German", "Russian").text == "pair {word}"
+
+    # A broken state keeps the previous templates
+    os.remove(tmp_path / "prompt.txt")
+    assert not registry.reload_if_changed()
+    assert registry.get("prompt").text == "default {word}"
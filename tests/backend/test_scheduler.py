@@ -0,0 +1,206 @@
+import asyncio
+
+import pytest
+
+from backend.scheduler import BULK, INTERACTIVE, FairScheduler, backoff_delay
+
+
+@pytest.mark.asyncio
+async def test_scheduler_caps_concurrency():
+    scheduler = FairScheduler(2)
+    running = 0
+    peak = 0
+
+    async def work():
+        nonlocal running, peak
+        async with scheduler.slot("client"):
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+    await asyncio.gather(*(work() for _ in range(6)))
+
+    assert peak == 2
+    assert scheduler.active == 0
+    assert scheduler.stats()["total_started"] == 6
+
+
+@pytest.mark.asyncio
+async def test_scheduler_round_robin_between_clients():
+    scheduler = FairScheduler(1)
+    order = []
+    gate = asyncio.Event()
+
+    async def holder():
+        async with scheduler.slot("holder"):
+            await gate.wait()
+
+    async def work(client, label):
+        async with scheduler.slot(client):
+            order.append(label)
+
+    hold = asyncio.create_task(holder())
+    await asyncio.sleep(0)
+    bulk = [asyncio.create_task(work("bulk", f"bulk{i}")) for i in range(3)]
+    await asyncio.sleep(0)
+    single = asyncio.create_task(work("single", "single"))
+    await asyncio.sleep(0)
+    assert scheduler.queue_depth() == 4
+
+    gate.set()
+    await asyncio.gather(hold, single, *bulk)
+
+    assert order == ["bulk0", "single", "bulk1", "bulk2"]
+
+
+@pytest.mark.asyncio
+async def test_scheduler_serves_interactive_lane_first():
+    scheduler = FairScheduler(1)
+    order = []
+    gate = asyncio.Event()
+
+    async def holder():
+        async with scheduler.slot("holder", BULK):
+            await gate.wait()
+
+    async def work(client, lane, label):
+        async with scheduler.slot(client, lane):
+            order.append(label)
+
+    hold = asyncio.create_task(holder())
+    await asyncio.sleep(0)
+    bulk = [asyncio.create_task(work("job", BULK, f"bulk{i}")) for i in range(3)]
+    await asyncio.sleep(0)
+    single = asyncio.create_task(work("user", INTERACTIVE, "single"))
+    await asyncio.sleep(0)
+
+    gate.set()
+    await asyncio.gather(hold, single, *bulk)
+
+    assert order == ["single", "bulk0", "bulk1", "bulk2"]
+    lanes = scheduler.stats()["lanes"]
+    assert lanes[INTERACTIVE]["started"] == 1
+    assert lanes[BULK]["started"] == 4
+    assert lanes[INTERACTIVE]["max_wait_seconds"] > 0
+
+
+@pytest.mark.asyncio
+async def test_scheduler_moves_promoted_calls_up():
+    scheduler = FairScheduler(1)
+    order = []
+    gate = asyncio.Event()
+    shared = {"lane": BULK}
+
+    async def holder():
+        async with scheduler.slot("holder", BULK):
+            await gate.wait()
+
+    async def work(label, lane_of=None):
+        async with scheduler.slot("job", BULK, lane_of) as lane:
+            order.append((label, lane))
+
+    hold = asyncio.create_task(holder())
+    await asyncio.sleep(0)
+    bulk = asyncio.create_task(work("bulk"))
+    promoted = asyncio.create_task(work("shared", lambda: shared["lane"]))
+    await asyncio.sleep(0)
+
+    scheduler.reprioritize()
+    assert scheduler.queue_depth(INTERACTIVE) == 0
+    # An interactive request joins the shared call
+    shared["lane"] = INTERACTIVE
+    scheduler.reprioritize()
+    assert scheduler.queue_depth(INTERACTIVE) == 1
+
+    gate.set()
+    await asyncio.gather(hold, bulk, promoted)
+
+    assert order == [("shared", INTERACTIVE), ("bulk", BULK)]
+    assert scheduler.stats()["lanes"][INTERACTIVE]["started"] == 1
+    assert scheduler.active == 0
+
+
+@pytest.mark.asyncio
+async def test_scheduler_bulk_leaves_reserved_slots():
+    scheduler = FairScheduler(3, reserved=1)
+    gate = asyncio.Event()
+
+    async def work(lane):
+        async with scheduler.slot("client", lane):
+            await gate.wait()
+
+    bulk = [asyncio.create_task(work(BULK)) for _ in range(3)]
+    await asyncio.sleep(0)
+    assert scheduler.active_by_lane[BULK] == 2
+    assert scheduler.queue_depth(BULK) == 1
+
+    # The reserved slot lets an interactive call start at once
+    single = asyncio.create_task(work(INTERACTIVE))
+    await asyncio.sleep(0)
+    assert scheduler.active_by_lane[INTERACTIVE] == 1
+
+    gate.set()
+    await asyncio.gather(single, *bulk)
+    assert scheduler.active == 0
+
+    # Bulk keeps one slot even when the reservation covers the whole limit
+    narrow = FairScheduler(1, reserved=1)
+    await asyncio.wait_for(narrow.acquire("job", BULK), 1)
+    narrow.release(BULK)
+
+
+@pytest.mark.asyncio
+async def test_scheduler_cancelled_waiter_frees_queue():
+    scheduler = FairScheduler(1)
+    gate = asyncio.Event()
+
+    async def holder():
+        async with scheduler.slot("a"):
+            await gate.wait()
+
+    hold = asyncio.create_task(holder())
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(scheduler.acquire("b"))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    await asyncio.sleep(0)
+
+    assert scheduler.queue_depth() == 0
+    gate.set()
+    await hold
+    assert scheduler.active == 0
+
+
+@pytest.mark.asyncio
+async def test_scheduler_adaptive_limit_aimd():
+    scheduler = FairScheduler(4, min_concurrent=1, adaptive=True, cooldown=0)
+
+    scheduler.record_overload()
+    assert scheduler.capacity == 2
+    scheduler.record_overload()
+    scheduler.record_overload()
+    assert scheduler.capacity == 1
+
+    for _ in range(20):
+        scheduler.record_success()
+    assert scheduler.capacity == 4
+    assert scheduler.stats()["current_limit"] == 4
+
+
+def test_scheduler_overload_cooldown_and_static_limit():
+    scheduler = FairScheduler(8, adaptive=True, cooldown=60)
+    scheduler.record_overload()
+    scheduler.record_overload()
+    assert scheduler.capacity == 4
+
+    static = FairScheduler(8)
+    static.record_overload()
+    assert static.capacity == 8
+
+
+def test_backoff_delay_is_jittered_and_capped():
+    delays = [backoff_delay(attempt, 1, 5) for attempt in range(10) for _ in range(20)]
+    assert all(0 <= d <= 5 for d in delays)
+    assert len(set(delays)) > 1
+    assert all(backoff_delay(0, 1, 5) <= 1 for _ in range(20))
@@ -1,4 +1,14 @@
-from scripts.csv_to_anki import format_text
+import argparse
+import json
+import os
+import sqlite3
+import tempfile
+import zipfile
+
+import genanki
+import pytest
+
+from scripts.csv_to_anki import csv_to_apkg, format_text, positive_int
 
 
 def test_format_text():
@@ -7,3 +17,131 @@ def test_format_text():
     assert format_text("#multiple# #tags#") == "<b>multiple</b> <b>tags</b>"
     assert format_text("") == ""
     assert format_text(None) == ""
+
+
+def read_package(path):
+    with zipfile.ZipFile(path) as package:
+        data = package.read("collection.anki2")
+    with tempfile.NamedTemporaryFile(suffix=".anki2", delete=False) as f:
+        f.write(data)
+    conn = sqlite3.connect(f.name)
+    try:
+        rows = conn.execute("SELECT flds, guid FROM notes").fetchall()
+        (decks,) = conn.execute("SELECT decks FROM col").fetchone()
+        cards = conn.execute("SELECT COUNT(*) FROM cards").fetchone()[0]
+    finally:
+        conn.close()
+        os.remove(f.name)
+    names = sorted(deck["name"] for deck in json.loads(decks).values())
+    fields = [flds.split("\x1f") for flds, _ in rows]
+    return fields, names, cards, [guid for _, guid in rows]
+
+
+def write_csv(path, count):
+    lines = [
+        f'"word{i}";"[w{i}]";"слово{i}";"An #word{i}# here.";"#Слово{i}#.";"word{i}"'
+        for i in range(count)
+    ]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def test_csv_to_apkg_writes_all_rows(tmp_path):
+    source = tmp_path / "words.csv"
+    write_csv(source, 25)
+    output = tmp_path / "deck.apkg"
+
+    written = csv_to_apkg(
+        str(source), str(output), "Deck", "bidirectional", chunk_size=4
+    )
+
+    assert written == [str(output)]
+    fields, names, cards, _ = read_package(output)
+    assert [f[0] for f in fields] == [f"word{i}" for i in range(25)]
+    assert fields[3][4] == (
+        '<div class="example-item">'
+        '  <div class="example-en">An <b>word3</b> here.</div>'
+        '  <div class="example-ru"><b>Слово3</b>.</div>'
+        "</div>"
+    )
+    assert "Deck" in names
+    assert cards == 50
+
+
+def test_csv_to_apkg_splits_by_size(tmp_path):
+    source = tmp_path / "words.csv"
+    write_csv(source, 25)
+    output = tmp_path / "deck.apkg"
+
+    # No card type and no terminal: no prompt, foreign-native cards
+    written = csv_to_apkg(str(source), str(output), "Deck", max_notes=10, chunk_size=4)
+
+    assert written == [str(tmp_path / f"deck-00{part}.apkg") for part in (1, 2, 3)]
+    parts = [read_package(path) for path in written]
+    assert [len(fields) for fields, *_ in parts] == [10, 10, 5]
+    assert [cards for _, _, cards, _ in parts] == [10, 10, 5]
+    assert "Deck::002" in parts[1][1]
+    assert parts[2][0][-1][0] == "word24"
+
+
+def test_csv_to_apkg_writes_delta_packages(tmp_path):
+    source = tmp_path / "words.csv"
+    write_csv(source, 5)
+    manifest = str(tmp_path / "manifest.json")
+
+    written = csv_to_apkg(
+        str(source), str(tmp_path / "full.apkg"), "Deck", manifest_file=manifest
+    )
+    _, _, _, full_guids = read_package(written[0])
+    assert full_guids == [genanki.guid_for(f"word{i}") for i in range(5)]
+
+    assert (
+        csv_to_apkg(
+            str(source), str(tmp_path / "none.apkg"), "Deck", manifest_file=manifest
+        )
+        == []
+    )
+    assert not (tmp_path / "none.apkg").exists()
+
+    lines = source.read_text(encoding="utf-8").splitlines()
+    lines[2] = lines[2].replace("слово2", "новое")
+    lines.append('"extra";"";"доп";"extra"')
+    lines.append(lines[0])
+    source.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    written = csv_to_apkg(
+        str(source), str(tmp_path / "delta.apkg"), "Deck", manifest_file=manifest
+    )
+
+    fields, _, _, guids = read_package(written[0])
+    assert [f[0] for f in fields] == ["word2", "extra"]
+    assert fields[0][3] == "новое"
+    assert guids == [full_guids[2], genanki.guid_for("extra")]
+
+
+def test_csv_to_apkg_parallel_matches_serial(tmp_path):
+    source = tmp_path / "words.csv"
+    write_csv(source, 30)
+    serial = tmp_path / "serial.apkg"
+    parallel = tmp_path / "parallel.apkg"
+
+    csv_to_apkg(
+        str(source), str(serial), "Deck", "bidirectional", chunk_size=4, timestamp=1e9
+    )
+    csv_to_apkg(
+        str(source),
+        str(parallel),
+        "Deck",
+        "bidirectional",
+        chunk_size=4,
+        workers=2,
+        timestamp=1e9,
+    )
+
+    assert serial.read_bytes() == parallel.read_bytes()
+
+
+def test_positive_int():
+    assert positive_int("5000") == 5000
+    for value in ("0", "-3", "many"):
+        with pytest.raises(argparse.ArgumentTypeError):
+            positive_int(value)